@@ -3,7 +3,6 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_migrate import Migrate
 from app.config import Config
-from flask_jwt_extended import JWTManager
 
 db = SQLAlchemy()
 migrate = Migrate()
@@ -12,9 +11,6 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
-    # Inicialize o JWTManager
-    jwt = JWTManager(app)
-
     # Configuração do CORS para permitir múltiplas origens
     CORS(app, resources={
         r"/*": {  # Permite todas as rotas
@@ -41,6 +37,8 @@ def create_app(config_class=Config):
     from app.routes.streak import streak_bp
     from app.routes.user_answers import bp as user_answers_bp
     from app.routes.user import user_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.admin import admin_bp
 
 
     app.register_blueprint(explainer_bp)
@@ -52,6 +50,36 @@ def create_app(config_class=Config):
     app.register_blueprint(streak_bp)
     app.register_blueprint(user_answers_bp, url_prefix='/api')
     app.register_blueprint(user_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(admin_bp)
+
+    # Gravação assíncrona (write-behind) das respostas, se habilitada
+    from app.services.answer_buffer import answer_buffer
+    answer_buffer.init_app(app)
+
+    # Pool de processos do bcrypt
+    from app.services.password_pool import password_pool
+    password_pool.init_app(app)
+
+    # Cliente do modelo de linguagem (um por worker, com agrupamento de prompts idênticos)
+    from app.services.llm import llm_client
+    llm_client.init_app(app)
+
+    # Cache das explicações geradas pela IA (memória + tabela ai_explanations)
+    from app.services.explanation_cache import explanation_cache
+    explanation_cache.init_app(app)
+
+    # Revisão com IA: chamadas ao modelo em paralelo
+    from app.services.review_service import review_generator
+    review_generator.init_app(app)
+
+    # Autenticação: token decodificado uma vez por requisição, com cache por worker
+    from app.utils.jwt_utils import init_auth
+    init_auth(app)
+
+    # Comandos de linha de comando (flask progress rebuild, ...)
+    from app.commands import register_commands
+    register_commands(app)
 
     @app.before_request
     def handle_options():
@@ -0,0 +1,95 @@
+import click
+from flask.cli import AppGroup
+
+progress_cli = AppGroup('progress', help='Manutenção do progresso materializado dos usuários.')
+
+@progress_cli.command('rebuild')
+@click.option('--user-id', type=int, default=None, help='Reconstrói apenas o progresso deste usuário.')
+def rebuild_progress_command(user_id):
+    """Reconstrói a tabela user_progress a partir do histórico de respostas."""
+    from app.services.progress_service import rebuild_user_progress
+
+    rows = rebuild_user_progress(user_id)
+    click.echo(f"✅ Progresso reconstruído: {rows} linhas gravadas.")
+
+calibration_cli = AppGroup('calibration', help='Calibração da dificuldade das questões e da habilidade dos usuários.')
+
+@calibration_cli.command('run')
+@click.option('--full', is_flag=True, help='Recalibra com todo o histórico em vez de apenas as respostas novas.')
+def run_calibration_command(full):
+    """Calibra dificuldades e habilidades (modelo de Rasch) a partir de user_answers."""
+    from app.services.calibration_service import run_calibration
+
+    summary = run_calibration(full)
+    click.echo(
+        f"✅ Calibração {summary['mode']}: {summary['answers']} respostas, "
+        f"{summary['users']} usuários, {summary['questions']} questões, "
+        f"{summary['iterations']} iterações em {summary['seconds']}s."
+    )
+
+users_cli = AppGroup('users', help='Administração de usuários.')
+
+@users_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'json']), default=None,
+              help='Formato do arquivo (padrão: pela extensão).')
+def import_users_command(path, fmt):
+    """Cadastra em lote os usuários de um arquivo CSV (name,email,password) ou JSON."""
+    from app.services.provisioning_service import parse_users, provision_users
+
+    fmt = fmt or ('json' if path.lower().endswith('.json') else 'csv')
+    with open(path, encoding='utf-8-sig') as f:
+        records = parse_users(f.read(), fmt)
+
+    summary = provision_users(records)
+    click.echo(
+        f"✅ {summary['created']} usuários criados em {summary['seconds']}s "
+        f"({summary['users_per_second']} usuários/s); {summary['existing']} já cadastrados, "
+        f"{summary['duplicated']} repetidos no arquivo, {summary['invalid']} inválidos."
+    )
+
+explanations_cli = AppGroup('explanations', help='Explicações das questões geradas pela IA.')
+
+@explanations_cli.command('pregenerate')
+@click.option('--provider', type=click.Choice(['gemini', 'fake', 'fake_http']), default=None,
+              help='Provedor do modelo (padrão: LLM_PROVIDER).')
+@click.option('--concurrency', type=int, default=None, help='Chamadas simultâneas ao modelo.')
+@click.option('--rpm', type=int, default=None, help='Máximo de chamadas por minuto (0 = sem limite).')
+@click.option('--batch-size', type=int, default=None, help='Explicações gravadas por lote.')
+@click.option('--limit', type=int, default=None, help='Gera no máximo este número de explicações.')
+def pregenerate_explanations_command(provider, concurrency, rpm, batch_size, limit):
+    """Gera e grava as explicações das questões que ainda não têm uma (retoma de onde parou)."""
+    from flask import current_app
+    from app.services.llm import LLMClient, create_provider, llm_client
+    from app.services.explanation_service import pregenerate_explanations
+
+    config = current_app.config
+    client = LLMClient(provider=create_provider(config, provider), scheduler=llm_client.scheduler,
+                                 breaker=llm_client.breaker) if provider else llm_client
+    summary = None
+    for summary in pregenerate_explanations(
+        client,
+        concurrency=concurrency or config.get('PREGENERATE_CONCURRENCY', 4),
+        rpm=config.get('PREGENERATE_RPM', 60) if rpm is None else rpm,
+        batch_size=batch_size or config.get('PREGENERATE_BATCH_SIZE', 50),
+        limit=limit
+    ):
+        click.echo(
+            f"Lote gravado: {summary['written']} explicações "
+            f"({summary['generated']} geradas, {summary['failed']} falhas, {summary['pending']} pendentes)."
+        )
+
+    if summary is None:
+        click.echo("✅ Nenhuma questão sem explicação.")
+    else:
+        click.echo(
+            f"✅ {summary['generated']} explicações geradas em {summary['seconds']}s; "
+            f"{summary['failed']} falhas (serão tentadas de novo na próxima execução)."
+        )
+
+def register_commands(app):
+    """Registra os comandos de linha de comando da aplicação (flask <grupo> <comando>)"""
+    app.cli.add_command(progress_cli)
+    app.cli.add_command(calibration_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(explanations_cli)
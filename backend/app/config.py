@@ -19,9 +19,114 @@ class Config:
     JWT_HEADER_NAME = 'Authorization'
     JWT_HEADER_TYPE = 'Bearer'
     JWT_EXPIRATION_DELTA = int(os.getenv('JWT_EXPIRATION_DELTA', 86400))
+    # Aceita tokens de login sem a claim 'aud' (emitidos antes dela) até expirarem;
+    # pode ser desligado depois de JWT_EXPIRATION_DELTA segundos do deploy
+    JWT_ACCEPT_LEGACY_TOKENS = os.getenv('JWT_ACCEPT_LEGACY_TOKENS', 'True').lower() == 'true'
+    TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 10000))  # Tokens verificados em cache (por worker)
     
     # CORS
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:8080')
     
     # Security
-    BCRYPT_SALT_ROUNDS = int(os.getenv('BCRYPT_SALT_ROUNDS', 12))
\ No newline at end of file
+    BCRYPT_SALT_ROUNDS = int(os.getenv('BCRYPT_SALT_ROUNDS', 12))
+    
+    # Pool de processos do bcrypt: processos por worker da aplicação (0 = na
+    # própria thread), operações pendentes aceitas (0 = 4 por processo) e
+    # espera máxima por uma vaga (s)
+    PASSWORD_POOL_WORKERS = int(os.getenv('PASSWORD_POOL_WORKERS', min(2, os.cpu_count() or 1)))
+    PASSWORD_POOL_MAX_PENDING = int(os.getenv('PASSWORD_POOL_MAX_PENDING', 0))
+    PASSWORD_POOL_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_POOL_QUEUE_TIMEOUT', 1.0))
+    
+    # Cache em memória dos dados dos usuários autenticados (por worker)
+    USER_CACHE_SIZE = int(os.getenv('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))
+    
+    # Cache em memória dos bitsets de questões resolvidas (por worker)
+    SOLVED_CACHE_SIZE = int(os.getenv('SOLVED_CACHE_SIZE', 10000))
+    SOLVED_CACHE_TTL = int(os.getenv('SOLVED_CACHE_TTL', 300))
+    
+    # Catálogo de conteúdo em memória: intervalo (s) entre verificações da versão do conteúdo
+    CONTENT_VERSION_CHECK_INTERVAL = int(os.getenv('CONTENT_VERSION_CHECK_INTERVAL', 30))
+    
+    # Teste de nivelamento: número de questões e sorteio estratificado por nível
+    PLACEMENT_QUESTION_COUNT = int(os.getenv('PLACEMENT_QUESTION_COUNT', 15))
+    PLACEMENT_STRATIFIED = os.getenv('PLACEMENT_STRATIFIED', 'False').lower() == 'true'
+    # Envia o gabarito (campo correct das opções) em GET /api/nivelamento/; desligado por padrão
+    PLACEMENT_INCLUDE_ANSWER_KEY = os.getenv('PLACEMENT_INCLUDE_ANSWER_KEY', 'False').lower() == 'true'
+    
+    # Nivelamento adaptativo: limites de questões, critérios de parada e validade da sessão (s)
+    PLACEMENT_MIN_ITEMS = int(os.getenv('PLACEMENT_MIN_ITEMS', 5))
+    PLACEMENT_MAX_ITEMS = int(os.getenv('PLACEMENT_MAX_ITEMS', 15))
+    PLACEMENT_TARGET_SE = float(os.getenv('PLACEMENT_TARGET_SE', 0.5))
+    PLACEMENT_LEVEL_CONFIDENCE = float(os.getenv('PLACEMENT_LEVEL_CONFIDENCE', 0.8))
+    PLACEMENT_SESSION_TTL = int(os.getenv('PLACEMENT_SESSION_TTL', 3600))
+    
+    # Gravação assíncrona (write-behind) das respostas dos usuários
+    ANSWER_WRITE_BEHIND = os.getenv('ANSWER_WRITE_BEHIND', 'False').lower() == 'true'
+    ANSWER_BUFFER_MAX_SIZE = int(os.getenv('ANSWER_BUFFER_MAX_SIZE', 10000))
+    ANSWER_BUFFER_BATCH_SIZE = int(os.getenv('ANSWER_BUFFER_BATCH_SIZE', 500))
+    ANSWER_BUFFER_MAX_AGE = float(os.getenv('ANSWER_BUFFER_MAX_AGE', 1.0))
+    
+    # Respostas por bloco (transação) na sincronização em lote (/api/user-answers/sync)
+    ANSWER_SYNC_CHUNK_SIZE = int(os.getenv('ANSWER_SYNC_CHUNK_SIZE', 1000))
+    # Tamanho máximo (bytes) de cada linha NDJSON da sincronização
+    ANSWER_SYNC_MAX_LINE_LENGTH = int(os.getenv('ANSWER_SYNC_MAX_LINE_LENGTH', 4096))
+    
+    # Modelo de linguagem: provedor ('gemini', 'fake' local e sem rede ou 'fake_http',
+    # servidor falso em LLM_FAKE_URL), modelo e chave
+    LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini')
+    LLM_MODEL = os.getenv('LLM_MODEL', 'gemini-1.5-flash')
+    LLM_FAKE_LATENCY = float(os.getenv('LLM_FAKE_LATENCY', 0.0))
+    LLM_FAKE_URL = os.getenv('LLM_FAKE_URL', 'http://127.0.0.1:8765/generate')
+    GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+    
+    # Escalonador das chamadas ao modelo (por worker): chamadas simultâneas,
+    # limites por minuto de requisições e de tokens (0 = sem limite), fração
+    # dos limites reservada às chamadas interativas, filas (tamanho e espera
+    # máxima em s) por prioridade, tokens de saída estimados por chamada e
+    # pausa após erro de quota (s)
+    LLM_MAX_IN_FLIGHT = int(os.getenv('LLM_MAX_IN_FLIGHT', 16))
+    LLM_RPM = int(os.getenv('LLM_RPM', 0))
+    LLM_TPM = int(os.getenv('LLM_TPM', 0))
+    LLM_BATCH_RESERVE = float(os.getenv('LLM_BATCH_RESERVE', 0.2))
+    LLM_QUEUE_SIZE = int(os.getenv('LLM_QUEUE_SIZE', 64))
+    LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', 10.0))
+    LLM_BATCH_QUEUE_SIZE = int(os.getenv('LLM_BATCH_QUEUE_SIZE', 256))
+    LLM_BATCH_QUEUE_TIMEOUT = float(os.getenv('LLM_BATCH_QUEUE_TIMEOUT', 300.0))
+    LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv('LLM_EXPECTED_OUTPUT_TOKENS', 400))
+    LLM_QUOTA_BACKOFF = int(os.getenv('LLM_QUOTA_BACKOFF', 30))
+    
+    # Tempo limite de cada chamada ao modelo (s) e disjuntor: janela de chamadas
+    # avaliadas, mínimo de chamadas, fração de falhas que abre o circuito,
+    # chamada considerada lenta (s) e tempo aberto antes da sondagem (s)
+    LLM_CALL_TIMEOUT = float(os.getenv('LLM_CALL_TIMEOUT', 15.0))
+    LLM_BREAKER_ENABLED = os.getenv('LLM_BREAKER_ENABLED', 'True').lower() == 'true'
+    LLM_BREAKER_WINDOW = int(os.getenv('LLM_BREAKER_WINDOW', 20))
+    LLM_BREAKER_MIN_CALLS = int(os.getenv('LLM_BREAKER_MIN_CALLS', 5))
+    LLM_BREAKER_FAILURE_RATE = float(os.getenv('LLM_BREAKER_FAILURE_RATE', 0.5))
+    LLM_BREAKER_SLOW_CALL = float(os.getenv('LLM_BREAKER_SLOW_CALL', 10.0))
+    LLM_BREAKER_OPEN_SECONDS = float(os.getenv('LLM_BREAKER_OPEN_SECONDS', 30.0))
+    
+    # Pré-geração das explicações (flask explanations pregenerate): chamadas
+    # simultâneas, limite de chamadas por minuto e explicações por lote gravado
+    PREGENERATE_CONCURRENCY = int(os.getenv('PREGENERATE_CONCURRENCY', 4))
+    PREGENERATE_RPM = int(os.getenv('PREGENERATE_RPM', 60))
+    PREGENERATE_BATCH_SIZE = int(os.getenv('PREGENERATE_BATCH_SIZE', 50))
+    
+    # Cache das explicações geradas pela IA: entradas em memória (por worker),
+    # validade das explicações guardadas no banco (s) e tempo máximo em memória (s)
+    EXPLANATION_CACHE_SIZE = int(os.getenv('EXPLANATION_CACHE_SIZE', 2048))
+    EXPLANATION_CACHE_TTL = int(os.getenv('EXPLANATION_CACHE_TTL', 30 * 24 * 3600))
+    EXPLANATION_CACHE_MEMORY_TTL = int(os.getenv('EXPLANATION_CACHE_MEMORY_TTL', 3600))
+    
+    # Revisão com IA (/api/review): chamadas simultâneas ao modelo (por worker),
+    # prazo máximo de cada requisição (s) e questões por prompt em lote (0 = uma por vez)
+    REVIEW_MAX_WORKERS = int(os.getenv('REVIEW_MAX_WORKERS', 16))
+    REVIEW_DEADLINE = float(os.getenv('REVIEW_DEADLINE', 20.0))
+    REVIEW_BATCH_SIZE = int(os.getenv('REVIEW_BATCH_SIZE', 10))
+    
+    # Token exigido no header X-Admin-Token das rotas /api/admin (sem ele, ficam desabilitadas)
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+    
+    # Token exigido no header X-Metrics-Token das métricas /api/metrics (sem ele, ficam desabilitadas)
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
@@ -7,3 +7,8 @@ from .user_progress import UserProgress
 from .user_placement_answer import UserPlacementAnswer
 from .user_streak import UserStreak
 from .user_answer import UserAnswer
+from .user_solved_set import UserSolvedSet
+from .content_version import ContentVersion
+from .calibration import QuestionDifficulty, UserAbility, CalibrationState
+from .ai_explanation import AIExplanation
+from .placement_session import PlacementSession
@@ -0,0 +1,19 @@
+from app import db
+from datetime import datetime
+
+class AIExplanation(db.Model):
+    """
+    Texto gerado pela IA, indexado por (hash do prompt, prompt_version).
+    prompt_version identifica a versão das instruções usadas no prompt: ao
+    alterá-las, as explicações antigas deixam de ser usadas.
+    """
+    __tablename__ = 'ai_explanations'
+
+    prompt_hash = db.Column(db.String(64), primary_key=True)
+    prompt_version = db.Column(db.String(16), primary_key=True)
+    kind = db.Column(db.String(32), nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<AIExplanation {self.kind} {self.prompt_hash[:8]}>'
@@ -0,0 +1,63 @@
+from app import db
+from datetime import datetime
+
+class QuestionDifficulty(db.Model):
+    """
+    Dificuldade calibrada da questão (modelo de Rasch, escala logit).
+    information é a soma de p(1-p) das respostas usadas na estimativa e
+    serve de peso nas atualizações incrementais.
+    """
+    __tablename__ = 'question_difficulties'
+
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), primary_key=True)
+    difficulty = db.Column(db.Float, nullable=False, default=0.0)
+    information = db.Column(db.Float, nullable=False, default=0.0)
+    answer_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<QuestionDifficulty question_id={self.question_id} difficulty={self.difficulty:.2f}>'
+
+class UserAbility(db.Model):
+    """Habilidade calibrada do usuário (modelo de Rasch, escala logit)"""
+    __tablename__ = 'user_abilities'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    ability = db.Column(db.Float, nullable=False, default=0.0)
+    information = db.Column(db.Float, nullable=False, default=0.0)
+    answer_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<UserAbility user_id={self.user_id} ability={self.ability:.2f}>'
+
+class CalibrationState(db.Model):
+    """
+    Estado da calibração (linha única): última resposta processada, usada
+    pelas atualizações incrementais, e versão, incrementada a cada execução
+    para que os workers recarreguem as dificuldades.
+    """
+    __tablename__ = 'calibration_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    last_answer_id = db.Column(db.Integer, nullable=False, default=0)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    full_run_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CalibrationState version={self.version} last_answer_id={self.last_answer_id}>'
+
+    @staticmethod
+    def get():
+        """Retorna a linha de estado, criando-a se necessário. Não faz commit."""
+        state = db.session.get(CalibrationState, 1)
+        if not state:
+            state = CalibrationState(id=1, last_answer_id=0, version=0)
+            db.session.add(state)
+        return state
+
+    @staticmethod
+    def current_version():
+        version = db.session.query(CalibrationState.version).filter_by(id=1).scalar()
+        return version or 0
@@ -13,32 +13,20 @@ class Category(db.Model):
     def __repr__(self):
         return f'<Category {self.name}>'
 
-    def to_dict(self, user_id=None):
+    def to_dict(self, user_id=None, progress_map=None):
         """
         Retorna um dicionário com os dados da categoria,
         incluindo o progresso do usuário, se fornecido.
+        Se progress_map for fornecido, o progresso é lido dele.
         """
-        from app.models.question import Question
-        from app.models.user_answer import UserAnswer
-        from app import db
+        from app.services.progress_service import get_progress_for_category
         
         progress = 0
-        if user_id:
-            # Busca todas as questões da categoria
-            total_questions = Question.query.filter_by(category_id=self.id).count()
-            
-            if total_questions > 0:
-                # Busca as questões que o usuário respondeu corretamente
-                correct_answers = UserAnswer.query.filter(
-                    UserAnswer.user_id == user_id,
-                    UserAnswer.is_correct == True,
-                    UserAnswer.question_id.in_(
-                        db.session.query(Question.id).filter_by(category_id=self.id)
-                    )
-                ).count()
-                
-                # Calcula o progresso como porcentagem
-                progress = round((correct_answers / total_questions) * 100)
+        if user_id and progress_map is not None:
+            progress = progress_map['categories'].get(self.id, 0)
+        elif user_id:
+            # Lê o progresso materializado na tabela user_progress
+            progress = get_progress_for_category(user_id, self.id)
 
         return {
             'id': self.id,
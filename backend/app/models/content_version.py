@@ -0,0 +1,33 @@
+from app import db
+from datetime import datetime
+
+class ContentVersion(db.Model):
+    """
+    Versão do conteúdo (módulos, categorias, questões e opções).
+    É incrementada sempre que os seeds ou a importação de questões rodam,
+    invalidando o catálogo em memória dos workers.
+    """
+    __tablename__ = 'content_version'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ContentVersion {self.version}>'
+
+    @staticmethod
+    def current():
+        """Retorna a versão atual do conteúdo (0 se nunca foi incrementada)"""
+        version = db.session.query(ContentVersion.version).filter_by(id=1).scalar()
+        return version or 0
+
+    @staticmethod
+    def bump():
+        """Incrementa a versão do conteúdo. Não faz commit."""
+        row = db.session.get(ContentVersion, 1)
+        if not row:
+            row = ContentVersion(id=1, version=0)
+            db.session.add(row)
+        row.version = (row.version or 0) + 1
+        return row.version
@@ -13,40 +13,26 @@ class Module(db.Model):
     def __repr__(self):
         return f'<Module {self.title}>'
 
-    def to_dict(self, user_id=None):
+    def to_dict(self, user_id=None, progress_map=None):
         """
         Retorna um dicionário com os dados do módulo,
         incluindo progresso do usuário (se fornecido) e categorias.
+        Se progress_map for fornecido (ver progress_service.get_user_progress),
+        o progresso é lido dele em vez de ser consultado novamente.
         """
-        from app.models.question import Question
-        from app.models.user_answer import UserAnswer
-        from app import db
+        from app.services.progress_service import get_user_progress
 
         progress = 0
         if user_id:
-            # Calcula o progresso com base nas respostas do usuário
-            # Busca todas as questões das categorias deste módulo
-            category_ids = [category.id for category in self.categories]
-            if category_ids:
-                total_questions = Question.query.filter(Question.category_id.in_(category_ids)).count()
-                
-                if total_questions > 0:
-                    # Busca as questões que o usuário respondeu corretamente
-                    correct_answers = UserAnswer.query.filter(
-                        UserAnswer.user_id == user_id,
-                        UserAnswer.is_correct == True,
-                        UserAnswer.question_id.in_(
-                            db.session.query(Question.id).filter(Question.category_id.in_(category_ids))
-                        )
-                    ).count()
-                    
-                    # Calcula o progresso como porcentagem
-                    progress = round((correct_answers / total_questions) * 100)
+            # Uma única leitura da tabela user_progress serve o módulo e suas categorias
+            if progress_map is None:
+                progress_map = get_user_progress(user_id)
+            progress = progress_map['modules'].get(self.id, 0)
 
         return {
             'id': self.id,
             'title': self.title,
             'description': self.description,
             'progress': progress,
-            'categories': [category.to_dict(user_id) for category in self.categories]
+            'categories': [category.to_dict(user_id, progress_map) for category in self.categories]
         }
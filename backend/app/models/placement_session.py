@@ -0,0 +1,22 @@
+from app import db
+from datetime import datetime
+
+class PlacementSession(db.Model):
+    """
+    Sessão do nivelamento adaptativo, guardada no servidor. O cliente recebe
+    apenas um token com o id da sessão e o passo atual; cada passo só pode
+    ser respondido uma vez (step é incrementado a cada resposta).
+    """
+    __tablename__ = 'placement_sessions'
+
+    id = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    answers = db.Column(db.JSON, nullable=False, default=list)
+    next_question_id = db.Column(db.Integer, nullable=True)
+    step = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<PlacementSession {self.id[:8]} user_id={self.user_id} step={self.step}>'
@@ -13,8 +13,11 @@ class Question(db.Model):
     level = db.Column(db.Integer, default=1)
     explanation = db.Column(db.Text, nullable=True)
 
+    # Questão do teste de nivelamento (importadas por data/import.py)
+    is_placement = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false(), index=True)
+
     # Relacionamentos
-    options = db.relationship('Option', backref='question', lazy=True, cascade='all, delete-orphan')
+    options = db.relationship('Option', backref='question', lazy=True, cascade='all, delete-orphan', order_by='Option.id')
     module = db.relationship('Module', backref=db.backref('questions', lazy=True, cascade='all, delete-orphan'))
 
     def __repr__(self):
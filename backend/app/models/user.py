@@ -10,6 +10,7 @@ class User(db.Model):
     password = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     placement_level = db.Column(db.String)  # Pode ser null inicialmente
+    placement_result = db.Column(db.Integer)  # Nível (1 a 5) estimado no nivelamento adaptativo
 
     # Relacionamentos
     progress = db.relationship(
@@ -28,5 +29,6 @@ class User(db.Model):
             'username': self.username,
             'email': self.email,
             'created_at': self.created_at.isoformat(),
-            'placement_level': self.placement_level
+            'placement_level': self.placement_level,
+            'placement_result': self.placement_result
         }
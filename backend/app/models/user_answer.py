@@ -1,13 +1,16 @@
 from app import db
 from datetime import datetime
 
+# Tamanho máximo do texto da resposta (coluna user_answers.answer)
+MAX_ANSWER_LENGTH = 500
+
 class UserAnswer(db.Model):
     __tablename__ = 'user_answers'
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
-    answer = db.Column(db.String(500), nullable=False)
+    answer = db.Column(db.String(MAX_ANSWER_LENGTH), nullable=False)
     is_correct = db.Column(db.Boolean, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
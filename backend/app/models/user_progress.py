@@ -2,7 +2,17 @@ from app import db
 from datetime import datetime
 
 class UserProgress(db.Model):
+    """
+    Progresso materializado do usuário.
+
+    Há uma linha por (usuário, categoria), com o número de questões distintas
+    respondidas corretamente, e uma linha por (usuário, módulo) com
+    category_id nulo, derivada da soma das categorias do módulo.
+    """
     __tablename__ = 'user_progress'
+    __table_args__ = (
+        db.Index('ix_user_progress_user_module_category', 'user_id', 'module_id', 'category_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
 
@@ -11,6 +21,7 @@ class UserProgress(db.Model):
     category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True)
 
     progress = db.Column(db.Integer, default=0)  # Porcentagem (0-100)
+    correct_count = db.Column(db.Integer, default=0, nullable=False)  # Questões distintas acertadas
     total_quizzes = db.Column(db.Integer, default=0)  # Total de quizzes respondidos
     last_updated = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -28,6 +39,7 @@ class UserProgress(db.Model):
             'module_id': self.module_id,
             'category_id': self.category_id,
             'progress': self.progress,
+            'correct_count': self.correct_count,
             'total_quizzes': self.total_quizzes,
             'last_updated': self.last_updated.isoformat()
         }
@@ -0,0 +1,18 @@
+from app import db
+from datetime import datetime
+
+class UserSolvedSet(db.Model):
+    """
+    Conjunto de questões que o usuário já acertou, armazenado como bitset:
+    o bit de índice question_id vale 1 se a questão foi resolvida.
+    """
+    __tablename__ = 'user_solved_sets'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    bits = db.Column(db.LargeBinary, nullable=False, default=b'')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    user = db.relationship('User', backref=db.backref('solved_set', uselist=False, lazy=True))
+
+    def __repr__(self):
+        return f'<UserSolvedSet user_id={self.user_id}>'
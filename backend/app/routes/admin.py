@@ -0,0 +1,31 @@
+import hmac
+from functools import wraps
+from flask import Blueprint, jsonify, request, current_app
+from app.services.provisioning_service import parse_users, provision_users
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/api/admin')
+
+def admin_required(f):
+    """Exige o header X-Admin-Token igual a ADMIN_TOKEN (rotas desabilitadas sem ADMIN_TOKEN)"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = current_app.config.get('ADMIN_TOKEN')
+        if not token:
+            return jsonify({'error': 'Rotas administrativas desabilitadas'}), 403
+        provided = request.headers.get('X-Admin-Token', '')
+        if not hmac.compare_digest(provided.encode('utf-8'), token.encode('utf-8')):
+            return jsonify({'error': 'Não autorizado'}), 401
+        return f(*args, **kwargs)
+    return decorated
+
+@admin_bp.route('/users/import', methods=['POST'])
+@admin_required
+def import_users():
+    """Cadastro de usuários em lote: corpo CSV (text/csv) ou JSON (lista de usuários)"""
+    fmt = 'csv' if request.mimetype == 'text/csv' else 'json'
+    try:
+        records = parse_users(request.get_data(as_text=True), fmt)
+    except ValueError as e:
+        return jsonify({'error': f'Arquivo inválido: {e}'}), 400
+
+    return jsonify(provision_users(records)), 200
@@ -1,8 +1,15 @@
 from flask import Blueprint, request, jsonify
 from app.services.auth_service import register_user, login_user
+from app.services.password_pool import PasswordPoolBusy
 
 auth_bp = Blueprint('auth', __name__)
 
+def server_busy():
+    """Resposta para quando o pool de hash de senhas está saturado"""
+    response = jsonify({'error': 'Servidor ocupado, tente novamente em instantes'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -11,11 +18,14 @@ def register():
     if not data or not data.get('name') or not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Dados incompletos'}), 400
     
-    response, status_code = register_user(
-        data.get('name'),
-        data.get('email'),
-        data.get('password')
-    )
+    try:
+        response, status_code = register_user(
+            data.get('name'),
+            data.get('email'),
+            data.get('password')
+        )
+    except PasswordPoolBusy:
+        return server_busy()
     
     return jsonify(response), status_code
 
@@ -27,9 +37,12 @@ def login():
     if not data or not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Dados incompletos'}), 400
     
-    response, status_code = login_user(
-        data.get('email'),
-        data.get('password')
-    )
+    try:
+        response, status_code = login_user(
+            data.get('email'),
+            data.get('password')
+        )
+    except PasswordPoolBusy:
+        return server_busy()
     
     return jsonify(response), status_code
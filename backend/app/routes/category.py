@@ -1,29 +1,24 @@
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify
 from app.models.category import Category
+from app.services.catalog_service import get_catalog
 from app.services.category_service import get_category_by_module_id
-from app.utils.jwt_utils import jwt
+from app.utils.http_cache import cached_json_response
 
 categories_bp = Blueprint('categories', __name__)
 
 @categories_bp.route('/categories/module/<int:module_id>', methods=['GET'])
 def get_category(module_id):
-    user_id = None
-    auth_header = request.headers.get('Authorization')
+    # A resposta não depende do usuário (o token não é lido): é serializada
+    # uma vez por versão do conteúdo
+    encoded = get_catalog().encoded(
+        ('module_category', module_id),
+        lambda: get_category_by_module_id(module_id)
+    )
     
-    if auth_header and auth_header.startswith('Bearer '):
-        try:
-            token = auth_header.split(' ')[1]
-            payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            user_id = payload['sub']
-        except:
-            pass  # Ignora erros de token
-    
-    category = get_category_by_module_id(module_id, user_id)
-    
-    if not category:
+    if not encoded:
         return jsonify({'error': 'Categoria não encontrada'}), 404
     
-    return jsonify(category), 200
+    return cached_json_response(*encoded)
 
 @categories_bp.route('/modules/<int:module_id>/categories', methods=['GET'])
 def get_categories_by_module(module_id):
@@ -1,58 +1,17 @@
 from flask import Blueprint, request, jsonify
-import os
-import google.generativeai as genai
-from dotenv import load_dotenv
-
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-
+from app.services.llm import llm_client, LLMUnavailable
+from app.services.explanation_cache import explanation_cache
+from app.services.explanation_service import EXPLAINER_PROMPT_VERSION, explainer_prompt, stored_explanation
+from app.services.review_service import review_generator
+from app.utils.sse import sse_event, sse_response
 
 explainer_bp = Blueprint("explainer", __name__, url_prefix='/api')
 
-INSTRUCTION_PROMPT = """
-Você é uma inteligência artificial treinada para explicar conceitos técnicos de forma clara e didática. 
-Seu objetivo é analisar uma pergunta de múltipla escolha e explicar por que uma determinada alternativa é a correta, 
-considerando o contexto da tecnologia da informação (TI), como inglês técnico, programação, redes e segurança da informação.
-
-Formato da resposta:
-1. Apresente uma explicação breve e direta sobre o porquê da alternativa correta.
-2. Se possível, exemplifique com uma situação prática ou um trecho de código/comando real.
-3. Mantenha a explicação com linguagem acessível, mas sem perder a precisão técnica.
-4. Seja imparcial: não mencione as demais alternativas, apenas foque na correta.
-5. Seja BREVE, repostas mais curtas e em português.
-6. Lembre-se, você deve explicar a parte técnica, mas não se esqueça do inglês também.
-""".strip()
-
-EXPLANATION_PROMPT = """
-Você é um professor de inglês. Explique o erro do aluno de forma didática, focando na diferença entre a resposta errada e a correta.
-
-Formato:
-You answered "[resposta errada]," which is a device that sends and receives data over a network. However, the question asked for the name of the *wireless network itself*, not the device that enables it. [resposta correta] is the name of the technology and the network it creates. A [resposta errada] is a component *of* a [resposta correta] network, but it isn't the name of the network itself.
-
-Diretrizes:
-- Use a estrutura exata do formato acima
-- Mantenha os asteriscos para ênfase (*palavra*)
-- Seja didático e claro
-- Foque apenas na diferença entre a resposta errada e a correta
-- Use o contexto específico da questão
-""".strip()
-
-VOCABULARY_PROMPT = """
-Você é um professor de inglês. Forneça o vocabulário específico para o termo correto no contexto da questão.
-
-Formato:
-[termo] - [tradução]
-
-Example: I connected to the free [termo] at the cafe.
-
-Tradução: Eu me conectei ao [termo] gratuito na cafeteria.
-
-Diretrizes:
-- Use exatamente este formato
-- Dê apenas um exemplo relacionado ao termo ou conceito de acordo com o contexto da questão
-- Mantenha o exemplo relevante para o uso real do termo
-""".strip()
-
+def model_unavailable(error):
+    """Resposta para quando o modelo está sem capacidade (fila cheia ou quota esgotada)"""
+    response = jsonify({"error": "Serviço de explicações ocupado, tente novamente em instantes."})
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, 503
 
 @explainer_bp.route("/explainer", methods=["POST"])
 def generate_explanation():
@@ -64,18 +23,75 @@ def generate_explanation():
         return jsonify({"error": "Parâmetros ausentes."}), 400
 
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-
-        prompt = f"{INSTRUCTION_PROMPT}\n\nPergunta: {question}\nResposta correta: {correct_answer}\n\nExplique:"
-
-        response = model.generate_content(prompt)
-
-        return jsonify({"explanation": response.text})
+        # Explicação pré-gerada (flask explanations pregenerate) tem prioridade
+        explanation = stored_explanation(question, correct_answer)
+        if explanation:
+            return jsonify({"explanation": explanation})
+
+        prompt = explainer_prompt(question, correct_answer)
+        explanation = explanation_cache.get_or_generate(prompt, EXPLAINER_PROMPT_VERSION, 'explainer', llm_client.generate)
+
+        return jsonify({"explanation": explanation})
+    except LLMUnavailable as e:
+        # Modelo indisponível (circuito aberto, quota, tempo limite): usa a explicação vencida, se houver
+        explanation = explanation_cache.get(prompt, EXPLAINER_PROMPT_VERSION, allow_stale=True)
+        if explanation:
+            return jsonify({"explanation": explanation})
+        return model_unavailable(e)
     except Exception as e:
         import traceback
         traceback.print_exc()
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
 
+@explainer_bp.route("/explainer/stream", methods=["POST"])
+def stream_explanation():
+    """Mesma explicação do /explainer, enviada como Server-Sent Events à medida que é gerada"""
+    # Corpo inválido é recusado antes de abrir o fluxo de eventos
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Corpo JSON inválido."}), 400
+    question = data.get("question")
+    correct_answer = data.get("correct_answer")
+
+    if not isinstance(question, str) or not question or not isinstance(correct_answer, str) or not correct_answer:
+        return jsonify({"error": "Parâmetros ausentes."}), 400
+
+    prompt = explainer_prompt(question, correct_answer)
+
+    def events():
+        cached = stored_explanation(question, correct_answer) or explanation_cache.get(prompt, EXPLAINER_PROMPT_VERSION)
+        if cached is not None:
+            yield sse_event({"text": cached}, "chunk")
+            yield sse_event({"explanation": cached}, "done")
+            return
+
+        try:
+            parts = []
+            for text in llm_client.stream(prompt):
+                parts.append(text)
+                yield sse_event({"text": text}, "chunk")
+        except LLMUnavailable as e:
+            stale = None if parts else explanation_cache.get(prompt, EXPLAINER_PROMPT_VERSION, allow_stale=True)
+            if stale:
+                yield sse_event({"text": stale}, "chunk")
+                yield sse_event({"explanation": stale}, "done")
+            else:
+                yield sse_event({"error": "Serviço de explicações ocupado, tente novamente em instantes.", "retry_after": e.retry_after}, "error")
+            return
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            yield sse_event({"error": f"Erro interno: {str(e)}"}, "error")
+            return
+
+        explanation = "".join(parts)
+        # Resposta vazia (ex.: bloqueada pelo provedor) não vai para o cache
+        if explanation:
+            explanation_cache.put(prompt, EXPLAINER_PROMPT_VERSION, 'explainer', explanation)
+        yield sse_event({"explanation": explanation}, "done")
+
+    return sse_response(events())
+
 @explainer_bp.route("/review", methods=["POST"])
 def generate_review():
     data = request.get_json()
@@ -85,59 +101,8 @@ def generate_review():
         return jsonify({"error": "Nenhuma questão fornecida para revisão."}), 400
 
     try:
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        reviews = []
-
-        for question in questions:
-            try:
-                # Inclui o contexto da questão em cada prompt
-                context = f"""
-Contexto da questão:
-Pergunta: {question.get('question')}
-Resposta correta: {question.get('correctAnswer')}
-Resposta do usuário: {question.get('userAnswer')}
-"""
-                
-                # Substitui os placeholders e adiciona contexto
-                explanation_prompt = context + EXPLANATION_PROMPT.replace("[resposta errada]", question.get('userAnswer')).replace("[resposta correta]", question.get('correctAnswer'))
-                vocabulary_prompt = context + VOCABULARY_PROMPT.replace("[termo]", question.get('correctAnswer'))
-
-                # Gera explicação
-                explanation = model.generate_content(explanation_prompt)
-                print(f"Explicação gerada: {explanation.text}")
-
-                # Gera vocabulário
-                vocabulary = model.generate_content(vocabulary_prompt)
-                print(f"Vocabulário gerado: {vocabulary.text}")
-
-
-                # Monta a resposta
-                review = {
-                    "question": question.get('question'),
-                    "correctAnswer": question.get('correctAnswer'),
-                    "userAnswer": question.get('userAnswer'),
-                    "aiExplanation": f"""Explicação
-
-{explanation.text}
-
-Vocabulário
-
-{vocabulary.text}
-"""
-                }
-                print(f"Review montada: {review}")
-                reviews.append(review)
-
-            except Exception as e:
-                print(f"Erro ao processar questão: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                reviews.append({
-                    "question": question.get('question'),
-                    "correctAnswer": question.get('correctAnswer'),
-                    "userAnswer": question.get('userAnswer'),
-                    "aiExplanation": "Desculpe, houve um erro ao gerar a explicação. Por favor, tente novamente."
-                })
+        # Chamadas ao modelo em paralelo, com prazo por requisição
+        reviews = review_generator.generate(questions, llm_client.generate)
 
         print(f"Total de reviews geradas: {len(reviews)}")
         return jsonify({"reviews": reviews})
@@ -147,3 +112,30 @@ Vocabulário
         import traceback
         traceback.print_exc()
         return jsonify({"error": f"Erro interno: {str(e)}"}), 500
+
+@explainer_bp.route("/review/stream", methods=["POST"])
+def stream_review():
+    """
+    Revisão enviada como Server-Sent Events: um evento 'block' para cada
+    explicação ou vocabulário gerado, um evento 'review' (no formato do
+    /review) quando a questão fica completa e 'done' ao final.
+    """
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({"error": "Corpo JSON inválido."}), 400
+    questions = data.get("questions", [])
+
+    if not isinstance(questions, list) or not questions:
+        return jsonify({"error": "Nenhuma questão fornecida para revisão."}), 400
+
+    def events():
+        for result in review_generator.stream(questions, llm_client.generate):
+            if result[0] == 'block':
+                _, index, name, text = result
+                yield sse_event({"index": index, "block": name, "text": text}, "block")
+            else:
+                _, index, review = result
+                yield sse_event({"index": index, "review": review}, "review")
+        yield sse_event({"count": len(questions)}, "done")
+
+    return sse_response(events())
@@ -1,45 +1,98 @@
-from flask import Blueprint, jsonify, request
-from app.models.question import Question
-from app.models import db, User
-import google.generativeai as genai
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from flask import Blueprint, jsonify, request, current_app
+from app.models import db
+from app.services.catalog_service import get_catalog
+from app.services.sampling_service import sample_placement
+from app.services.placement_service import start_session, answer_question, place_from_answers, SessionAlreadyUsed
+from app.utils.jwt_utils import token_required, load_user
+from app.services.quiz_service import grade_answers
+import jwt
 
 placement_bp = Blueprint("nivelamento", __name__, url_prefix="/api/nivelamento")
 
 @placement_bp.route("/", methods=["GET"])
 def get_placement_questions():
-    questions = Question.query.filter(
-        Question.explanation == "BV",
-        Question.category_id.is_(None)
-    ).order_by(db.func.random()).limit(15).all()
+    # Sorteio em memória sobre o conjunto de questões de nivelamento do catálogo
+    stratified = request.args.get("stratified", type=int)
+    if stratified is None:
+        stratified = current_app.config.get("PLACEMENT_STRATIFIED", False)
+    selected = sample_placement(current_app.config.get("PLACEMENT_QUESTION_COUNT", 15), bool(stratified))
 
-    return jsonify([q.to_dict(include_correct=True) for q in questions])
+    # O gabarito só é enviado se PLACEMENT_INCLUDE_ANSWER_KEY estiver ligado;
+    # a correção é feita no servidor (POST /resultado ou /sessao)
+    include_correct = current_app.config.get("PLACEMENT_INCLUDE_ANSWER_KEY", False)
+    return jsonify(get_catalog().questions(selected, include_correct=include_correct))
 
-# POST: Resultado final e gravação do placement_level
+# POST: Corrige as respostas do nivelamento e grava o nível estimado
 @placement_bp.route("/resultado", methods=["POST"])
-def definir_placement_level():
-    data = request.get_json()
-    user_id = data.get("user_id")
+@token_required
+def definir_placement_level(current_user):
+    data = request.get_json(silent=True) or {}
+    answers = data.get("answers")
 
-    if not user_id:
-        return jsonify({"error": "Parâmetro 'user_id' é obrigatório."}), 400
+    if not isinstance(answers, list) or not answers:
+        return jsonify({"error": "Parâmetro 'answers' ({questionId, selectedOption}) é obrigatório."}), 400
 
+    # Respostas brutas ({questionId, selectedOption}) são corrigidas no servidor pelo gabarito em memória
+    graded = grade_answers(answers)
     try:
-        user = User.query.get(user_id)
-        if not user:
-            return jsonify({"error": "Usuário não encontrado."}), 404
+        result = place_from_answers(
+            current_user.id, [(answer["question_id"], str(answer["selected_option"])) for answer in graded]
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+    # Com as respostas enviadas, o gabarito pode ser devolvido para a tela de resultado
+    answer_keys = get_catalog().answer_keys
+    result["respostas"] = [
+        {
+            "question_id": answer["question_id"],
+            "is_correct": answer["is_correct"],
+            "correct_options": list(answer_keys.get(answer["question_id"], ())),
+        }
+        for answer in graded
+    ]
+    result["total"] = len(answers)
+    result["mensagem"] = "Nível atualizado com sucesso."
+    return jsonify(result)
 
-        user.placement_level = "10"  # ou int(10) se o campo for inteiro
-        db.session.commit()
+# POST: Inicia o nivelamento adaptativo (uma questão por vez, corrigida no servidor)
+@placement_bp.route("/sessao", methods=["POST"])
+@token_required
+def iniciar_sessao(current_user):
+    # Garante que o usuário existe (cache do worker); UserNotFound vira 401 em token_required
+    load_user(current_user.id)
 
-        return jsonify({
-            "placement_level": "10",
-            "mensagem": "Nível atualizado com sucesso."
-        })
+    session, question = start_session(current_user.id)
+    if not session:
+        return jsonify({"error": "Nenhuma questão de nivelamento disponível."}), 404
 
+    return jsonify({"session": session, "question": question, "answered": 0, "finished": False})
+
+# POST: Responde a questão atual; retorna a próxima ou o resultado final
+@placement_bp.route("/sessao/resposta", methods=["POST"])
+@token_required
+def responder_sessao(current_user):
+    data = request.get_json() or {}
+    session = data.get("session")
+    question_id = data.get("question_id")
+    selected_option = data.get("selected_option")
+
+    if not session or question_id is None or not isinstance(selected_option, str) or not selected_option:
+        return jsonify({"error": "Parâmetros 'session', 'question_id' e 'selected_option' são obrigatórios."}), 400
+
+    try:
+        return jsonify(answer_question(current_user.id, session, int(question_id), selected_option))
+    except jwt.InvalidTokenError:
+        return jsonify({"error": "Sessão de nivelamento inválida ou expirada."}), 401
+    except SessionAlreadyUsed as e:
+        return jsonify({"error": str(e)}), 409
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
+        db.session.rollback()
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,17 @@
+import hmac
+from flask import Blueprint, jsonify, request, current_app
+from app.utils.metrics import metrics_snapshot
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api')
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Métricas operacionais do worker (filas, latências, caches)"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token:
+        return jsonify({'error': 'Métricas desabilitadas'}), 403
+    provided = request.headers.get('X-Metrics-Token', '')
+    if not hmac.compare_digest(provided.encode('utf-8'), token.encode('utf-8')):
+        return jsonify({'error': 'Não autorizado'}), 401
+
+    return jsonify(metrics_snapshot()), 200
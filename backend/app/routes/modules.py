@@ -1,8 +1,7 @@
 from flask import Blueprint, jsonify, request
 from app.services.module_service import get_all_modules, get_module_by_id
+from app.services.progress_service import get_progress_for_category
 from app.utils.jwt_utils import token_required
-from app.models.question import Question
-from app.models.user_answer import UserAnswer
 from app import db
 
 modules_bp = Blueprint('modules', __name__)
@@ -30,29 +29,16 @@ def get_module(current_user, module_id):
 def get_category_progress(current_user, module_id, category_id):
     user_id = current_user.id
     
-    # Busca todas as questões da categoria
-    questions = Question.query.filter_by(category_id=category_id).all()
-    total_questions = len(questions)
-    
-    if total_questions == 0:
-        return jsonify({'progress': 0}), 200
-    
-    # Busca as questões que o usuário respondeu corretamente
-    user_answers = UserAnswer.query.filter(
-        UserAnswer.user_id == user_id,
-        UserAnswer.is_correct == True,
-        UserAnswer.question_id.in_([q.id for q in questions])
-    ).all()
-    
-    correct_answers = len(user_answers)
-    
-    # Calcula o progresso como porcentagem
-    progress = round((correct_answers / total_questions) * 100)
+    # Lê o progresso materializado, sem recontar o histórico de respostas
+    progress = get_progress_for_category(user_id, category_id)
     
     return jsonify({'progress': progress}), 200
 
 @modules_bp.route('/debug/user-answers/<int:user_id>/<int:category_id>', methods=['GET'])
 def debug_user_answers(user_id, category_id):
+    from app.models.question import Question
+    from app.models.user_answer import UserAnswer
+
     # Busca todas as questões da categoria
     questions = Question.query.filter_by(category_id=category_id).all()
     question_ids = [q.id for q in questions]
@@ -74,6 +60,9 @@ def debug_user_answers(user_id, category_id):
 
 @modules_bp.route('/debug/check-tables/<int:user_id>/<int:category_id>', methods=['GET'])
 def debug_check_tables(user_id, category_id):
+    from app.models.question import Question
+    from app.models.user_answer import UserAnswer
+
     # Busca todas as questões da categoria
     questions = Question.query.filter_by(category_id=category_id).all()
     
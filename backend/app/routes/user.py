@@ -1,19 +1,25 @@
 from flask import Blueprint, jsonify, request
 from app.models.user import User
-from app.models.user_progress import UserProgress
 from app import db
-from app.utils.jwt_utils import token_required
+from app.utils.jwt_utils import token_required, invalidate_user
+from app.services.progress_service import get_completion_counts
 
 user_bp = Blueprint('user', __name__)
 
+def user_level(user):
+    """Nível (1 a 5) estimado no nivelamento; 1 se o usuário ainda não fez o teste"""
+    if user.placement_result:
+        return user.placement_result
+    # Contas antigas guardavam '10' (nivelamento concluído, sem nível estimado)
+    level = user.placement_level
+    return int(level) if level and level.isdigit() and 1 <= int(level) <= 5 else 1
+
 @user_bp.route('/user/profile', methods=['GET'])
 @token_required
 def get_profile(current_user):
     # Calcula completedModules e completedLessons
-    completed_modules = UserProgress.query.filter_by(user_id=current_user.id).filter(UserProgress.progress >= 100).count()
-    completed_lessons = UserProgress.query.filter_by(user_id=current_user.id).count()
-    # Exemplo de level e points (ajuste conforme sua lógica)
-    level = current_user.placement_level or 1
+    completed_modules, completed_lessons = get_completion_counts(current_user.id)
+    level = user_level(current_user)
     points = 0  # Implemente sua lógica de pontos se desejar
 
     return jsonify({
@@ -32,13 +38,16 @@ def get_profile(current_user):
 @token_required
 def update_profile(current_user):
     data = request.get_json()
+    current_user = db.session.get(User, current_user.id)
+    if not current_user:
+        return jsonify({'message': 'Usuário não encontrado'}), 401
     if "name" in data:
         current_user.username = data["name"]
     db.session.commit()
+    invalidate_user(current_user.id)
     # Retorne o perfil atualizado no mesmo formato do GET
-    completed_modules = UserProgress.query.filter_by(user_id=current_user.id).filter(UserProgress.progress >= 100).count()
-    completed_lessons = UserProgress.query.filter_by(user_id=current_user.id).count()
-    level = current_user.placement_level or 1
+    completed_modules, completed_lessons = get_completion_counts(current_user.id)
+    level = user_level(current_user)
     points = 0
     return jsonify({
         "id": current_user.id,
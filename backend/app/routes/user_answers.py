@@ -1,16 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.models import UserAnswer, Question
 from app import db
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.answer_buffer import answer_buffer, normalize_answer_row
+from app.services.answer_sync_service import sync_answers, read_lines, LineTooLong
+from app.utils.jwt_utils import token_required
 
 bp = Blueprint('user_answers', __name__)
 
 @bp.route('/user-answers', methods=['POST'])
-@jwt_required()
-def create_user_answer():
+@token_required
+def create_user_answer(current_user):
     try:
         data = request.get_json()
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         question_id = data.get('question_id')
         answer = data.get('answer')
         is_correct = data.get('is_correct')
@@ -23,13 +25,22 @@ def create_user_answer():
         if not question:
             return jsonify({'error': 'Question not found'}), 404
             
+        try:
+            row = normalize_answer_row({
+                'user_id': user_id,
+                'question_id': question_id,
+                'answer': answer,
+                'is_correct': is_correct
+            })
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Com o modo write-behind, a resposta é gravada em lote em segundo plano
+        if answer_buffer.submit(user_id, [row], update_progress=False):
+            return jsonify(row), 202
+            
         # Criar nova resposta
-        user_answer = UserAnswer(
-            user_id=user_id,
-            question_id=question_id,
-            answer=answer,
-            is_correct=is_correct
-        )
+        user_answer = UserAnswer(**row)
         
         db.session.add(user_answer)
         db.session.commit()
@@ -40,11 +51,46 @@ def create_user_answer():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@bp.route('/user-answers/sync', methods=['POST'])
+@token_required
+def sync_user_answers(current_user):
+    """
+    Sincroniza em lote as respostas feitas offline. O corpo é um fluxo NDJSON
+    (uma resposta {"question_id", "answer"} por linha), lido linha a linha e
+    gravado em blocos de ANSWER_SYNC_CHUNK_SIZE respostas. Linhas maiores
+    que ANSWER_SYNC_MAX_LINE_LENGTH bytes encerram a sincronização com 413.
+    """
+    user_id = current_user.id
+    chunk_size = current_app.config.get('ANSWER_SYNC_CHUNK_SIZE', 1000)
+    lines = read_lines(request.stream, current_app.config.get('ANSWER_SYNC_MAX_LINE_LENGTH', 4096))
+
+    # Os blocos já confirmados continuam gravados em caso de erro; o cliente
+    # pode reenviar a partir do primeiro bloco que não consta no resumo
+    chunks = []
+    try:
+        for summary in sync_answers(user_id, lines, chunk_size):
+            chunks.append(summary)
+    except LineTooLong as e:
+        db.session.rollback()
+        return jsonify({'error': str(e), 'chunks': chunks}), 413
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Erro ao sincronizar respostas do usuário %s', user_id)
+        return jsonify({'error': str(e), 'chunks': chunks}), 500
+
+    return jsonify({
+        'chunks': chunks,
+        'received': sum(c['received'] for c in chunks),
+        'inserted': sum(c['inserted'] for c in chunks),
+        'correct': sum(c['correct'] for c in chunks),
+        'invalid': sum(c['invalid'] for c in chunks)
+    }), 200
+
 @bp.route('/user-answers', methods=['GET'])
-@jwt_required()
-def get_user_answers():
+@token_required
+def get_user_answers(current_user):
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         user_answers = UserAnswer.query.filter_by(user_id=user_id).all()
         
         return jsonify([answer.to_dict() for answer in user_answers]), 200
@@ -53,10 +99,10 @@ def get_user_answers():
         return jsonify({'error': str(e)}), 500
 
 @bp.route('/user-answers/<int:answer_id>', methods=['GET'])
-@jwt_required()
-def get_user_answer(answer_id):
+@token_required
+def get_user_answer(current_user, answer_id):
     try:
-        user_id = get_jwt_identity()
+        user_id = current_user.id
         user_answer = UserAnswer.query.filter_by(id=answer_id, user_id=user_id).first()
         
         if not user_answer:
@@ -0,0 +1,260 @@
+import atexit
+import os
+import queue
+import signal
+import threading
+import time
+import traceback
+from app import db
+from app.models.user_answer import MAX_ANSWER_LENGTH
+from app.utils.metrics import LatencyStats, register_metrics
+
+def normalize_answer_row(row):
+    """
+    Valida e converte uma resposta (user_id, question_id, answer, is_correct)
+    para os tipos das colunas de user_answers. Levanta ValueError se algum
+    campo for inválido, para que a resposta seja recusada antes de entrar
+    no lote.
+    """
+    try:
+        user_id = int(row['user_id'])
+        question_id = int(row['question_id'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('user_id e question_id devem ser inteiros')
+    if isinstance(row.get('user_id'), bool) or isinstance(row.get('question_id'), bool):
+        raise ValueError('user_id e question_id devem ser inteiros')
+
+    answer = row.get('answer')
+    if isinstance(answer, (int, float)) and not isinstance(answer, bool):
+        answer = str(answer)
+    if not isinstance(answer, str) or not answer or len(answer) > MAX_ANSWER_LENGTH:
+        raise ValueError(f'answer deve ser um texto de 1 a {MAX_ANSWER_LENGTH} caracteres')
+
+    is_correct = row.get('is_correct')
+    if not isinstance(is_correct, bool):
+        if is_correct in (0, 1) and isinstance(is_correct, int):
+            is_correct = bool(is_correct)
+        else:
+            raise ValueError('is_correct deve ser booleano')
+
+    return {'user_id': user_id, 'question_id': question_id, 'answer': answer, 'is_correct': is_correct}
+
+class AnswerWriteBuffer:
+    """
+    Buffer de escrita assíncrona (write-behind) das respostas dos usuários.
+
+    As submissões entram em uma fila limitada e uma thread em segundo plano
+    as grava em lote (INSERT de várias linhas + atualização do progresso)
+    quando o lote atinge ANSWER_BUFFER_BATCH_SIZE respostas ou a submissão
+    mais antiga passa de ANSWER_BUFFER_MAX_AGE segundos. A fila é esvaziada
+    no encerramento do processo (atexit e SIGTERM).
+
+    Se o modo estiver desligado ou a fila estiver cheia, submit() retorna
+    False e quem chamou deve gravar as respostas de forma síncrona.
+
+    Se a gravação do lote falhar, as submissões são regravadas uma a uma,
+    para que uma submissão problemática não derrube as demais.
+    """
+
+    # Tentativas de gravação de uma submissão antes de descartá-la
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self._queue = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        # Submissões que falharam, com o número de tentativas: [(tentativas, submissão)]
+        self._retry = []
+        self._exit_hooks_installed = False
+        self.flush_latency = LatencyStats()
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed_rows = 0
+        self.failed_batches = 0
+        self.dropped_rows = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('ANSWER_WRITE_BEHIND', False)
+        self.batch_size = app.config.get('ANSWER_BUFFER_BATCH_SIZE', 500)
+        self.max_age = app.config.get('ANSWER_BUFFER_MAX_AGE', 1.0)
+        self._queue = queue.Queue(maxsize=app.config.get('ANSWER_BUFFER_MAX_SIZE', 10000))
+        app.extensions['answer_buffer'] = self
+        register_metrics(app, 'answer_buffer', self.stats)
+
+        if self.enabled and not self._exit_hooks_installed:
+            atexit.register(self.shutdown)
+            self._install_sigterm_handler()
+            self._exit_hooks_installed = True
+
+    def _install_sigterm_handler(self):
+        # Sinais só podem ser configurados na thread principal
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def handle_sigterm(signum, frame):
+            self.shutdown()
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                os.kill(os.getpid(), signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+    def _ensure_started(self):
+        # A thread é iniciada na primeira submissão, já dentro do worker
+        # (após o fork de servidores como o gunicorn)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='answer-write-behind', daemon=True)
+                self._thread.start()
+
+    def submit(self, user_id, answer_rows, update_progress=True):
+        """
+        Enfileira as respostas de uma submissão. Retorna False se o modo
+        write-behind estiver desligado ou se a fila estiver cheia. Levanta
+        ValueError se alguma resposta for inválida (ver normalize_answer_row).
+        """
+        if not self.enabled or self._stop.is_set():
+            return False
+
+        answer_rows = [normalize_answer_row(row) for row in answer_rows]
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.monotonic(), user_id, answer_rows, update_progress))
+        except queue.Full:
+            self.rejected += 1
+            return False
+
+        self.enqueued += 1
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=self.max_age)
+            except queue.Empty:
+                continue
+
+            batch = [item]
+            deadline = item[0] + self.max_age
+            rows = len(item[2])
+
+            # Acumula até atingir o tamanho do lote ou a idade máxima
+            while rows < self.batch_size and not self._stop.is_set():
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                rows += len(item[2])
+
+            self._write(batch)
+
+    def flush(self):
+        """Grava imediatamente todas as submissões que estiverem na fila"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return self._write(batch)
+
+    def _write_submissions(self, submissions):
+        """Grava as submissões em uma única transação; levanta a exceção se falhar"""
+        from app.services.quiz_service import insert_answers, apply_progress
+
+        with self.app.app_context():
+            try:
+                insert_answers([row for _, _, answer_rows, _ in submissions for row in answer_rows])
+                for _, user_id, answer_rows, update_progress in submissions:
+                    if update_progress:
+                        apply_progress(user_id, answer_rows)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+    def _failed(self, attempts, submission, error):
+        rows = len(submission[2])
+        print(f"Erro ao gravar submissão de respostas ({rows} respostas, tentativa {attempts}): {error}")
+        if attempts >= self.MAX_ATTEMPTS:
+            self.dropped_rows += rows
+        else:
+            self._retry.append((attempts, submission))
+
+    def _write(self, batch):
+        with self._flush_lock:
+            # Submissões que falharam antes são regravadas junto com as novas
+            pending = self._retry + [(0, submission) for submission in batch]
+            self._retry = []
+            if not pending:
+                return 0
+
+            submissions = [submission for _, submission in pending]
+            start = time.perf_counter()
+            try:
+                self._write_submissions(submissions)
+                written = sum(len(submission[2]) for submission in submissions)
+            except Exception as e:
+                self.failed_batches += 1
+                print(f"Erro ao gravar lote de respostas ({len(submissions)} submissões): {e}")
+                traceback.print_exc()
+                if len(pending) == 1:
+                    self._failed(pending[0][0] + 1, pending[0][1], e)
+                    return 0
+
+                # Regrava uma submissão por vez para isolar as que falham
+                written = 0
+                for attempts, submission in pending:
+                    try:
+                        self._write_submissions([submission])
+                        written += len(submission[2])
+                    except Exception as e:
+                        self._failed(attempts + 1, submission, e)
+
+            self.flush_latency.record(time.perf_counter() - start)
+            self.flushed_rows += written
+            return written
+
+    def shutdown(self):
+        """Interrompe a thread de gravação e grava o que estiver na fila"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=max(self.max_age * 2, 5))
+        self.flush()
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'retry_rows': sum(len(submission[2]) for _, submission in self._retry),
+            'enqueued': self.enqueued,
+            'rejected': self.rejected,
+            'flushed_rows': self.flushed_rows,
+            'failed_batches': self.failed_batches,
+            'dropped_rows': self.dropped_rows,
+            'flush_latency': self.flush_latency.snapshot()
+        }
+
+answer_buffer = AnswerWriteBuffer()
@@ -0,0 +1,95 @@
+import json
+from app import db
+from app.models.user_answer import MAX_ANSWER_LENGTH
+from app.services.catalog_service import get_catalog
+from app.services.quiz_service import _as_question_id, insert_answers, apply_progress
+
+class LineTooLong(ValueError):
+    """Linha do fluxo NDJSON maior que o limite configurado"""
+
+def read_lines(stream, max_line_length):
+    """
+    Lê o fluxo linha a linha sem carregar mais de max_line_length bytes por
+    linha. Levanta LineTooLong se uma linha passar do limite.
+    """
+    while True:
+        line = stream.readline(max_line_length + 1)
+        if not line:
+            return
+        if len(line) > max_line_length and not line.endswith(b'\n'):
+            raise LineTooLong(f'Linha maior que {max_line_length} bytes')
+        yield line
+
+def parse_answer_line(line, catalog):
+    """
+    Converte uma linha NDJSON em (question_id, answer), aceitando os formatos
+    {'question_id', 'answer'} e {'questionId', 'selectedOption'}.
+    Retorna None se a linha for inválida ou a questão não existir.
+    """
+    try:
+        data = json.loads(line)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if not isinstance(data, dict):
+        return None
+
+    question_id = _as_question_id(data.get('question_id', data.get('questionId')))
+    answer = data.get('answer', data.get('selectedOption'))
+    if not isinstance(answer, str) or not answer or len(answer) > MAX_ANSWER_LENGTH:
+        return None
+    if not catalog.has_question(question_id):
+        return None
+    return question_id, answer
+
+def sync_answers(user_id, lines, chunk_size=1000):
+    """
+    Grava um fluxo de respostas (uma resposta JSON por linha) em blocos de
+    chunk_size respostas. As respostas são corrigidas pelo gabarito em memória
+    (o is_correct enviado pelo cliente é ignorado) e cada bloco é gravado e
+    confirmado em uma transação própria, junto com o progresso do usuário.
+
+    Consome as linhas sob demanda e gera um resumo por bloco gravado.
+    """
+    catalog = get_catalog()
+    chunk = 0
+    rows = []
+    received = invalid = 0
+
+    def write_chunk():
+        insert_answers(rows)
+        apply_progress(user_id, rows, count_quiz=False)
+        db.session.commit()
+        return {
+            'chunk': chunk,
+            'received': received,
+            'inserted': len(rows),
+            'correct': sum(1 for row in rows if row['is_correct']),
+            'invalid': invalid
+        }
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        received += 1
+        parsed = parse_answer_line(line, catalog)
+        if parsed is None:
+            invalid += 1
+        else:
+            question_id, answer = parsed
+            rows.append({
+                'user_id': user_id,
+                'question_id': question_id,
+                'answer': answer,
+                'is_correct': catalog.is_correct(question_id, answer)
+            })
+
+        if received == chunk_size:
+            yield write_chunk()
+            chunk += 1
+            rows = []
+            received = invalid = 0
+
+    if received:
+        yield write_chunk()
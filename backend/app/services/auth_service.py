@@ -1,16 +1,15 @@
-import bcrypt
 from app import db
 from app.models.user import User
+from app.services.password_pool import password_pool
 from app.utils.jwt_utils import generate_token
 
 def hash_password(password):
-    """Cria um hash da senha usando bcrypt"""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    """Cria um hash da senha usando bcrypt (no pool de processos)"""
+    return password_pool.hash(password)
 
 def check_password(password, hashed_password):
-    """Verifica se a senha corresponde ao hash"""
-    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    """Verifica se a senha corresponde ao hash (no pool de processos)"""
+    return password_pool.check(password, hashed_password)
 
 def register_user(username, email, password):
     """Registra um novo usuário"""
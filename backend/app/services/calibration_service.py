@@ -0,0 +1,276 @@
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from flask import current_app
+from sqlalchemy import select, insert, update, delete
+from app import db
+from app.models.user_answer import UserAnswer
+from app.models.calibration import QuestionDifficulty, UserAbility, CalibrationState
+
+# Precisão da priori normal N(0, 1) de habilidades e dificuldades (regulariza
+# usuários e questões com poucas respostas e fixa a escala do modelo)
+PRIOR_PRECISION = 1.0
+
+# Linhas lidas do banco / gravadas por comando
+READ_BATCH_SIZE = 200_000
+WRITE_BATCH_SIZE = 10_000
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+def fit_rasch(users, questions, correct, n_users, n_questions, max_iter=50, tol=1e-3):
+    """
+    Ajusta o modelo de Rasch P(acerto) = sigmoid(habilidade - dificuldade)
+    por máxima verossimilhança conjunta com priori N(0, 1), usando passos de
+    Newton vetorizados (np.bincount) sobre todas as respostas.
+
+    users e questions são índices densos (0..n-1); correct é 0/1.
+    Retorna (habilidade, informação dos usuários, dificuldade, informação
+    das questões, iterações).
+    """
+    theta = np.zeros(n_users)
+    b = np.zeros(n_questions)
+    y = correct.astype(np.float64)
+
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        p = _sigmoid(theta[users] - b[questions])
+        residual = y - p
+        weight = p * (1.0 - p)
+
+        info_theta = np.bincount(users, weight, n_users) + PRIOR_PRECISION
+        step_theta = (np.bincount(users, residual, n_users) - PRIOR_PRECISION * theta) / info_theta
+        theta += step_theta
+
+        p = _sigmoid(theta[users] - b[questions])
+        residual = y - p
+        weight = p * (1.0 - p)
+
+        info_b = np.bincount(questions, weight, n_questions) + PRIOR_PRECISION
+        step_b = (-np.bincount(questions, residual, n_questions) - PRIOR_PRECISION * b) / info_b
+        b += step_b
+
+        if max(np.abs(step_theta).max(initial=0), np.abs(step_b).max(initial=0)) < tol:
+            break
+
+    return theta, info_theta, b, info_b, iterations
+
+def update_rasch(theta, info_theta, b, info_b, users, questions, correct):
+    """
+    Atualização incremental (estilo Elo) com as respostas novas: um passo de
+    Newton por usuário e por questão, ponderado pela informação acumulada.
+    Altera os arrays recebidos.
+    """
+    y = correct.astype(np.float64)
+    p = _sigmoid(theta[users] - b[questions])
+    residual = y - p
+    weight = p * (1.0 - p)
+
+    info_theta += np.bincount(users, weight, theta.size)
+    theta += np.bincount(users, residual, theta.size) / info_theta
+
+    info_b += np.bincount(questions, weight, b.size)
+    b -= np.bincount(questions, residual, b.size) / info_b
+
+def load_answers(after_id=0):
+    """
+    Lê as respostas com id > after_id em lotes, direto para arrays.
+    Retorna (ids, user_ids, question_ids, correct).
+    """
+    stmt = select(
+        UserAnswer.id, UserAnswer.user_id, UserAnswer.question_id, UserAnswer.is_correct
+    ).where(UserAnswer.id > after_id).order_by(UserAnswer.id)
+
+    parts = []
+    result = db.session.execute(stmt.execution_options(yield_per=READ_BATCH_SIZE))
+    for rows in result.partitions():
+        parts.append(np.array(rows, dtype=np.int64))
+
+    if not parts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty.astype(np.int8)
+
+    data = np.concatenate(parts)
+    return data[:, 0], data[:, 1], data[:, 2], data[:, 3].astype(np.int8)
+
+def _write(model, rows):
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        db.session.execute(insert(model), rows[start:start + WRITE_BATCH_SIZE])
+
+def _update(model, rows):
+    for start in range(0, len(rows), WRITE_BATCH_SIZE):
+        db.session.execute(update(model), rows[start:start + WRITE_BATCH_SIZE])
+
+def _rows(key, ids, values, info, counts, value_name):
+    now = datetime.utcnow()
+    return [
+        {key: i, value_name: v, 'information': w, 'answer_count': n, 'updated_at': now}
+        for i, v, w, n in zip(ids.tolist(), values.tolist(), info.tolist(), counts.tolist())
+    ]
+
+def run_full_calibration(state):
+    """Recalibra habilidades e dificuldades com todo o histórico de respostas"""
+    answer_ids, user_ids, question_ids, correct = load_answers()
+
+    user_keys, users = np.unique(user_ids, return_inverse=True)
+    question_keys, questions = np.unique(question_ids, return_inverse=True)
+    theta, info_theta, b, info_b, iterations = fit_rasch(
+        users, questions, correct, user_keys.size, question_keys.size
+    )
+
+    db.session.execute(delete(UserAbility))
+    db.session.execute(delete(QuestionDifficulty))
+    _write(UserAbility, _rows(
+        'user_id', user_keys, theta, info_theta,
+        np.bincount(users, minlength=user_keys.size), 'ability'
+    ))
+    _write(QuestionDifficulty, _rows(
+        'question_id', question_keys, b, info_b,
+        np.bincount(questions, minlength=question_keys.size), 'difficulty'
+    ))
+
+    if answer_ids.size:
+        state.last_answer_id = int(answer_ids[-1])
+    state.full_run_at = datetime.utcnow()
+    return {
+        'mode': 'full',
+        'answers': int(answer_ids.size),
+        'users': int(user_keys.size),
+        'questions': int(question_keys.size),
+        'iterations': iterations
+    }
+
+def _load_params(model, key_column, value_column, keys):
+    """Carrega (valor, informação, contagem) das chaves informadas; ausentes ficam na priori"""
+    values = np.zeros(keys.size)
+    info = np.full(keys.size, PRIOR_PRECISION)
+    counts = np.zeros(keys.size, dtype=np.int64)
+    exists = np.zeros(keys.size, dtype=bool)
+
+    for start in range(0, keys.size, WRITE_BATCH_SIZE):
+        chunk = keys[start:start + WRITE_BATCH_SIZE].tolist()
+        rows = db.session.execute(
+            select(key_column, value_column, model.information, model.answer_count)
+            .where(key_column.in_(chunk))
+        ).all()
+        if not rows:
+            continue
+        data = np.array(rows, dtype=np.float64)
+        positions = np.searchsorted(keys, data[:, 0].astype(np.int64))
+        values[positions] = data[:, 1]
+        info[positions] = np.maximum(data[:, 2], PRIOR_PRECISION)
+        counts[positions] = data[:, 3].astype(np.int64)
+        exists[positions] = True
+
+    return values, info, counts, exists
+
+def run_incremental_calibration(state):
+    """Atualiza habilidades e dificuldades apenas com as respostas novas"""
+    answer_ids, user_ids, question_ids, correct = load_answers(state.last_answer_id)
+    if not answer_ids.size:
+        return {'mode': 'incremental', 'answers': 0, 'users': 0, 'questions': 0, 'iterations': 0}
+
+    user_keys, users = np.unique(user_ids, return_inverse=True)
+    question_keys, questions = np.unique(question_ids, return_inverse=True)
+
+    theta, info_theta, user_counts, user_exists = _load_params(
+        UserAbility, UserAbility.user_id, UserAbility.ability, user_keys
+    )
+    b, info_b, question_counts, question_exists = _load_params(
+        QuestionDifficulty, QuestionDifficulty.question_id, QuestionDifficulty.difficulty, question_keys
+    )
+    update_rasch(theta, info_theta, b, info_b, users, questions, correct)
+    user_counts += np.bincount(users, minlength=user_keys.size)
+    question_counts += np.bincount(questions, minlength=question_keys.size)
+
+    user_rows = _rows('user_id', user_keys, theta, info_theta, user_counts, 'ability')
+    question_rows = _rows('question_id', question_keys, b, info_b, question_counts, 'difficulty')
+    _update(UserAbility, [row for row, exists in zip(user_rows, user_exists) if exists])
+    _write(UserAbility, [row for row, exists in zip(user_rows, user_exists) if not exists])
+    _update(QuestionDifficulty, [row for row, exists in zip(question_rows, question_exists) if exists])
+    _write(QuestionDifficulty, [row for row, exists in zip(question_rows, question_exists) if not exists])
+
+    state.last_answer_id = int(answer_ids[-1])
+    return {
+        'mode': 'incremental',
+        'answers': int(answer_ids.size),
+        'users': int(user_keys.size),
+        'questions': int(question_keys.size),
+        'iterations': 1
+    }
+
+def run_calibration(full=False):
+    """
+    Executa a calibração e faz commit. Sem full, processa apenas as respostas
+    gravadas desde a última execução (a primeira execução é sempre completa).
+    Retorna um resumo da execução.
+    """
+    start = time.perf_counter()
+    state = CalibrationState.get()
+    if full or not state.full_run_at:
+        summary = run_full_calibration(state)
+    else:
+        summary = run_incremental_calibration(state)
+
+    state.version = (state.version or 0) + 1
+    db.session.commit()
+    summary['seconds'] = round(time.perf_counter() - start, 2)
+    return summary
+
+def get_difficulties():
+    """
+    Retorna as dificuldades calibradas em um array indexado por question_id
+    (NaN para questões sem calibração), carregado uma vez por worker e
+    recarregado quando a versão da calibração muda (conferida no máximo a
+    cada CONTENT_VERSION_CHECK_INTERVAL segundos).
+    """
+    state = current_app.extensions.setdefault('calibration', {
+        'version': None,
+        'difficulties': None,
+        'checked_at': 0.0,
+        'lock': threading.Lock()
+    })
+    interval = current_app.config.get('CONTENT_VERSION_CHECK_INTERVAL', 30)
+
+    if state['difficulties'] is not None and time.monotonic() - state['checked_at'] < interval:
+        return state['difficulties']
+
+    with state['lock']:
+        if state['difficulties'] is not None and time.monotonic() - state['checked_at'] < interval:
+            return state['difficulties']
+
+        version = CalibrationState.current_version()
+        if state['difficulties'] is None or state['version'] != version:
+            rows = db.session.execute(
+                select(QuestionDifficulty.question_id, QuestionDifficulty.difficulty)
+            ).all()
+            data = np.array(rows, dtype=np.float64).reshape(-1, 2)
+            ids = data[:, 0].astype(np.int64)
+            difficulties = np.full(int(ids.max(initial=-1)) + 1, np.nan)
+            difficulties[ids] = data[:, 1]
+            difficulties.setflags(write=False)
+            state['difficulties'] = difficulties
+            state['version'] = version
+        state['checked_at'] = time.monotonic()
+        return state['difficulties']
+
+def get_user_ability(user_id):
+    """Retorna a habilidade calibrada do usuário (None se ainda não calibrada)"""
+    return db.session.query(UserAbility.ability).filter_by(user_id=user_id).scalar()
+
+def selection_weights(question_ids, ability):
+    """
+    Pesos de sorteio das questões para um usuário com a habilidade informada:
+    a informação de Fisher p(1-p), máxima para questões de dificuldade
+    próxima da habilidade. Questões sem calibração recebem o peso máximo.
+    """
+    difficulties = get_difficulties()
+    b = np.full(question_ids.size, np.nan)
+    known = question_ids < difficulties.size
+    b[known] = difficulties[question_ids[known]]
+
+    p = _sigmoid(ability - b)
+    weights = np.where(np.isnan(b), 0.25, p * (1.0 - p))
+    weights = np.maximum(weights, 1e-6)
+    return weights / weights.sum()
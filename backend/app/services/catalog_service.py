@@ -0,0 +1,203 @@
+import threading
+import time
+import numpy as np
+from cachetools import LRUCache
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from app.models.category import Category
+from app.models.content_version import ContentVersion
+from app.models.module import Module
+from app.models.question import Question
+from app.utils.http_cache import encode_json
+
+EMPTY_IDS = np.empty(0, dtype=np.int64)
+
+# Máximo de respostas serializadas guardadas por versão do catálogo
+ENCODED_CACHE_SIZE = 2048
+
+def _as_ids(ids):
+    """Converte uma lista de IDs em array ordenado (somente leitura)"""
+    array = np.array(sorted(ids), dtype=np.int64)
+    array.setflags(write=False)
+    return array
+
+class ContentCatalog:
+    """
+    Snapshot imutável do conteúdo (módulos, categorias, questões e opções)
+    de uma versão do conteúdo. Os payloads das questões são montados uma
+    única vez e compartilhados entre as requisições: não devem ser alterados.
+    """
+
+    def __init__(self, version, modules, categories, questions):
+        self.version = version
+
+        # Módulos e categorias
+        self.modules = {m.id: {'id': m.id, 'title': m.title} for m in modules}
+        self.categories = {c.id: {'id': c.id, 'name': c.name, 'module_id': c.module_id} for c in categories}
+
+        module_categories = {m.id: [] for m in modules}
+        for c in categories:
+            module_categories.setdefault(c.module_id, []).append(c.id)
+        self.module_categories = {mid: sorted(cids) for mid, cids in module_categories.items()}
+
+        # Payloads das questões, com e sem a indicação da opção correta
+        self.payloads = {}
+        self.payloads_with_correct = {}
+
+        # Gabarito: question_id -> opções corretas (tupla de option_id)
+        self.answer_keys = {}
+
+        # Explicações guardadas: (enunciado, texto de uma opção correta) -> explicação
+        self.explanations = {}
+
+        by_category = {}
+        by_level = {}
+        by_module_level = {}
+        placement = []
+        placement_by_level = {}
+        for q in questions:
+            self.payloads[q.id] = q.to_dict(include_correct=False)
+            self.payloads_with_correct[q.id] = q.to_dict(include_correct=True)
+            self.answer_keys[q.id] = tuple(o.option_id for o in q.options if o.is_correct)
+            if q.explanation and not q.is_placement:
+                for o in q.options:
+                    if o.is_correct:
+                        self.explanations.setdefault((q.question, o.text), q.explanation)
+
+            if q.category_id is not None:
+                by_category.setdefault(q.category_id, []).append(q.id)
+                category = self.categories.get(q.category_id)
+                if category:
+                    by_module_level.setdefault((category['module_id'], q.level), []).append(q.id)
+            by_level.setdefault(q.level, []).append(q.id)
+            if q.is_placement:
+                placement.append(q.id)
+                placement_by_level.setdefault(q.level, []).append(q.id)
+
+        # Índices em arrays: categoria, módulo (questões das categorias do módulo),
+        # nível e (módulo, nível)
+        self.all_ids = _as_ids(self.payloads.keys())
+        self.by_category = {cid: _as_ids(ids) for cid, ids in by_category.items()}
+        self.by_module = {
+            mid: _as_ids(qid for cid in cids for qid in by_category.get(cid, []))
+            for mid, cids in self.module_categories.items()
+        }
+        self.by_level = {level: _as_ids(ids) for level, ids in by_level.items()}
+        self.by_module_level = {key: _as_ids(ids) for key, ids in by_module_level.items()}
+        self.placement_ids = _as_ids(placement)
+        self.placement_by_level = {level: _as_ids(ids) for level, ids in sorted(placement_by_level.items())}
+
+        # Máscaras (bitsets) de questões por categoria e por módulo
+        self.category_masks = {cid: self._mask(ids) for cid, ids in self.by_category.items()}
+        for cid in self.categories:
+            self.category_masks.setdefault(cid, 0)
+        self.module_masks = {mid: self._mask(ids) for mid, ids in self.by_module.items()}
+
+        # Respostas JSON já serializadas, por chave (conjunto de questões, variante)
+        self._encoded = LRUCache(maxsize=ENCODED_CACHE_SIZE)
+        self._encoded_lock = threading.Lock()
+
+    @staticmethod
+    def _mask(ids):
+        mask = 0
+        for question_id in ids.tolist():
+            mask |= 1 << question_id
+        return mask
+
+    def has_question(self, question_id):
+        return question_id in self.payloads
+
+    def is_correct(self, question_id, option_id):
+        """Corrige uma resposta pelo gabarito em memória"""
+        return option_id in self.answer_keys.get(question_id, ())
+
+    def stored_explanation(self, question, correct_answer):
+        """Explicação guardada para o enunciado e a resposta correta informados (ou None)"""
+        return self.explanations.get((question, correct_answer))
+
+    def question_module_id(self, question_id):
+        """Módulo da categoria da questão (None para questões sem categoria)"""
+        category = self.categories.get(self.payloads[question_id]['category_id'])
+        return category['module_id'] if category else None
+
+    def category_ids(self, category_id):
+        return self.by_category.get(category_id, EMPTY_IDS)
+
+    def module_ids(self, module_id):
+        return self.by_module.get(module_id, EMPTY_IDS)
+
+    def level_ids(self, level):
+        return self.by_level.get(level, EMPTY_IDS)
+
+    def module_level_ids(self, module_id, level):
+        return self.by_module_level.get((module_id, level), EMPTY_IDS)
+
+    def encoded(self, key, build):
+        """
+        Retorna (bytes, etag) da resposta identificada por key, serializada
+        uma única vez por versão do conteúdo. build() monta o payload na
+        primeira chamada; se retornar vazio, nada é guardado e retorna None.
+        """
+        with self._encoded_lock:
+            cached = self._encoded.get(key)
+        if cached is not None:
+            return cached
+
+        payload = build()
+        if not payload:
+            return None
+
+        cached = encode_json(payload)
+        with self._encoded_lock:
+            self._encoded[key] = cached
+        return cached
+
+    def questions(self, ids, include_correct=False):
+        """Retorna os payloads das questões, na ordem dos IDs informados"""
+        payloads = self.payloads_with_correct if include_correct else self.payloads
+        return [payloads[question_id] for question_id in np.asarray(ids).tolist()]
+
+def build_catalog(version):
+    """Carrega todo o conteúdo do banco (3 consultas) e monta o catálogo"""
+    modules = Module.query.order_by(Module.id).all()
+    categories = Category.query.order_by(Category.id).all()
+    questions = Question.query.options(
+        selectinload(Question.options)
+    ).order_by(Question.id).all()
+    return ContentCatalog(version, modules, categories, questions)
+
+def get_catalog():
+    """
+    Retorna o catálogo de conteúdo do worker, carregado uma única vez.
+    A versão do conteúdo é conferida no banco no máximo a cada
+    CONTENT_VERSION_CHECK_INTERVAL segundos; se mudou, o catálogo é recarregado.
+    """
+    state = current_app.extensions.setdefault('content_catalog', {
+        'catalog': None,
+        'checked_at': 0.0,
+        'lock': threading.Lock()
+    })
+    interval = current_app.config.get('CONTENT_VERSION_CHECK_INTERVAL', 30)
+
+    catalog = state['catalog']
+    if catalog is not None and time.monotonic() - state['checked_at'] < interval:
+        return catalog
+
+    with state['lock']:
+        catalog = state['catalog']
+        if catalog is not None and time.monotonic() - state['checked_at'] < interval:
+            return catalog
+
+        version = ContentVersion.current()
+        if catalog is None or catalog.version != version:
+            catalog = build_catalog(version)
+            state['catalog'] = catalog
+        state['checked_at'] = time.monotonic()
+        return catalog
+
+def invalidate_catalog():
+    """Força a recarga do catálogo na próxima leitura (neste worker)"""
+    state = current_app.extensions.get('content_catalog')
+    if state:
+        with state['lock']:
+            state['catalog'] = None
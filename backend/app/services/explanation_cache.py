@@ -0,0 +1,111 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from cachetools import TTLCache
+from app import db
+from app.models.ai_explanation import AIExplanation
+from app.utils.metrics import register_metrics
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+def prompt_version(*templates):
+    """Versão das instruções: hash curto dos textos fixos usados no prompt"""
+    return hashlib.sha256('\n'.join(templates).encode('utf-8')).hexdigest()[:16]
+
+class ExplanationCache:
+    """
+    Cache em dois níveis dos textos gerados pela IA: LRU em memória (por
+    worker) e tabela ai_explanations. As entradas são indexadas pelo hash do
+    prompt e pela versão das instruções, e valem por EXPLANATION_CACHE_TTL
+    segundos.
+    """
+
+    def __init__(self, app=None):
+        self._memory = None
+        self._lock = threading.Lock()
+        self.ttl = 30 * 24 * 3600
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('EXPLANATION_CACHE_TTL', 30 * 24 * 3600)
+        self._memory = TTLCache(
+            maxsize=app.config.get('EXPLANATION_CACHE_SIZE', 2048),
+            ttl=min(self.ttl, app.config.get('EXPLANATION_CACHE_MEMORY_TTL', 3600))
+        )
+        app.extensions['explanation_cache'] = self
+        register_metrics(app, 'explanation_cache', self.stats)
+
+    def get(self, prompt, version, allow_stale=False):
+        """
+        Texto guardado para o prompt (memória, depois banco) ou None. Com
+        allow_stale, aceita também entradas do banco já vencidas (usado
+        quando o modelo está indisponível).
+        """
+        key = (prompt_hash(prompt), version)
+        with self._lock:
+            text = self._memory.get(key)
+        if text is not None:
+            self.memory_hits += 1
+            return text
+
+        row = db.session.get(AIExplanation, key)
+        if row:
+            if row.created_at >= datetime.utcnow() - timedelta(seconds=self.ttl):
+                self.db_hits += 1
+                with self._lock:
+                    self._memory[key] = row.text
+                return row.text
+            if allow_stale:
+                self.stale_hits += 1
+                return row.text
+
+        self.misses += 1
+        return None
+
+    def put(self, prompt, version, kind, text):
+        """Guarda o texto gerado na memória e no banco (substitui a entrada da mesma versão)"""
+        key = (prompt_hash(prompt), version)
+        with self._lock:
+            self._memory[key] = text
+
+        try:
+            db.session.merge(AIExplanation(
+                prompt_hash=key[0],
+                prompt_version=version,
+                kind=kind,
+                text=text,
+                created_at=datetime.utcnow()
+            ))
+            db.session.commit()
+        except Exception as e:
+            # Falha ao persistir não impede o uso do texto gerado
+            db.session.rollback()
+            print(f"Erro ao guardar explicação no cache: {e}")
+
+    def get_or_generate(self, prompt, version, kind, generate):
+        """Retorna o texto guardado para o prompt ou gera com generate(prompt) e guarda"""
+        text = self.get(prompt, version)
+        if text is None:
+            text = generate(prompt)
+            if text:
+                self.put(prompt, version, kind, text)
+        return text
+
+    def stats(self):
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            'memory_entries': len(self._memory) if self._memory is not None else 0,
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'stale_hits': self.stale_hits,
+            'hit_rate': round((self.memory_hits + self.db_hits) / lookups, 3) if lookups else 0.0
+        }
+
+explanation_cache = ExplanationCache()
@@ -0,0 +1,158 @@
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy import select, update, or_
+from app import db
+from app.models.content_version import ContentVersion
+from app.models.question import Question, Option
+from app.services.catalog_service import get_catalog, invalidate_catalog
+from app.services.explanation_cache import prompt_version
+from app.services.llm import BATCH, LLMUnavailable
+
+INSTRUCTION_PROMPT = """
+Você é uma inteligência artificial treinada para explicar conceitos técnicos de forma clara e didática. 
+Seu objetivo é analisar uma pergunta de múltipla escolha e explicar por que uma determinada alternativa é a correta, 
+considerando o contexto da tecnologia da informação (TI), como inglês técnico, programação, redes e segurança da informação.
+
+Formato da resposta:
+1. Apresente uma explicação breve e direta sobre o porquê da alternativa correta.
+2. Se possível, exemplifique com uma situação prática ou um trecho de código/comando real.
+3. Mantenha a explicação com linguagem acessível, mas sem perder a precisão técnica.
+4. Seja imparcial: não mencione as demais alternativas, apenas foque na correta.
+5. Seja BREVE, repostas mais curtas e em português.
+6. Lembre-se, você deve explicar a parte técnica, mas não se esqueça do inglês também.
+""".strip()
+
+# Versão das explicações guardadas em cache: muda junto com as instruções
+EXPLAINER_PROMPT_VERSION = prompt_version(INSTRUCTION_PROMPT)
+
+# Tentativas por questão na pré-geração, com espera crescente entre elas (s)
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 2.0
+
+def explainer_prompt(question, correct_answer):
+    """Prompt da explicação de uma questão (usado pelo /explainer e pela pré-geração)"""
+    return f"{INSTRUCTION_PROMPT}\n\nPergunta: {question}\nResposta correta: {correct_answer}\n\nExplique:"
+
+def stored_explanation(question, correct_answer):
+    """Explicação guardada em questions.explanation para a questão e resposta informadas, ou None"""
+    return get_catalog().stored_explanation(question, correct_answer)
+
+class RateLimiter:
+    """Espaça as chamadas (de todas as threads) para no máximo rpm por minuto"""
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            at = max(now, self._next)
+            self._next = at + self.interval
+        if at > now:
+            time.sleep(at - now)
+
+def pending_questions(limit=None):
+    """
+    Questões sem explicação (exceto as de nivelamento), com o texto da
+    primeira opção correta: lista de (id, pergunta, resposta correta).
+    """
+    correct = select(Option.question_id, Option.text).where(Option.is_correct.is_(True)).order_by(Option.question_id, Option.id)
+    answers = {}
+    for question_id, text in db.session.execute(correct):
+        answers.setdefault(question_id, text)
+
+    stmt = select(Question.id, Question.question).where(
+        or_(Question.explanation.is_(None), Question.explanation == ''),
+        Question.is_placement.is_(False)
+    ).order_by(Question.id)
+    pending = [(qid, text, answers[qid]) for qid, text in db.session.execute(stmt) if qid in answers]
+    return pending[:limit] if limit else pending
+
+def _generate(client, limiter, prompt):
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        limiter.wait()
+        try:
+            return client.generate(prompt, priority=BATCH)
+        except LLMUnavailable as e:
+            # Limite de requisições ou falha temporária: espera antes de tentar de novo.
+            # Outros erros (ex.: resposta bloqueada) não melhoram com novas tentativas.
+            if attempt == MAX_ATTEMPTS:
+                raise
+            print(f"Erro ao gerar explicação (tentativa {attempt}): {e}")
+            time.sleep(max(e.retry_after, RETRY_BACKOFF ** attempt))
+
+def _write(rows):
+    """Grava as explicações geradas em lote e faz commit (checkpoint do progresso)"""
+    if rows:
+        db.session.execute(update(Question), rows)
+        db.session.commit()
+
+def pregenerate_explanations(client, concurrency=4, rpm=60, batch_size=50, limit=None):
+    """
+    Gera as explicações das questões que ainda não têm uma (client é um
+    LLMClient; as chamadas usam a prioridade batch), com até
+    concurrency chamadas simultâneas e no máximo rpm chamadas por minuto,
+    gravando os resultados em lotes de batch_size (cada lote é confirmado,
+    então uma execução interrompida continua de onde parou na próxima).
+
+    Gera um resumo por lote gravado; ao final incrementa a versão do
+    conteúdo para que os workers recarreguem o catálogo.
+    """
+    pending = pending_questions(limit)
+    limiter = RateLimiter(rpm)
+    generated = failed = 0
+    rows = []
+    start = time.perf_counter()
+
+    def flush():
+        nonlocal rows
+        _write(rows)
+        summary = {
+            'written': len(rows),
+            'generated': generated,
+            'failed': failed,
+            'pending': len(pending) - generated - failed,
+            'seconds': round(time.perf_counter() - start, 2)
+        }
+        rows = []
+        return summary
+
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix='pregenerate')
+    try:
+        futures = {
+            executor.submit(_generate, client, limiter, explainer_prompt(text, correct_answer)): question_id
+            for question_id, text, correct_answer in pending
+        }
+        for future in as_completed(futures):
+            try:
+                explanation = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"Erro ao gerar explicação da questão {futures[future]}: {e}")
+                traceback.print_exc()
+                continue
+            if not explanation:
+                failed += 1
+                continue
+
+            rows.append({'id': futures[future], 'explanation': explanation.strip()})
+            generated += 1
+            if len(rows) >= batch_size:
+                yield flush()
+
+        if rows:
+            yield flush()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Execução interrompida (Ctrl+C): grava o que já foi gerado
+        _write(rows)
+        if generated:
+            ContentVersion.bump()
+            db.session.commit()
+            invalidate_catalog()
@@ -0,0 +1,7 @@
+from .errors import LLMUnavailable, LLMBusy, LLMQuotaExceeded, LLMTimeout, LLMProviderError, CircuitOpen
+from .providers import (
+    Completion, LLMProvider, GeminiProvider, FakeProvider, FakeHTTPProvider, PROVIDERS, create_provider
+)
+from .scheduler import LLMScheduler, INTERACTIVE, BATCH
+from .breaker import CircuitBreaker
+from .client import LLMClient, llm_client
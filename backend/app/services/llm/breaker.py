@@ -0,0 +1,116 @@
+import math
+import threading
+import time
+from collections import deque
+from app.services.llm.errors import CircuitOpen
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """
+    Disjuntor das chamadas ao modelo do worker.
+
+    Fechado, registra o resultado das últimas LLM_BREAKER_WINDOW chamadas;
+    falhas e chamadas mais lentas que LLM_BREAKER_SLOW_CALL segundos contam
+    como erro. Quando a fração de erros passa de LLM_BREAKER_FAILURE_RATE
+    (com ao menos LLM_BREAKER_MIN_CALLS chamadas), o circuito abre e as
+    chamadas falham imediatamente com CircuitOpen por LLM_BREAKER_OPEN_SECONDS.
+    Depois disso fica meio aberto: uma chamada de sondagem passa e, conforme
+    o resultado, o circuito fecha ou volta a abrir.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=20)
+        self.enabled = True
+        self.min_calls = 5
+        self.failure_rate = 0.5
+        self.slow_call = 10.0
+        self.open_seconds = 30.0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._probing = False
+        self.opened = 0
+        self.rejected = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.enabled = config.get('LLM_BREAKER_ENABLED', True)
+        self.min_calls = config.get('LLM_BREAKER_MIN_CALLS', 5)
+        self.failure_rate = config.get('LLM_BREAKER_FAILURE_RATE', 0.5)
+        self.slow_call = config.get('LLM_BREAKER_SLOW_CALL', 10.0)
+        self.open_seconds = config.get('LLM_BREAKER_OPEN_SECONDS', 30.0)
+        with self._lock:
+            self._outcomes = deque(maxlen=config.get('LLM_BREAKER_WINDOW', 20))
+            self.state = CLOSED
+            self._probing = False
+
+    def before_call(self):
+        """
+        Autoriza uma chamada: retorna True se ela é a sondagem do circuito
+        meio aberto. Levanta CircuitOpen se o circuito não deixar passar.
+        """
+        with self._lock:
+            if not self.enabled:
+                return False
+            if self.state == OPEN:
+                remaining = self.opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpen('Serviço do modelo indisponível', retry_after=max(int(math.ceil(remaining)), 1))
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    self.rejected += 1
+                    raise CircuitOpen('Serviço do modelo indisponível', retry_after=1)
+                self._probing = True
+                return True
+            return False
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.opened += 1
+        self._outcomes.clear()
+
+    def record(self, probe, success, seconds):
+        """Registra o resultado de uma chamada autorizada por before_call()"""
+        healthy = success and not (self.slow_call and seconds > self.slow_call)
+        with self._lock:
+            if probe:
+                self._probing = False
+                if healthy:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            if self.state != CLOSED:
+                return
+            self._outcomes.append(healthy)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def release(self, probe):
+        """Libera uma chamada que não chegou a avaliar o provedor (fila cheia, quota)"""
+        if probe:
+            with self._lock:
+                self._probing = False
+
+    def stats(self):
+        with self._lock:
+            outcomes = list(self._outcomes)
+            return {
+                'state': self.state,
+                'recent_calls': len(outcomes),
+                'recent_failures': outcomes.count(False),
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'open_for': round(max(self.opened_at + self.open_seconds - time.monotonic(), 0.0), 2)
+                if self.state == OPEN else 0.0
+            }
@@ -0,0 +1,215 @@
+import hashlib
+import threading
+import time
+from app.utils.metrics import LatencyStats, register_metrics
+from app.services.llm.breaker import CircuitBreaker
+from app.services.llm.errors import LLMQuotaExceeded, LLMTimeout
+from app.services.llm.providers import create_provider, estimate_tokens
+from app.services.llm.scheduler import LLMScheduler, INTERACTIVE
+
+class _InFlight:
+    """Chamada em andamento, compartilhada pelas requisições com o mesmo prompt"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.text = None
+        self.error = None
+
+class LLMClient:
+    """
+    Cliente compartilhado do modelo de linguagem. O provedor (LLM_PROVIDER)
+    é criado uma única vez por worker, na primeira chamada.
+
+    Prompts idênticos em andamento são agrupados (single-flight): enquanto
+    uma chamada não termina, as demais requisições com o mesmo prompt e a
+    mesma prioridade esperam e recebem o mesmo resultado, sem novas chamadas
+    ao provedor. A espera é limitada pelo timeout da fila da prioridade
+    somado a LLM_CALL_TIMEOUT, como se a requisição tivesse feito a chamada.
+
+    Cada chamada passa antes pelo disjuntor (CircuitBreaker), que a recusa
+    de imediato enquanto o provedor estiver falhando, e pelo escalonador
+    (LLMScheduler), com a prioridade informada: interactive para
+    requisições de usuários e batch para jobs em lote. As chamadas ao
+    provedor têm tempo limite de LLM_CALL_TIMEOUT segundos.
+    """
+
+    def __init__(self, app=None, provider=None, scheduler=None, breaker=None):
+        self.config = {}
+        self._provider = provider
+        self._configured_provider = provider is None
+        self.scheduler = scheduler or LLMScheduler()
+        self.breaker = breaker or CircuitBreaker()
+        self.call_timeout = None
+        self.expected_output_tokens = 400
+        self._provider_lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.quota_errors = 0
+        self.quota_backoff = 30
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latency = LatencyStats()
+        self.first_token_latency = LatencyStats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.config = app.config
+        if self._configured_provider:
+            # O provedor da configuração desta aplicação é criado na próxima chamada
+            self._provider = None
+        self.expected_output_tokens = app.config.get('LLM_EXPECTED_OUTPUT_TOKENS', 400)
+        self.quota_backoff = app.config.get('LLM_QUOTA_BACKOFF', 30)
+        self.call_timeout = app.config.get('LLM_CALL_TIMEOUT', 15.0) or None
+        self.scheduler.init_app(app)
+        self.breaker.init_app(app)
+        app.extensions['llm_client'] = self
+        register_metrics(app, 'llm', self.stats)
+        register_metrics(app, 'llm_scheduler', self.scheduler.stats)
+        register_metrics(app, 'llm_breaker', self.breaker.stats)
+
+    @property
+    def provider(self):
+        # Criado na primeira chamada, já dentro do worker da aplicação
+        if self._provider is None:
+            with self._provider_lock:
+                if self._provider is None:
+                    self._provider = create_provider(self.config)
+        return self._provider
+
+    def _record(self, start, completion_tokens):
+        input_tokens, output_tokens = completion_tokens
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.latency.record(time.perf_counter() - start)
+
+    def _estimate(self, prompt):
+        return estimate_tokens(prompt) + self.expected_output_tokens
+
+    def _failed(self, error):
+        self.errors += 1
+        if isinstance(error, LLMQuotaExceeded):
+            self.quota_errors += 1
+            # Quota esgotada no provedor: segura as próximas chamadas do worker
+            self.scheduler.pause(error.retry_after or self.quota_backoff)
+
+    def _admit(self, prompt, priority):
+        """Passa pelo disjuntor e pelo escalonador; retorna (tokens estimados, sondagem)"""
+        probe = self.breaker.before_call()
+        estimated = self._estimate(prompt)
+        try:
+            self.scheduler.acquire(priority, estimated)
+        except Exception:
+            self.breaker.release(probe)
+            raise
+        return estimated, probe
+
+    def _settle(self, probe, error, seconds):
+        """Informa o resultado da chamada ao disjuntor"""
+        if isinstance(error, (LLMQuotaExceeded, GeneratorExit)):
+            # Quota e cliente desconectado não indicam falha do provedor
+            self.breaker.release(probe)
+        else:
+            self.breaker.record(probe, error is None, seconds)
+
+    def _call(self, prompt, priority):
+        estimated, probe = self._admit(prompt, priority)
+        actual = None
+        error = None
+        start = time.perf_counter()
+        try:
+            completion = self.provider.generate(prompt, timeout=self.call_timeout)
+            actual = completion.input_tokens + completion.output_tokens
+        except Exception as e:
+            error = e
+            self._failed(e)
+            raise
+        finally:
+            self.scheduler.release(estimated, actual)
+            self._settle(probe, error, time.perf_counter() - start)
+        self._record(start, (completion.input_tokens, completion.output_tokens))
+        return completion.text
+
+    def generate(self, prompt, priority=INTERACTIVE):
+        """
+        Gera o texto do prompt, agrupando chamadas idênticas em andamento.
+        Levanta LLMUnavailable (LLMBusy, LLMQuotaExceeded, LLMTimeout,
+        CircuitOpen) se a chamada não puder ser feita agora.
+        """
+        # Uma requisição interativa nunca espera por uma chamada batch na fila
+        key = (priority, hashlib.sha256(prompt.encode('utf-8')).digest())
+        with self._inflight_lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            wait = self.scheduler.queue_timeouts[priority] + (self.call_timeout or 0)
+            if not call.done.wait(wait):
+                raise LLMTimeout('Tempo esgotado aguardando a chamada em andamento ao modelo')
+            if call.error is not None:
+                raise call.error
+            return call.text
+
+        try:
+            call.text = self._call(prompt, priority)
+            return call.text
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def stream(self, prompt, priority=INTERACTIVE):
+        """Gera o texto do prompt em partes, à medida que o provedor as envia"""
+        estimated, probe = self._admit(prompt, priority)
+        actual = None
+        error = None
+        start = time.perf_counter()
+        first_token = None
+        input_tokens = output_tokens = 0
+        try:
+            for completion in self.provider.stream(prompt, timeout=self.call_timeout):
+                input_tokens += completion.input_tokens
+                output_tokens += completion.output_tokens
+                if completion.text:
+                    if first_token is None:
+                        first_token = time.perf_counter() - start
+                        self.first_token_latency.record(first_token)
+                    yield completion.text
+            actual = input_tokens + output_tokens
+        except BaseException as e:
+            error = e
+            if isinstance(e, Exception):
+                self._failed(e)
+            raise
+        finally:
+            self.scheduler.release(estimated, actual)
+            # Em streaming, a lentidão é medida até o primeiro trecho
+            self._settle(probe, error, first_token if first_token is not None else time.perf_counter() - start)
+        self._record(start, (input_tokens, output_tokens))
+
+    def stats(self):
+        return {
+            'provider': self.config.get('LLM_PROVIDER') if self._provider is None else self._provider.name,
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight),
+            'errors': self.errors,
+            'quota_errors': self.quota_errors,
+            'input_tokens': self.input_tokens,
+            'output_tokens': self.output_tokens,
+            'latency': self.latency.snapshot(),
+            'first_token_latency': self.first_token_latency.snapshot()
+        }
+
+llm_client = LLMClient()
@@ -0,0 +1,24 @@
+class LLMUnavailable(Exception):
+    """
+    O modelo não pode atender a chamada agora. retry_after é a espera
+    sugerida (s) antes de tentar de novo.
+    """
+
+    def __init__(self, message='Modelo de linguagem indisponível', retry_after=1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class LLMBusy(LLMUnavailable):
+    """A fila de chamadas está cheia ou a chamada esperou demais por uma vaga"""
+
+class LLMQuotaExceeded(LLMUnavailable):
+    """O provedor recusou a chamada por limite de requisições ou de tokens (quota)"""
+
+class LLMTimeout(LLMUnavailable):
+    """A chamada ao modelo passou do tempo limite (LLM_CALL_TIMEOUT)"""
+
+class LLMProviderError(LLMUnavailable):
+    """O provedor falhou (erro do servidor da API ou de rede)"""
+
+class CircuitOpen(LLMUnavailable):
+    """O circuito está aberto: as chamadas ao modelo falham imediatamente até a próxima sondagem"""
@@ -0,0 +1,64 @@
+"""
+Servidor HTTP de um modelo falso, para testes locais sem a API do Gemini.
+
+    python -m app.services.llm.fake_server --port 8765 --latency 0.5
+
+Responde POST /generate {"prompt": ...} com {"text", "usage"} após a
+latência configurada; --error-rate faz uma fração das chamadas falhar com
+429 (limite de requisições).
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.services.llm.providers import FakeProvider
+
+def make_handler(latency, error_rate):
+    model = FakeProvider()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                prompt = json.loads(self.rfile.read(length))['prompt']
+            except (ValueError, KeyError, TypeError):
+                return self._reply(400, {'error': 'prompt ausente'})
+
+            time.sleep(latency)
+            if error_rate and random.random() < error_rate:
+                return self._reply(429, {'error': 'quota exceeded'})
+
+            completion = model.generate(prompt)
+            self._reply(200, {
+                'text': completion.text,
+                'usage': {'input_tokens': completion.input_tokens, 'output_tokens': completion.output_tokens}
+            })
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Modelo de linguagem falso para testes locais')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.5, help='Latência de cada chamada (s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fração das chamadas que falham com 429')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.latency, args.error_rate))
+    print(f"Modelo falso em http://{args.host}:{args.port}/generate")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    main()
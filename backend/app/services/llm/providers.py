@@ -0,0 +1,177 @@
+import hashlib
+import json
+import socket
+import time
+import urllib.error
+import urllib.request
+from collections import namedtuple
+from app.services.llm.errors import LLMQuotaExceeded, LLMTimeout, LLMProviderError
+
+# Texto gerado e tokens consumidos (entrada e saída) de uma chamada ao modelo.
+# No streaming, cada parte traz seu texto e a última traz os tokens.
+Completion = namedtuple('Completion', ['text', 'input_tokens', 'output_tokens'])
+
+def estimate_tokens(text):
+    """Estimativa de tokens para provedores que não informam o consumo (~4 caracteres por token)"""
+    return max(len(text) // 4, 1) if text else 0
+
+class LLMProvider:
+    """
+    Interface dos provedores de modelo de linguagem: generate(prompt)
+    retorna um Completion e stream(prompt) gera o texto em partes
+    (Completion com o trecho de texto de cada parte). Com timeout, a
+    chamada falha com LLMTimeout depois desse número de segundos.
+    """
+    name = None
+
+    def generate(self, prompt, timeout=None):
+        raise NotImplementedError
+
+    def stream(self, prompt, timeout=None):
+        yield self.generate(prompt, timeout)
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini (google-generativeai)"""
+    name = 'gemini'
+
+    def __init__(self, api_key, model_name='gemini-1.5-flash'):
+        import google.generativeai as genai
+        from google.api_core.exceptions import (
+            GoogleAPICallError, ResourceExhausted, TooManyRequests, DeadlineExceeded
+        )
+
+        genai.configure(api_key=api_key)
+        self.model_name = model_name
+        self._model = genai.GenerativeModel(model_name)
+        self._quota_errors = (ResourceExhausted, TooManyRequests)
+        self._timeout_errors = (DeadlineExceeded, TimeoutError)
+        self._api_errors = (GoogleAPICallError,)
+
+    @staticmethod
+    def _usage(response):
+        usage = getattr(response, 'usage_metadata', None)
+        return (
+            getattr(usage, 'prompt_token_count', 0) or 0,
+            getattr(usage, 'candidates_token_count', 0) or 0
+        )
+
+    @staticmethod
+    def _chunk_text(chunk):
+        # chunk.text levanta ValueError em partes sem texto (ex.: só metadados
+        # ou finish_reason); lê as partes do primeiro candidato diretamente
+        candidates = chunk.candidates
+        if not candidates:
+            return ''
+        return ''.join(part.text for part in candidates[0].content.parts if getattr(part, 'text', None))
+
+    def _translate(self, error):
+        if isinstance(error, self._quota_errors):
+            return LLMQuotaExceeded(str(error), retry_after=30)
+        if isinstance(error, self._timeout_errors):
+            return LLMTimeout(str(error))
+        # Demais erros da API (5xx, indisponível, etc.): as rotas usam o texto alternativo
+        return LLMProviderError(str(error))
+
+    def _generate_content(self, prompt, timeout, **kwargs):
+        try:
+            return self._model.generate_content(
+                prompt, request_options={'timeout': timeout} if timeout else None, **kwargs
+            )
+        except (self._quota_errors + self._timeout_errors + self._api_errors) as e:
+            raise self._translate(e) from e
+
+    def generate(self, prompt, timeout=None):
+        response = self._generate_content(prompt, timeout)
+        return Completion(response.text, *self._usage(response))
+
+    def stream(self, prompt, timeout=None):
+        response = self._generate_content(prompt, timeout, stream=True)
+        try:
+            for chunk in response:
+                text = self._chunk_text(chunk)
+                if text:
+                    yield Completion(text, 0, 0)
+        except (self._quota_errors + self._timeout_errors + self._api_errors) as e:
+            raise self._translate(e) from e
+        # Consumo total, disponível depois da última parte
+        yield Completion('', *self._usage(response))
+
+class FakeProvider(LLMProvider):
+    """
+    Modelo local determinístico, sem acesso à rede: o mesmo prompt gera
+    sempre o mesmo texto. Usado em desenvolvimento, testes e benchmarks.
+    """
+    name = 'fake'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def generate(self, prompt, timeout=None):
+        if self.latency:
+            if timeout and self.latency > timeout:
+                time.sleep(timeout)
+                raise LLMTimeout('Tempo limite da chamada ao modelo esgotado')
+            time.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        text = f"Resposta gerada localmente ({digest}) para um prompt de {len(prompt)} caracteres."
+        return Completion(text, estimate_tokens(prompt), estimate_tokens(text))
+
+    def stream(self, prompt, timeout=None):
+        completion = self.generate(prompt, timeout)
+        words = completion.text.split(' ')
+        for i, word in enumerate(words):
+            yield Completion(word if i == len(words) - 1 else word + ' ', 0, 0)
+        yield Completion('', completion.input_tokens, completion.output_tokens)
+
+class FakeHTTPProvider(LLMProvider):
+    """
+    Cliente HTTP de um modelo falso local (python -m app.services.llm.fake_server),
+    para testar a aplicação com latência e falhas de rede reais sem usar a API.
+    """
+    name = 'fake_http'
+
+    def __init__(self, url, timeout=30.0):
+        self.url = url
+        self.timeout = timeout
+
+    def generate(self, prompt, timeout=None):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({'prompt': prompt}).encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                data = json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 429:
+                raise LLMQuotaExceeded('Quota do modelo excedida', retry_after=int(e.headers.get('Retry-After') or 30)) from e
+            if e.code >= 500:
+                raise LLMProviderError(f'Erro do servidor do modelo ({e.code})') from e
+            raise
+        except (socket.timeout, TimeoutError) as e:
+            raise LLMTimeout('Tempo limite da chamada ao modelo esgotado') from e
+        except urllib.error.URLError as e:
+            if isinstance(e.reason, (socket.timeout, TimeoutError)):
+                raise LLMTimeout('Tempo limite da chamada ao modelo esgotado') from e
+            raise LLMProviderError(f'Falha de conexão com o modelo: {e.reason}') from e
+        usage = data.get('usage', {})
+        return Completion(data['text'], usage.get('input_tokens', 0), usage.get('output_tokens', 0))
+
+PROVIDERS = {
+    GeminiProvider.name: GeminiProvider,
+    FakeProvider.name: FakeProvider,
+    FakeHTTPProvider.name: FakeHTTPProvider
+}
+
+def create_provider(config, name=None):
+    """Cria o provedor configurado em LLM_PROVIDER (ou o informado em name)"""
+    name = name or config.get('LLM_PROVIDER', 'gemini')
+    if name == GeminiProvider.name:
+        return GeminiProvider(config.get('GEMINI_API_KEY'), config.get('LLM_MODEL', 'gemini-1.5-flash'))
+    if name == FakeProvider.name:
+        return FakeProvider(config.get('LLM_FAKE_LATENCY', 0.0))
+    if name == FakeHTTPProvider.name:
+        return FakeHTTPProvider(config.get('LLM_FAKE_URL', 'http://127.0.0.1:8765/generate'))
+    raise ValueError(f"Provedor de modelo desconhecido: {name}")
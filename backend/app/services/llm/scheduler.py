@@ -0,0 +1,183 @@
+import math
+import threading
+import time
+from collections import deque
+from app.utils.metrics import LatencyStats
+from app.services.llm.errors import LLMBusy
+
+# Classes de prioridade, da mais para a menos prioritária
+INTERACTIVE = 'interactive'
+BATCH = 'batch'
+PRIORITIES = (INTERACTIVE, BATCH)
+
+class TokenBucket:
+    """Balde de fichas reabastecido continuamente até per_minute por minuto (0 = sem limite)"""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        if self.capacity:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, reserve=0.0):
+        """Segundos até haver amount fichas mantendo a fração reserve do balde (0 = já há)"""
+        if not self.capacity:
+            return 0.0
+        # Uma chamada maior que o balde inteiro espera apenas pelo balde cheio
+        needed = min(amount + reserve * self.capacity, self.capacity)
+        return max(needed - self.level, 0.0) / self.rate
+
+    def take(self, amount):
+        if self.capacity:
+            self.level -= amount
+
+class LLMScheduler:
+    """
+    Escalonador das chamadas ao modelo do worker. Antes de cada chamada, a
+    thread entra na fila da sua classe (interactive ou batch) e só segue
+    quando:
+
+    - não há chamadas de classe mais prioritária esperando;
+    - há menos de LLM_MAX_IN_FLIGHT chamadas em andamento;
+    - os baldes de requisições (LLM_RPM) e de tokens (LLM_TPM) por minuto
+      têm saldo; chamadas batch deixam LLM_BATCH_RESERVE dos baldes livre
+      para as interativas.
+
+    Filas cheias ou esperas maiores que o timeout da classe falham com
+    LLMBusy. Depois de um erro de quota do provedor, novas chamadas esperam
+    o tempo indicado (pause).
+    """
+
+    def __init__(self, app=None):
+        self._cond = threading.Condition()
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self.queue_sizes = {INTERACTIVE: 64, BATCH: 256}
+        self.queue_timeouts = {INTERACTIVE: 10.0, BATCH: 300.0}
+        self.max_in_flight = 16
+        self.batch_reserve = 0.2
+        self.requests = TokenBucket(0)
+        self.tokens = TokenBucket(0)
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self.admitted = {priority: 0 for priority in PRIORITIES}
+        self.rejected = {priority: 0 for priority in PRIORITIES}
+        self.quota_pauses = 0
+        self.queue_wait = {priority: LatencyStats() for priority in PRIORITIES}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        config = app.config
+        self.queue_sizes = {
+            INTERACTIVE: config.get('LLM_QUEUE_SIZE', 64),
+            BATCH: config.get('LLM_BATCH_QUEUE_SIZE', 256)
+        }
+        self.queue_timeouts = {
+            INTERACTIVE: config.get('LLM_QUEUE_TIMEOUT', 10.0),
+            BATCH: config.get('LLM_BATCH_QUEUE_TIMEOUT', 300.0)
+        }
+        self.max_in_flight = config.get('LLM_MAX_IN_FLIGHT', 16)
+        self.batch_reserve = config.get('LLM_BATCH_RESERVE', 0.2)
+        with self._cond:
+            self.requests = TokenBucket(config.get('LLM_RPM', 0))
+            self.tokens = TokenBucket(config.get('LLM_TPM', 0))
+
+    def _admission_wait(self, priority, ticket, tokens, now):
+        """
+        0 se a chamada pode seguir agora; senão, segundos até poder tentar de
+        novo (None = até outra chamada terminar ou sair da fila).
+        """
+        if self.paused_until > now:
+            return self.paused_until - now
+        if self._queues[priority][0] is not ticket:
+            return None
+        for higher in PRIORITIES[:PRIORITIES.index(priority)]:
+            if self._queues[higher]:
+                return None
+        if self.in_flight >= self.max_in_flight:
+            return None
+
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        reserve = self.batch_reserve if priority == BATCH else 0.0
+        return max(self.requests.wait_time(1, reserve), self.tokens.wait_time(tokens, reserve))
+
+    def _reject(self, priority, message, retry_after):
+        self.rejected[priority] += 1
+        raise LLMBusy(message, retry_after=max(int(math.ceil(retry_after)), 1))
+
+    def acquire(self, priority, tokens):
+        """
+        Espera a vez da chamada (com estimativa de tokens) e a registra como
+        em andamento. Levanta LLMBusy se a fila estiver cheia ou o tempo de
+        espera passar do timeout da classe. Chamar release() ao terminar.
+        """
+        start = time.monotonic()
+        deadline = start + self.queue_timeouts[priority]
+        queue = self._queues[priority]
+
+        with self._cond:
+            if len(queue) >= self.queue_sizes[priority]:
+                self._reject(priority, 'Fila de chamadas ao modelo cheia', 1)
+
+            ticket = object()
+            queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._admission_wait(priority, ticket, tokens, now)
+                    if wait == 0:
+                        break
+                    remaining = deadline - now
+                    # Sem saldo suficiente até o fim do prazo: falha já
+                    if remaining <= 0 or (wait is not None and wait > remaining):
+                        self._reject(priority, 'Limite de chamadas ao modelo atingido', wait or 1)
+                    self._cond.wait(remaining if wait is None else wait)
+            finally:
+                queue.remove(ticket)
+                self._cond.notify_all()
+
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            self.admitted[priority] += 1
+
+        self.queue_wait[priority].record(time.monotonic() - start)
+
+    def release(self, estimated_tokens, actual_tokens=None):
+        """Encerra uma chamada, acertando o balde de tokens com o consumo real"""
+        with self._cond:
+            self.in_flight -= 1
+            if actual_tokens is not None:
+                self.tokens.take(actual_tokens - estimated_tokens)
+            self._cond.notify_all()
+
+    def pause(self, seconds):
+        """Suspende novas chamadas por alguns segundos (após erro de quota do provedor)"""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.quota_pauses += 1
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                'in_flight': self.in_flight,
+                'max_in_flight': self.max_in_flight,
+                'queued': {priority: len(queue) for priority, queue in self._queues.items()},
+                'admitted': dict(self.admitted),
+                'rejected': dict(self.rejected),
+                'quota_pauses': self.quota_pauses,
+                'paused_for': round(max(self.paused_until - now, 0.0), 2),
+                'requests_available': round(self.requests.level, 1) if self.requests.capacity else None,
+                'tokens_available': round(self.tokens.level, 1) if self.tokens.capacity else None,
+                'queue_wait': {priority: stats.snapshot() for priority, stats in self.queue_wait.items()}
+            }
@@ -1,14 +1,18 @@
+from sqlalchemy.orm import selectinload
 from app.models.module import Module
+from app.services.progress_service import get_user_progress
 
 def get_all_modules(user_id=None):
     """Retorna todos os módulos e suas categorias"""
-    modules = Module.query.all()
-    return [module.to_dict(user_id) for module in modules]
+    modules = Module.query.options(selectinload(Module.categories)).all()
+    progress_map = get_user_progress(user_id) if user_id else None
+    return [module.to_dict(user_id, progress_map) for module in modules]
 
 def get_module_by_id(module_id, user_id=None):
     """Retorna um módulo específico por ID"""
-    module = Module.query.get(module_id)
+    module = Module.query.options(selectinload(Module.categories)).get(module_id)
     if not module:
         return None
     
-    return module.to_dict(user_id)
+    progress_map = get_user_progress(user_id) if user_id else None
+    return module.to_dict(user_id, progress_map)
@@ -0,0 +1,149 @@
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from app.utils.metrics import LatencyStats, register_metrics
+
+# Processos do bcrypt por worker da aplicação: com vários workers (gunicorn),
+# cada um tem o seu pool, então poucos processos por worker já ocupam a CPU
+DEFAULT_WORKERS = min(2, os.cpu_count() or 1)
+
+class PasswordPoolBusy(Exception):
+    """Há mais operações de senha pendentes do que o pool aceita"""
+
+def _hash(password, rounds, submitted_at):
+    started_at = time.time()
+    start = time.perf_counter()
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+    return hashed, started_at - submitted_at, time.perf_counter() - start
+
+def _check(password, hashed, submitted_at):
+    started_at = time.time()
+    start = time.perf_counter()
+    matches = bcrypt.checkpw(password, hashed)
+    return matches, started_at - submitted_at, time.perf_counter() - start
+
+class PasswordPool:
+    """
+    Pool de processos dedicado ao bcrypt, para que o hash e a verificação
+    de senhas não ocupem as threads que atendem as requisições.
+
+    No máximo PASSWORD_POOL_MAX_PENDING operações ficam pendentes (em
+    execução ou na fila); acima disso, a operação espera até
+    PASSWORD_POOL_QUEUE_TIMEOUT segundos por uma vaga e então falha com
+    PasswordPoolBusy. Com PASSWORD_POOL_WORKERS=0 o bcrypt roda na própria
+    thread (útil em desenvolvimento e testes). Se um processo do pool morrer
+    (BrokenProcessPool), o pool é recriado e a operação é repetida uma vez.
+    """
+
+    def __init__(self, app=None):
+        self.workers = 0
+        self.rounds = 12
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = None
+        self.rejected = 0
+        self.broken_pools = 0
+        self.wait_latency = LatencyStats()
+        self.run_latency = LatencyStats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = app.config.get('PASSWORD_POOL_WORKERS', DEFAULT_WORKERS)
+        self.rounds = app.config.get('BCRYPT_SALT_ROUNDS', 12)
+        self.max_pending = app.config.get('PASSWORD_POOL_MAX_PENDING') or max(self.workers, 1) * 4
+        self.queue_timeout = app.config.get('PASSWORD_POOL_QUEUE_TIMEOUT', 1.0)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        app.extensions['password_pool'] = self
+        register_metrics(app, 'password_pool', self.stats)
+
+    def _get_executor(self):
+        # Criado na primeira operação, já dentro do worker da aplicação
+        # (após o fork de servidores como o gunicorn)
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _discard_executor(self, executor):
+        """Descarta o pool quebrado; o próximo _get_executor() cria outro"""
+        with self._executor_lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        executor = self._get_executor()
+        try:
+            return executor.submit(fn, *args, time.time()).result()
+        except BrokenProcessPool:
+            self.broken_pools += 1
+            self._discard_executor(executor)
+            return self._get_executor().submit(fn, *args, time.time()).result()
+
+    def _run(self, fn, *args, queue_timeout=-1):
+        # queue_timeout=None espera pela vaga sem limite (tarefas administrativas)
+        if queue_timeout == -1:
+            queue_timeout = self.queue_timeout
+        if not self._slots.acquire(timeout=queue_timeout):
+            self.rejected += 1
+            raise PasswordPoolBusy()
+
+        try:
+            if self.workers:
+                result, waited, ran = self._submit(fn, *args)
+            else:
+                result, waited, ran = fn(*args, time.time())
+        finally:
+            self._slots.release()
+
+        self.wait_latency.record(max(waited, 0.0))
+        self.run_latency.record(ran)
+        return result
+
+    def hash(self, password):
+        """Gera o hash bcrypt da senha com BCRYPT_SALT_ROUNDS"""
+        return self._run(_hash, password.encode('utf-8'), self.rounds).decode('utf-8')
+
+    def check(self, password, hashed_password):
+        """Verifica se a senha corresponde ao hash"""
+        return self._run(_check, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def hash_many(self, passwords):
+        """
+        Gera os hashes de várias senhas, para tarefas administrativas.
+        Cada senha ocupa uma vaga do pool como as demais operações, mas no
+        máximo PASSWORD_POOL_WORKERS por vez, deixando as outras vagas para
+        login e cadastro. Retorna os hashes na ordem.
+        """
+        encoded = [password.encode('utf-8') for password in passwords]
+
+        def hash_one(password):
+            return self._run(_hash, password, self.rounds, queue_timeout=None).decode('utf-8')
+
+        if not self.workers or len(encoded) < 2:
+            return [hash_one(password) for password in encoded]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='hash-many') as threads:
+            return list(threads.map(hash_one, encoded))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'rounds': self.rounds,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected,
+            'broken_pools': self.broken_pools,
+            'wait_latency': self.wait_latency.snapshot(),
+            'run_latency': self.run_latency.snapshot()
+        }
+
+password_pool = PasswordPool()
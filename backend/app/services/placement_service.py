@@ -0,0 +1,279 @@
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import jwt
+from flask import current_app
+from sqlalchemy import insert, update, delete
+from app import db
+from app.models.user import User
+from app.models.user_placement_answer import UserPlacementAnswer
+from app.models.placement_session import PlacementSession
+from app.services.catalog_service import get_catalog
+from app.services.calibration_service import get_difficulties
+from app.utils.jwt_utils import invalidate_user
+
+# Grade de habilidades (escala logit) e priori N(0, 1) da estimativa
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+LOG_PRIOR = -0.5 * THETA_GRID ** 2
+
+# Limites entre os níveis 1..5 na escala de habilidade (nível 3 centrado em 0)
+LEVEL_CUTS = np.array([-1.5, -0.5, 0.5, 1.5])
+LEVEL_OF_GRID = np.searchsorted(LEVEL_CUTS, THETA_GRID) + 1
+
+# Questões de maior informação entre as quais a próxima é sorteada (controle de exposição)
+TOP_ITEMS = 3
+
+_rng = np.random.default_rng()
+
+# Audiência dos tokens de sessão do nivelamento (não são aceitos como login)
+PLACEMENT_AUDIENCE = 'linguatech:placement'
+
+class SessionAlreadyUsed(Exception):
+    """O passo da sessão já foi respondido (token reutilizado) ou a sessão terminou"""
+
+class PlacementItemBank:
+    """
+    Banco de itens do nivelamento: probabilidades de acerto e tabela de
+    informação (p(1-p)) de cada questão em cada ponto da grade de habilidades,
+    pré-calculadas uma vez por versão do conteúdo e da calibração.
+    Sem calibração, a dificuldade da questão vem do nível (nível - 3).
+    """
+
+    def __init__(self, catalog, difficulties):
+        self.ids = catalog.placement_ids
+        self.position = {question_id: i for i, question_id in enumerate(self.ids.tolist())}
+
+        levels = np.array([catalog.payloads[q]['level'] or 3 for q in self.ids.tolist()], dtype=np.float64)
+        b = levels - 3.0
+        calibrated = self.ids < difficulties.size
+        b_calibrated = np.full(self.ids.size, np.nan)
+        b_calibrated[calibrated] = difficulties[self.ids[calibrated]]
+        self.difficulty = np.where(np.isnan(b_calibrated), b, b_calibrated)
+
+        p = 1.0 / (1.0 + np.exp(-(THETA_GRID[:, None] - self.difficulty[None, :])))
+        self.log_p = np.log(p)
+        self.log_q = np.log1p(-p)
+        self.information = p * (1.0 - p)
+
+    def posterior(self, positions, correct):
+        """Posterior normalizada sobre a grade, dadas as respostas (posições no banco, acertos)"""
+        log_post = LOG_PRIOR.copy()
+        if positions.size:
+            log_post += np.where(correct, self.log_p[:, positions], self.log_q[:, positions]).sum(axis=1)
+        post = np.exp(log_post - log_post.max())
+        return post / post.sum()
+
+    def next_item(self, theta, answered):
+        """Sorteia entre as TOP_ITEMS questões não respondidas de maior informação em theta"""
+        row = self.information[np.abs(THETA_GRID - theta).argmin()].copy()
+        row[answered] = -1.0
+        available = int((row >= 0).sum())
+        if not available:
+            return None
+        candidates = np.argsort(row)[::-1][:min(TOP_ITEMS, available)]
+        return int(self.ids[_rng.choice(candidates)])
+
+def get_item_bank():
+    """Banco de itens do worker, reconstruído quando o catálogo ou a calibração mudam"""
+    catalog = get_catalog()
+    difficulties = get_difficulties()
+    state = current_app.extensions.setdefault('placement_item_bank', {
+        'catalog': None,
+        'difficulties': None,
+        'bank': None,
+        'lock': threading.Lock()
+    })
+
+    def current():
+        return state['catalog'] is catalog and state['difficulties'] is difficulties
+
+    if not current():
+        with state['lock']:
+            if not current():
+                state['bank'] = PlacementItemBank(catalog, difficulties)
+                state['catalog'] = catalog
+                state['difficulties'] = difficulties
+    return state['bank']
+
+def estimate(bank, answers):
+    """
+    Estima a habilidade (EAP) a partir das respostas [(question_id, opção)].
+    Retorna (respostas corrigidas, theta, erro padrão, nível, confiança no nível).
+    """
+    catalog = get_catalog()
+    graded = [(q, option, catalog.is_correct(q, option)) for q, option in answers if q in bank.position]
+    positions = np.array([bank.position[q] for q, _, _ in graded], dtype=np.int64)
+    correct = np.array([c for _, _, c in graded], dtype=bool)
+
+    post = bank.posterior(positions, correct)
+    theta = float((post * THETA_GRID).sum())
+    se = float(np.sqrt((post * (THETA_GRID - theta) ** 2).sum()))
+    level_probs = np.bincount(LEVEL_OF_GRID, post, minlength=6)[1:]
+    level = int(level_probs.argmax()) + 1
+    return graded, positions, theta, se, level, float(level_probs.max())
+
+def encode_session(session_id, step):
+    """Token da sessão de nivelamento: identifica a sessão e o passo atual (uso único)"""
+    ttl = current_app.config.get('PLACEMENT_SESSION_TTL', 3600)
+    payload = {
+        'aud': PLACEMENT_AUDIENCE,
+        'sid': session_id,
+        'step': step,
+        'exp': int(time.time()) + ttl
+    }
+    return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+
+def decode_session(token):
+    """Valida o token da sessão; levanta jwt.InvalidTokenError se inválido ou expirado"""
+    payload = jwt.decode(
+        token, current_app.config['SECRET_KEY'], algorithms=['HS256'], audience=PLACEMENT_AUDIENCE,
+        options={'require': ['exp', 'aud']}
+    )
+    try:
+        return str(payload['sid']), int(payload['step'])
+    except (KeyError, TypeError, ValueError):
+        raise jwt.InvalidTokenError('Token de sessão incompleto')
+
+def start_session(user_id):
+    """Inicia uma sessão: retorna (token, primeira questão) ou (None, None) sem questões"""
+    bank = get_item_bank()
+    question_id = bank.next_item(0.0, np.empty(0, dtype=np.int64))
+    if question_id is None:
+        return None, None
+
+    now = datetime.utcnow()
+    # Sessões vencidas do usuário não são mais necessárias
+    db.session.execute(delete(PlacementSession).where(
+        PlacementSession.user_id == user_id, PlacementSession.expires_at < now
+    ))
+    session = PlacementSession(
+        id=secrets.token_urlsafe(32),
+        user_id=user_id,
+        answers=[],
+        next_question_id=question_id,
+        step=0,
+        created_at=now,
+        expires_at=now + timedelta(seconds=current_app.config.get('PLACEMENT_SESSION_TTL', 3600))
+    )
+    db.session.add(session)
+    db.session.commit()
+    return encode_session(session.id, 0), get_catalog().questions([question_id])[0]
+
+def answer_question(user_id, token, question_id, selected_option):
+    """
+    Registra a resposta da questão atual da sessão e decide se o nivelamento
+    terminou (nível convergiu ou limite de questões atingido). Enquanto não
+    termina, retorna apenas a próxima questão; ao terminar, grava as
+    respostas em user_placement_answers em um único INSERT e retorna o
+    resultado. Cada token só pode ser usado uma vez (SessionAlreadyUsed).
+    """
+    session_id, step = decode_session(token)
+    session = db.session.get(PlacementSession, session_id)
+    if not session or session.user_id != user_id:
+        raise jwt.InvalidTokenError('Sessão de nivelamento não encontrada')
+    if session.expires_at < datetime.utcnow():
+        raise jwt.InvalidTokenError('Sessão de nivelamento expirada')
+    if session.finished_at is not None or session.step != step:
+        raise SessionAlreadyUsed('Esta etapa do nivelamento já foi respondida')
+    if question_id != session.next_question_id:
+        raise ValueError('A questão respondida não é a questão atual da sessão')
+
+    answers = [tuple(answer) for answer in session.answers] + [(question_id, selected_option)]
+
+    config = current_app.config
+    bank = get_item_bank()
+    graded, positions, theta, se, level, confidence = estimate(bank, answers)
+
+    answered = len(graded)
+    converged = answered >= config.get('PLACEMENT_MIN_ITEMS', 5) and (
+        se <= config.get('PLACEMENT_TARGET_SE', 0.5) or
+        confidence >= config.get('PLACEMENT_LEVEL_CONFIDENCE', 0.8)
+    )
+    next_question_id = None
+    if not converged and answered < config.get('PLACEMENT_MAX_ITEMS', 15):
+        next_question_id = bank.next_item(theta, positions)
+    finished = next_question_id is None
+
+    # Avança o passo só se ninguém respondeu antes (protege contra reenvio do mesmo token)
+    advanced = db.session.execute(
+        update(PlacementSession)
+        .where(PlacementSession.id == session_id, PlacementSession.step == step,
+               PlacementSession.finished_at.is_(None))
+        .values(
+            step=step + 1,
+            answers=[[q, option] for q, option in answers],
+            next_question_id=next_question_id,
+            finished_at=datetime.utcnow() if finished else None
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not advanced:
+        db.session.rollback()
+        raise SessionAlreadyUsed('Esta etapa do nivelamento já foi respondida')
+
+    if not finished:
+        db.session.commit()
+        return {
+            'answered': answered,
+            'finished': False,
+            'session': encode_session(session_id, step + 1),
+            'question': get_catalog().questions([next_question_id])[0]
+        }
+
+    finish_session(user_id, graded, level)
+    return {
+        'answered': answered,
+        'score': sum(1 for _, _, correct in graded if correct),
+        'nivel': level,
+        'theta': round(theta, 3),
+        'erro_padrao': round(se, 3),
+        'finished': True,
+        'placement_level': str(level)
+    }
+
+def place_from_answers(user_id, answers):
+    """
+    Nivelamento de uma vez (questões sorteadas em GET /api/nivelamento/):
+    corrige as respostas [(question_id, opção)] pelo gabarito, estima o
+    nível como na sessão adaptativa e grava o resultado. Respostas de
+    questões que não são de nivelamento são ignoradas.
+    """
+    graded, _, theta, se, level, _ = estimate(get_item_bank(), answers)
+    if not graded:
+        raise ValueError('Nenhuma resposta de questão de nivelamento')
+
+    finish_session(user_id, graded, level)
+    return {
+        'answered': len(graded),
+        'score': sum(1 for _, _, correct in graded if correct),
+        'nivel': level,
+        'theta': round(theta, 3),
+        'erro_padrao': round(se, 3),
+        'placement_level': str(level)
+    }
+
+def finish_session(user_id, graded, level):
+    """Grava as respostas do nivelamento em lote e o nível estimado do usuário"""
+    user = db.session.get(User, user_id)
+    if not user:
+        raise LookupError('Usuário não encontrado.')
+
+    catalog = get_catalog()
+    db.session.execute(insert(UserPlacementAnswer), [
+        {
+            'user_id': user_id,
+            'question_id': question_id,
+            'selected_option_id': option,
+            'is_correct': correct,
+            'level': catalog.payloads[question_id]['level']
+        }
+        for question_id, option, correct in graded
+    ])
+
+    # placement_level preenchido indica ao frontend que o nivelamento foi concluído
+    user.placement_level = str(level)
+    user.placement_result = level
+    db.session.commit()
+    invalidate_user(user_id)
@@ -0,0 +1,152 @@
+from app import db
+from app.models.category import Category
+from app.models.question import Question
+from app.models.user_answer import UserAnswer
+from app.models.user_progress import UserProgress
+
+def percentage_of(correct, total):
+    """Calcula o progresso como porcentagem, no mesmo formato usado nos modelos"""
+    if not total:
+        return 0
+    return round((correct / total) * 100)
+
+def masked_percentage(bits, mask):
+    """Porcentagem das questões da máscara que estão resolvidas no bitset"""
+    return percentage_of((bits & mask).bit_count(), mask.bit_count())
+
+def get_user_progress(user_id):
+    """
+    Lê em uma única consulta o progresso materializado do usuário em todos
+    os módulos e categorias (tabela user_progress, mantida por
+    quiz_service.apply_progress a partir do bitset de questões resolvidas).
+
+    Retorna um dicionário no formato:
+        {'modules': {module_id: progresso}, 'categories': {category_id: progresso}}
+    """
+    rows = db.session.query(
+        UserProgress.module_id, UserProgress.category_id, UserProgress.progress
+    ).filter(UserProgress.user_id == user_id).all()
+
+    progress_map = {'modules': {}, 'categories': {}}
+    for module_id, category_id, progress in rows:
+        if category_id is None:
+            progress_map['modules'][module_id] = progress or 0
+        else:
+            progress_map['categories'][category_id] = progress or 0
+    return progress_map
+
+def get_progress_for_category(user_id, category_id):
+    """Retorna o progresso materializado do usuário em uma categoria"""
+    progress = db.session.query(UserProgress.progress).filter_by(
+        user_id=user_id,
+        category_id=category_id
+    ).scalar()
+    return progress or 0
+
+def get_completion_counts(user_id):
+    """
+    Retorna (módulos concluídos, categorias praticadas) a partir das linhas
+    materializadas de progresso do usuário, em uma única consulta.
+    """
+    completed_modules, completed_lessons = db.session.query(
+        db.func.count(db.case(
+            (db.and_(UserProgress.category_id.is_(None), UserProgress.progress >= 100), 1)
+        )),
+        db.func.count(UserProgress.category_id)
+    ).filter(UserProgress.user_id == user_id).one()
+    return completed_modules, completed_lessons
+
+def _category_totals():
+    """Total de questões por categoria, com o módulo de cada categoria"""
+    return db.session.query(
+        Category.id,
+        Category.module_id,
+        db.func.count(Question.id)
+    ).outerjoin(
+        Question, Question.category_id == Category.id
+    ).group_by(Category.id, Category.module_id).all()
+
+def rebuild_user_progress(user_id=None):
+    """
+    Reconstrói a tabela user_progress a partir do histórico de user_answers.
+    Se user_id for informado, reconstrói apenas o progresso desse usuário.
+    O total de quizzes já registrado é preservado.
+
+    Retorna o número de linhas de progresso gravadas.
+    """
+    totals = _category_totals()
+    category_totals = {category_id: total for category_id, _, total in totals}
+    category_modules = {category_id: module_id for category_id, module_id, _ in totals}
+
+    module_totals = {}
+    for category_id, module_id, total in totals:
+        module_totals[module_id] = module_totals.get(module_id, 0) + total
+
+    # Questões distintas acertadas por (usuário, categoria)
+    solved = db.session.query(
+        UserAnswer.user_id,
+        Question.category_id,
+        db.func.count(db.distinct(UserAnswer.question_id))
+    ).join(
+        Question, Question.id == UserAnswer.question_id
+    ).filter(
+        UserAnswer.is_correct == True,
+        Question.category_id.isnot(None)
+    )
+    existing = UserProgress.query
+    if user_id:
+        solved = solved.filter(UserAnswer.user_id == user_id)
+        existing = existing.filter_by(user_id=user_id)
+    solved = solved.group_by(UserAnswer.user_id, Question.category_id).all()
+
+    category_rows = {}
+    module_rows = {}
+    for progress in existing.all():
+        # Zera as contagens; linhas sem acertos continuam existindo com progresso 0
+        progress.correct_count = 0
+        progress.progress = 0
+        if progress.category_id is None:
+            module_rows[(progress.user_id, progress.module_id)] = progress
+        else:
+            category_rows[(progress.user_id, progress.category_id)] = progress
+
+    module_counts = {}
+    for answer_user_id, category_id, correct_count in solved:
+        module_id = category_modules.get(category_id)
+        if module_id is None:
+            continue
+
+        progress = category_rows.get((answer_user_id, category_id))
+        if not progress:
+            progress = UserProgress(
+                user_id=answer_user_id,
+                category_id=category_id,
+                total_quizzes=0
+            )
+            db.session.add(progress)
+            category_rows[(answer_user_id, category_id)] = progress
+
+        progress.module_id = module_id
+        progress.correct_count = correct_count
+        progress.progress = percentage_of(correct_count, category_totals.get(category_id))
+
+        key = (answer_user_id, module_id)
+        module_counts[key] = module_counts.get(key, 0) + correct_count
+
+    for key, correct_count in module_counts.items():
+        progress = module_rows.get(key)
+        if not progress:
+            progress = UserProgress(
+                user_id=key[0],
+                module_id=key[1],
+                category_id=None,
+                total_quizzes=0
+            )
+            db.session.add(progress)
+            module_rows[key] = progress
+
+        progress.correct_count = correct_count
+        progress.progress = percentage_of(correct_count, module_totals.get(key[1]))
+
+    db.session.commit()
+    return len(category_rows) + len(module_rows)
@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+import time
+from sqlalchemy import insert, select
+from app import db
+from app.models.user import User
+from app.services.password_pool import password_pool
+
+# Usuários por lote (hash + INSERT + commit)
+BATCH_SIZE = 1000
+
+# Erros de registros inválidos listados no resumo (os demais só são contados)
+MAX_REPORTED_ERRORS = 100
+
+# Valores por consulta IN na verificação de e-mails e nomes já cadastrados
+LOOKUP_CHUNK_SIZE = 5000
+
+def parse_users(content, fmt):
+    """
+    Lê os usuários de um conteúdo CSV (colunas name, email e password) ou
+    JSON (lista de objetos com as mesmas chaves). Retorna uma lista de dicionários.
+    """
+    if fmt == 'csv':
+        return list(csv.DictReader(io.StringIO(content)))
+    if fmt == 'json':
+        data = json.loads(content)
+        if not isinstance(data, list):
+            raise ValueError('O JSON deve ser uma lista de usuários')
+        return data
+    raise ValueError(f'Formato não suportado: {fmt}')
+
+def _existing(column, values):
+    """Valores de column que já existem no banco (consultas IN em blocos)"""
+    values = list(values)
+    existing = set()
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+        existing.update(db.session.execute(select(column).where(column.in_(chunk))).scalars())
+    return existing
+
+def provision_users(records):
+    """
+    Cadastra usuários em lote. Registros incompletos ou com campos que não
+    são texto, e-mails ou nomes repetidos no arquivo e usuários já
+    cadastrados são ignorados e contados; os registros inválidos aparecem
+    em errors com o número da linha (a partir de 1).
+    As senhas são processadas em paralelo pelo pool de processos do bcrypt e
+    os usuários inseridos em lotes de BATCH_SIZE. Retorna um resumo.
+    """
+    start = time.perf_counter()
+    summary = {'received': len(records), 'created': 0, 'invalid': 0, 'duplicated': 0, 'existing': 0, 'errors': []}
+
+    def invalid(row, error):
+        summary['invalid'] += 1
+        if len(summary['errors']) < MAX_REPORTED_ERRORS:
+            summary['errors'].append({'row': row, 'error': error})
+
+    # Validação e remoção de repetidos dentro do próprio arquivo
+    candidates = []
+    seen_emails, seen_names = set(), set()
+    for row, record in enumerate(records, 1):
+        if not isinstance(record, dict):
+            invalid(row, 'Registro não é um objeto')
+            continue
+        fields = {
+            'name': record.get('name') or record.get('username') or '',
+            'email': record.get('email') or '',
+            'password': record.get('password') or ''
+        }
+        wrong_type = [field for field, value in fields.items() if not isinstance(value, str)]
+        if wrong_type:
+            invalid(row, f"Campos devem ser texto: {', '.join(wrong_type)}")
+            continue
+        name, email, password = fields['name'].strip(), fields['email'].strip(), fields['password']
+        if not name or not email or not password:
+            invalid(row, 'Campos obrigatórios ausentes (name, email e password)')
+            continue
+        if email in seen_emails or name in seen_names:
+            summary['duplicated'] += 1
+            continue
+        seen_emails.add(email)
+        seen_names.add(name)
+        candidates.append((name, email, password))
+
+    # Usuários já cadastrados (e-mail ou nome, ambos únicos)
+    existing_emails = _existing(User.email, seen_emails)
+    existing_names = _existing(User.username, seen_names)
+    new_users = [
+        user for user in candidates
+        if user[1] not in existing_emails and user[0] not in existing_names
+    ]
+    summary['existing'] = len(candidates) - len(new_users)
+
+    for offset in range(0, len(new_users), BATCH_SIZE):
+        batch = new_users[offset:offset + BATCH_SIZE]
+        hashes = password_pool.hash_many([password for _, _, password in batch])
+        db.session.execute(insert(User), [
+            {'username': name, 'email': email, 'password': hashed}
+            for (name, email, _), hashed in zip(batch, hashes)
+        ])
+        db.session.commit()
+        summary['created'] += len(batch)
+
+    seconds = time.perf_counter() - start
+    summary['seconds'] = round(seconds, 2)
+    summary['users_per_second'] = round(summary['created'] / seconds, 1) if seconds else 0.0
+    return summary
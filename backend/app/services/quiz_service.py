@@ -1,31 +1,44 @@
 from app import db
-from app.models.question import Question, Option
 from app.models.user_progress import UserProgress
-from app.models.category import Category
-from app.models.user_answer import UserAnswer
-from sqlalchemy import or_
+from app.models.user_answer import UserAnswer, MAX_ANSWER_LENGTH
+from app.services.progress_service import masked_percentage
+from app.services.catalog_service import EMPTY_IDS, get_catalog
+from app.services.solved_service import get_solved_bits, mark_solved
+from app.services.answer_buffer import answer_buffer
+from sqlalchemy import insert
+import numpy as np
 
 def get_questions(topic=None, module_id=None, category_id=None):
-    """Busca questões com base nos filtros fornecidos"""
-    query = Question.query
+    """Busca questões com base nos filtros fornecidos, a partir do catálogo em memória"""
+    catalog = get_catalog()
+    ids = catalog.all_ids
     
     if topic:
-        query = query.filter(Question.module.like(f'%{topic}%'))
+        # Mesmo critério do filtro original (Question.module LIKE '%tópico%'): questões
+        # cujo próprio module_id aponta para um módulo com o tópico no título
+        topic = topic.lower()
+        topic_modules = {mid for mid, module in catalog.modules.items() if topic in module['title'].lower()}
+        topic_ids = [qid for qid, payload in catalog.payloads.items() if payload['module_id'] in topic_modules]
+        ids = np.intersect1d(ids, np.array(topic_ids, dtype=np.int64)) if topic_ids else EMPTY_IDS
     
     if category_id:
-        query = query.filter(Question.category_id == category_id)
-    elif module_id:
+        ids = np.intersect1d(ids, catalog.category_ids(category_id))
+    elif module_id and catalog.module_categories.get(module_id):
         # Se apenas module_id for fornecido, busca todas as questões das categorias desse módulo
-        categories = Category.query.filter_by(module_id=module_id).all()
-        category_ids = [c.id for c in categories]
-        if category_ids:
-            query = query.filter(Question.category_id.in_(category_ids))
+        ids = np.intersect1d(ids, catalog.module_ids(module_id))
     
-    questions = query.all()
-    return [q.to_dict(include_correct=False) for q in questions]
+    return catalog.questions(ids, include_correct=False)
 
 def evaluate_quiz(answers, user_id=None, module_id=None, category_id=None):
-    """Avalia as respostas do quiz e retorna os resultados"""
+    """
+    Avalia as respostas do quiz e retorna os resultados. Levanta ValueError
+    se alguma opção escolhida não couber na coluna user_answers.answer.
+    """
+    # Validado antes da correção, para que nenhuma resposta do quiz seja gravada (ou enfileirada)
+    for answer in answers:
+        if isinstance(answer, dict) and len(str(answer.get('selectedOption') or '')) > MAX_ANSWER_LENGTH:
+            raise ValueError(f'selectedOption deve ter no máximo {MAX_ANSWER_LENGTH} caracteres')
+
     score = 0
     total = len(answers)
     
@@ -40,6 +53,12 @@ def evaluate_quiz(answers, user_id=None, module_id=None, category_id=None):
     # Dicionário para armazenar o progresso por categoria
     category_progress = {}
     
+    # Respostas a serem gravadas em um único INSERT
+    answer_rows = []
+    
+    # Correção feita pelo gabarito em memória, sem consultas ao banco
+    catalog = get_catalog()
+    
     for answer in answers:
         try:
             # Verifica se answer é um dicionário
@@ -53,45 +72,48 @@ def evaluate_quiz(answers, user_id=None, module_id=None, category_id=None):
             if not question_id or not selected_option:
                 print(f"Resposta inválida (campos ausentes): {answer}")
                 continue
+
+            if not isinstance(selected_option, (str, int)) or isinstance(selected_option, bool):
+                print(f"Resposta inválida (opção não é texto): {answer}")
+                continue
+            selected_option = str(selected_option)
             
-            # Busca a questão para obter a categoria
-            question = Question.query.get(question_id)
-            if not question:
-                print(f"Questão não encontrada: {question_id}")
+            question_id = _as_question_id(question_id)
+            if not catalog.has_question(question_id):
+                print(f"Questão não encontrada: {answer.get('questionId')}")
+                continue
+            
+            category_id = catalog.payloads[question_id]['category_id']
+            module_id = catalog.question_module_id(question_id)
+            if module_id is None:
+                print(f"Questão sem categoria: {question_id}")
                 continue
                 
             # Inicializa o contador para a categoria se não existir
-            if question.category_id not in category_progress:
-                category_progress[question.category_id] = {
+            if category_id not in category_progress:
+                category_progress[category_id] = {
                     'score': 0,
                     'total': 0,
-                    'module_id': question.category.module_id
+                    'module_id': module_id
                 }
             
             # Incrementa o total de questões para a categoria
-            category_progress[question.category_id]['total'] += 1
+            category_progress[category_id]['total'] += 1
             
             # Verifica se a resposta está correta
-            option = Option.query.join(Question).filter(
-                Question.id == question_id,
-                Option.option_id == selected_option,
-                Option.is_correct == True
-            ).first()
-            
-            is_correct = bool(option)
+            is_correct = catalog.is_correct(question_id, selected_option)
             if is_correct:
                 score += 1
-                category_progress[question.category_id]['score'] += 1
+                category_progress[category_id]['score'] += 1
             
             # Salva a resposta do usuário
             if user_id:
-                user_answer = UserAnswer(
-                    user_id=user_id,
-                    question_id=question_id,
-                    answer=selected_option,
-                    is_correct=is_correct
-                )
-                db.session.add(user_answer)
+                answer_rows.append({
+                    'user_id': user_id,
+                    'question_id': question_id,
+                    'answer': selected_option,
+                    'is_correct': is_correct
+                })
                 
         except Exception as e:
             print(f"Erro ao processar resposta: {e}")
@@ -109,9 +131,13 @@ def evaluate_quiz(answers, user_id=None, module_id=None, category_id=None):
     else:
         feedback = "Continue praticando. A prática leva à perfeição!"
     
-    # Commit para salvar todas as respostas
-    if user_id:
-        db.session.commit()
+    # Grava as respostas e atualiza o progresso materializado na mesma transação.
+    # Com o modo write-behind ligado, a gravação é feita em lote em segundo plano.
+    if user_id and answer_rows:
+        if not answer_buffer.submit(user_id, answer_rows):
+            insert_answers(answer_rows)
+            apply_progress(user_id, answer_rows)
+            db.session.commit()
     
     return {
         'score': score,
@@ -120,14 +146,140 @@ def evaluate_quiz(answers, user_id=None, module_id=None, category_id=None):
         'feedback': feedback
     }
 
-def update_user_progress(user_id, module_id, category_id=None, percentage=0):
-    """Atualiza o progresso do usuário para um módulo/categoria"""
-    # Esta função agora não faz nada, pois não estamos mais usando a tabela user_progress
-    # O progresso é calculado diretamente quando necessário
-    pass
+def _as_question_id(question_id):
+    """Normaliza o ID da questão enviado pelo cliente (int ou string numérica)"""
+    try:
+        return int(question_id)
+    except (TypeError, ValueError):
+        return None
+
+def grade_answers(answers):
+    """
+    Corrige respostas no formato {'questionId', 'selectedOption'} pelo gabarito
+    em memória. Respostas inválidas ou de questões inexistentes são ignoradas.
+    Retorna uma lista de dicionários com question_id, selected_option, is_correct e level.
+    """
+    catalog = get_catalog()
+    graded = []
+    for answer in answers:
+        if not isinstance(answer, dict):
+            continue
+        question_id = _as_question_id(answer.get('questionId'))
+        selected_option = answer.get('selectedOption')
+        if not selected_option or not catalog.has_question(question_id):
+            continue
+        graded.append({
+            'question_id': question_id,
+            'selected_option': selected_option,
+            'is_correct': catalog.is_correct(question_id, selected_option),
+            'level': catalog.payloads[question_id]['level']
+        })
+    return graded
+
+def insert_answers(answer_rows):
+    """Grava as respostas (user_id, question_id, answer, is_correct) em um único INSERT"""
+    if answer_rows:
+        db.session.execute(insert(UserAnswer), answer_rows)
+
+def apply_progress(user_id, answer_rows, count_quiz=True):
+    """
+    Marca as questões acertadas no bitset do usuário e atualiza o progresso
+    das categorias e módulos das questões respondidas. Com count_quiz=False,
+    total_quizzes não é incrementado (ex.: sincronização de respostas offline).
+    Não faz commit: deve rodar dentro da transação que grava as respostas.
+    """
+    catalog = get_catalog()
+    category_modules = {}
+    solved_question_ids = set()
+    for row in answer_rows:
+        question_id = row['question_id']
+        if not catalog.has_question(question_id):
+            continue
+        module_id = catalog.question_module_id(question_id)
+        if module_id is None:
+            continue
+        category_modules[catalog.payloads[question_id]['category_id']] = module_id
+        if row['is_correct']:
+            solved_question_ids.add(question_id)
 
-def update_module_progress(user_id, module_id):
-    """Atualiza o progresso geral do módulo com base nas categorias"""
-    # Esta função agora não faz nada, pois não estamos mais usando a tabela user_progress
-    # O progresso é calculado diretamente quando necessário
-    pass
+    solved_bits = mark_solved(user_id, solved_question_ids)
+    module_ids = set(category_modules.values())
+    progress_rows = load_progress_rows(user_id, module_ids) if module_ids else {}
+    for cat_id, mod_id in category_modules.items():
+        update_user_progress(user_id, mod_id, cat_id, solved_bits, progress_rows, count_quiz)
+    for mod_id in module_ids:
+        update_module_progress(user_id, mod_id, solved_bits, progress_rows, count_quiz)
+
+def load_progress_rows(user_id, module_ids):
+    """
+    Carrega em uma única consulta as linhas de progresso do usuário nos módulos
+    informados, indexadas por (module_id, category_id).
+    """
+    rows = UserProgress.query.filter(
+        UserProgress.user_id == user_id,
+        UserProgress.module_id.in_(module_ids)
+    ).all()
+    return {(row.module_id, row.category_id): row for row in rows}
+
+def _get_or_create_progress(user_id, module_id, category_id, progress_rows=None):
+    """
+    Busca a linha de progresso do usuário, criando-a se necessário.
+    Se progress_rows (ver load_progress_rows) for informado, busca nele
+    em vez de consultar o banco.
+    """
+    if progress_rows is not None:
+        progress = progress_rows.get((module_id, category_id))
+    else:
+        progress = UserProgress.query.filter_by(
+            user_id=user_id,
+            module_id=module_id,
+            category_id=category_id
+        ).first()
+    
+    if not progress:
+        progress = UserProgress(
+            user_id=user_id,
+            module_id=module_id,
+            category_id=category_id,
+            progress=0,
+            correct_count=0,
+            total_quizzes=0
+        )
+        db.session.add(progress)
+        if progress_rows is not None:
+            progress_rows[(module_id, category_id)] = progress
+    
+    return progress
+
+def update_user_progress(user_id, module_id, category_id, solved_bits=None, progress_rows=None, count_quiz=True):
+    """
+    Atualiza o progresso do usuário em uma categoria a partir do bitset
+    de questões resolvidas.
+    Não faz commit: deve rodar dentro da transação do quiz.
+    """
+    if solved_bits is None:
+        solved_bits = get_solved_bits(user_id)
+    mask = get_catalog().category_masks.get(category_id, 0)
+    
+    progress = _get_or_create_progress(user_id, module_id, category_id, progress_rows)
+    progress.correct_count = (solved_bits & mask).bit_count()
+    if count_quiz:
+        progress.total_quizzes = (progress.total_quizzes or 0) + 1
+    progress.progress = masked_percentage(solved_bits, mask)
+    return progress
+
+def update_module_progress(user_id, module_id, solved_bits=None, progress_rows=None, count_quiz=True):
+    """
+    Atualiza o progresso geral do módulo com base nas categorias.
+    Não faz commit: deve rodar dentro da transação do quiz.
+    """
+    if solved_bits is None:
+        solved_bits = get_solved_bits(user_id)
+    mask = get_catalog().module_masks.get(module_id, 0)
+    
+    progress = _get_or_create_progress(user_id, module_id, None, progress_rows)
+    progress.correct_count = (solved_bits & mask).bit_count()
+    if count_quiz:
+        progress.total_quizzes = (progress.total_quizzes or 0) + 1
+    progress.progress = masked_percentage(solved_bits, mask)
+    return progress
@@ -0,0 +1,371 @@
+import re
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from app.utils.metrics import LatencyStats, register_metrics
+from app.services.explanation_service import stored_explanation
+from app.services.llm import LLMUnavailable
+
+EXPLANATION_PROMPT = """
+Você é um professor de inglês. Explique o erro do aluno de forma didática, focando na diferença entre a resposta errada e a correta.
+
+Formato:
+You answered "[resposta errada]," which is a device that sends and receives data over a network. However, the question asked for the name of the *wireless network itself*, not the device that enables it. [resposta correta] is the name of the technology and the network it creates. A [resposta errada] is a component *of* a [resposta correta] network, but it isn't the name of the network itself.
+
+Diretrizes:
+- Use a estrutura exata do formato acima
+- Mantenha os asteriscos para ênfase (*palavra*)
+- Seja didático e claro
+- Foque apenas na diferença entre a resposta errada e a correta
+- Use o contexto específico da questão
+""".strip()
+
+VOCABULARY_PROMPT = """
+Você é um professor de inglês. Forneça o vocabulário específico para o termo correto no contexto da questão.
+
+Formato:
+[termo] - [tradução]
+
+Example: I connected to the free [termo] at the cafe.
+
+Tradução: Eu me conectei ao [termo] gratuito na cafeteria.
+
+Diretrizes:
+- Use exatamente este formato
+- Dê apenas um exemplo relacionado ao termo ou conceito de acordo com o contexto da questão
+- Mantenha o exemplo relevante para o uso real do termo
+""".strip()
+
+BATCH_REVIEW_PROMPT = """
+Você é um professor de inglês. Em cada questão abaixo, o aluno escolheu uma resposta errada. Para CADA questão, escreva duas seções:
+
+EXPLICAÇÃO: explique o erro do aluno de forma didática, focando na diferença entre a resposta errada e a correta, neste formato:
+You answered "[resposta errada]," which is a device that sends and receives data over a network. However, the question asked for the name of the *wireless network itself*, not the device that enables it. [resposta correta] is the name of the technology and the network it creates. A [resposta errada] is a component *of* a [resposta correta] network, but it isn't the name of the network itself.
+
+VOCABULÁRIO: o vocabulário específico do termo correto no contexto da questão, neste formato:
+[termo] - [tradução]
+
+Example: I connected to the free [termo] at the cafe.
+
+Tradução: Eu me conectei ao [termo] gratuito na cafeteria.
+
+Diretrizes:
+- Use exatamente os formatos acima, substituindo os marcadores pelos termos de cada questão
+- Mantenha os asteriscos para ênfase (*palavra*)
+- Seja didático e claro, e use o contexto específico de cada questão
+- Dê apenas um exemplo de vocabulário por questão
+
+Responda SOMENTE no formato abaixo, com todas as questões, na mesma ordem e com os mesmos números:
+### QUESTÃO <número>
+EXPLICAÇÃO:
+<explicação>
+VOCABULÁRIO:
+<vocabulário>
+""".strip()
+
+FALLBACK_MESSAGE = "Desculpe, houve um erro ao gerar a explicação. Por favor, tente novamente."
+
+# Separadores da resposta do prompt em lote (tolerantes a negrito/markdown)
+_QUESTION_HEADER = re.compile(r'^[ \t*_#]*QUEST[ÃA]O\s+(\d+)[ \t*_:]*$', re.MULTILINE | re.IGNORECASE)
+_SECTIONS = re.compile(
+    r'^\s*[*_]*EXPLICA[ÇC][ÃA]O[*_]*\s*:?[*_]*\s*(.*?)\s*^[ \t*_#]*VOCABUL[ÁA]RIO[*_]*\s*:?[*_]*\s*(.*?)\s*\Z',
+    re.DOTALL | re.MULTILINE | re.IGNORECASE
+)
+
+def review_prompts(question):
+    """Monta os prompts de explicação e de vocabulário de uma questão da revisão"""
+    # Inclui o contexto da questão em cada prompt
+    context = f"""
+Contexto da questão:
+Pergunta: {question.get('question')}
+Resposta correta: {question.get('correctAnswer')}
+Resposta do usuário: {question.get('userAnswer')}
+"""
+
+    # Substitui os placeholders e adiciona contexto
+    explanation_prompt = context + EXPLANATION_PROMPT.replace("[resposta errada]", question.get('userAnswer')).replace("[resposta correta]", question.get('correctAnswer'))
+    vocabulary_prompt = context + VOCABULARY_PROMPT.replace("[termo]", question.get('correctAnswer'))
+    return explanation_prompt, vocabulary_prompt
+
+def _stored_review(question):
+    """Explicação guardada da questão (questions.explanation), usada quando o modelo falha"""
+    try:
+        stored = stored_explanation(question.get('question'), question.get('correctAnswer'))
+    except Exception:
+        return None
+    return f"""Explicação
+
+{stored}
+""" if stored else None
+
+def format_review(question, explanation=None, vocabulary=None):
+    """
+    Monta o item da revisão; sem explicação ou vocabulário, usa a explicação
+    guardada da questão ou, se não houver, a mensagem de erro.
+    """
+    if explanation is None or vocabulary is None:
+        ai_explanation = _stored_review(question) or FALLBACK_MESSAGE
+    else:
+        ai_explanation = f"""Explicação
+
+{explanation}
+
+Vocabulário
+
+{vocabulary}
+"""
+    return {
+        "question": question.get('question'),
+        "correctAnswer": question.get('correctAnswer'),
+        "userAnswer": question.get('userAnswer'),
+        "aiExplanation": ai_explanation
+    }
+
+def _check_fields(question):
+    for field in ('correctAnswer', 'userAnswer'):
+        if not isinstance(question.get(field), str):
+            raise ValueError(f"Campo '{field}' ausente ou inválido")
+
+def batch_review_prompt(questions):
+    """Prompt único com várias questões, pedindo explicação e vocabulário de cada uma"""
+    blocks = []
+    for number, question in enumerate(questions, 1):
+        _check_fields(question)
+        blocks.append(
+            f"### QUESTÃO {number}\n"
+            f"Pergunta: {question.get('question')}\n"
+            f"Resposta correta: {question['correctAnswer']}\n"
+            f"Resposta do usuário: {question['userAnswer']}"
+        )
+    return BATCH_REVIEW_PROMPT + "\n\nQuestões:\n\n" + "\n\n".join(blocks)
+
+def parse_batch_review(text, count):
+    """
+    Separa a resposta do prompt em lote por questão: retorna
+    {posição: (explicação, vocabulário)} apenas das questões cujas duas
+    seções foram encontradas (as demais devem ser geradas individualmente).
+    """
+    parts = _QUESTION_HEADER.split(text or '')
+    parsed = {}
+    for number, body in zip(parts[1::2], parts[2::2]):
+        index = int(number) - 1
+        match = _SECTIONS.match(body)
+        if not match or not 0 <= index < count or index in parsed:
+            continue
+        explanation, vocabulary = match.group(1).strip(), match.group(2).strip()
+        if explanation and vocabulary:
+            parsed[index] = (explanation, vocabulary)
+    return parsed
+
+class ReviewGenerator:
+    """
+    Gera as revisões com as chamadas ao modelo em paralelo, em um pool de
+    threads limitado a REVIEW_MAX_WORKERS chamadas simultâneas por worker.
+
+    No modo em lote (REVIEW_BATCH_SIZE > 0), cada grupo de até
+    REVIEW_BATCH_SIZE questões é enviado em um único prompt que pede
+    explicação e vocabulário de todas; as questões cuja resposta não pôde
+    ser separada são geradas individualmente (duas chamadas por questão).
+    Se a chamada em lote falhar, as questões do grupo recebem direto a
+    explicação guardada (sem multiplicar as chamadas ao modelo). O modo
+    em lote não é usado no streaming, que envia cada bloco assim que fica
+    pronto.
+
+    Cada requisição tem um prazo de REVIEW_DEADLINE segundos: questões cujas
+    chamadas não terminaram (ou falharam) recebem a explicação guardada da
+    questão ou a mensagem de erro, e as demais são retornadas normalmente,
+    na ordem original.
+    """
+
+    def __init__(self, app=None):
+        self.max_workers = 16
+        self.deadline = 20.0
+        self.batch_size = 10
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self.requests = 0
+        self.items = 0
+        self.failed_items = 0
+        self.timed_out_items = 0
+        self.batch_calls = 0
+        self.batch_items = 0
+        self.item_calls = 0
+        self.latency = LatencyStats()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_workers = app.config.get('REVIEW_MAX_WORKERS', 16)
+        self.deadline = app.config.get('REVIEW_DEADLINE', 20.0)
+        self.batch_size = app.config.get('REVIEW_BATCH_SIZE', 10)
+        app.extensions['review_generator'] = self
+        register_metrics(app, 'review', self.stats)
+
+    def _get_executor(self):
+        # Criado na primeira revisão, já dentro do worker da aplicação
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='review')
+        return self._executor
+
+    def _result(self, future):
+        """Texto gerado pela chamada, ou None se ela falhou"""
+        try:
+            return future.result()
+        except LLMUnavailable as e:
+            print(f"Modelo indisponível: {str(e)}")
+            return None
+        except Exception as e:
+            print(f"Erro ao processar questão: {str(e)}")
+            traceback.print_exc()
+            return None
+
+    def _run(self, questions, generate, deadline, batch=True):
+        """
+        Executa as chamadas da revisão e gera os resultados à medida que
+        ficam prontos: ('block', índice, 'explanation' | 'vocabulary', texto)
+        e ('review', índice, revisão) quando a questão fica completa.
+        """
+        start = time.perf_counter()
+        executor = self._get_executor()
+        completed = set()
+        failed = timed_out = 0
+
+        def remaining():
+            return max(deadline - (time.perf_counter() - start), 0)
+
+        def complete(index, explanation=None, vocabulary=None):
+            nonlocal failed
+            completed.add(index)
+            if explanation is None or vocabulary is None:
+                failed += 1
+            return ('review', index, format_review(questions[index], explanation, vocabulary))
+
+        # Questões com dados inválidos já saem com a mensagem de erro
+        valid = []
+        for index, question in enumerate(questions):
+            try:
+                _check_fields(question)
+                valid.append(index)
+            except Exception as e:
+                print(f"Erro ao processar questão: {str(e)}")
+                yield complete(index)
+
+        # 1) Prompts em lote: uma chamada para cada grupo de questões
+        individual = valid
+        if batch and self.batch_size and len(valid) > 1:
+            individual = []
+            batches = {}
+            for offset in range(0, len(valid), self.batch_size):
+                group = valid[offset:offset + self.batch_size]
+                prompt = batch_review_prompt([questions[index] for index in group])
+                batches[executor.submit(generate, prompt)] = group
+                self.batch_calls += 1
+
+            try:
+                for future in as_completed(batches, timeout=remaining()):
+                    group = batches[future]
+                    text = self._result(future)
+                    if text is None:
+                        # A chamada falhou: chamadas individuais também falhariam
+                        for index in group:
+                            yield complete(index)
+                        continue
+                    parsed = parse_batch_review(text, len(group))
+                    self.batch_items += len(parsed)
+                    for position, index in enumerate(group):
+                        if position not in parsed:
+                            # Resposta do lote sem as seções desta questão
+                            individual.append(index)
+                            continue
+                        explanation, vocabulary = parsed[position]
+                        yield ('block', index, 'explanation', explanation)
+                        yield ('block', index, 'vocabulary', vocabulary)
+                        yield complete(index, explanation, vocabulary)
+            except TimeoutError:
+                pass
+            finally:
+                for future in batches:
+                    future.cancel()
+
+        # 2) Chamadas individuais (explicação e vocabulário) das demais questões
+        parts = {}
+        blocks = {index: {} for index in individual}
+        if not remaining():
+            individual = []
+        for index in sorted(individual):
+            explanation_prompt, vocabulary_prompt = review_prompts(questions[index])
+            parts[executor.submit(generate, explanation_prompt)] = (index, 'explanation')
+            parts[executor.submit(generate, vocabulary_prompt)] = (index, 'vocabulary')
+            self.item_calls += 2
+
+        try:
+            for future in as_completed(parts, timeout=remaining()):
+                index, name = parts[future]
+                if index in completed:
+                    continue
+                text = self._result(future)
+                if text is None:
+                    # Uma das chamadas falhou: a questão fica com a mensagem de erro
+                    yield complete(index)
+                    continue
+                blocks[index][name] = text
+                yield ('block', index, name, text)
+                if len(blocks[index]) == 2:
+                    yield complete(index, blocks[index]['explanation'], blocks[index]['vocabulary'])
+        except TimeoutError:
+            pass
+        finally:
+            # Chamadas que ainda estão na fila não chegam a ser feitas
+            for future in parts:
+                future.cancel()
+
+        for index in range(len(questions)):
+            if index not in completed:
+                timed_out += 1
+                yield complete(index)
+
+        self.requests += 1
+        self.items += len(questions)
+        self.failed_items += failed
+        self.timed_out_items += timed_out
+        self.latency.record(time.perf_counter() - start)
+
+    def generate(self, questions, generate, deadline=None):
+        """
+        Gera as revisões das questões; generate(prompt) chama o modelo e
+        retorna o texto. Retorna a lista de revisões na ordem das questões.
+        """
+        reviews = [None] * len(questions)
+        for result in self._run(questions, generate, self.deadline if deadline is None else deadline):
+            if result[0] == 'review':
+                reviews[result[1]] = result[2]
+        return reviews
+
+    def stream(self, questions, generate, deadline=None):
+        """
+        Como generate(), mas gera os resultados à medida que as chamadas
+        terminam: ('block', índice, 'explanation' | 'vocabulary', texto) para
+        cada bloco gerado e ('review', índice, revisão) quando a questão fica
+        completa. Ao fim do prazo, as questões pendentes recebem a mensagem de erro.
+        """
+        return self._run(questions, generate, self.deadline if deadline is None else deadline, batch=False)
+
+    def stats(self):
+        return {
+            'max_workers': self.max_workers,
+            'deadline': self.deadline,
+            'batch_size': self.batch_size,
+            'requests': self.requests,
+            'items': self.items,
+            'failed_items': self.failed_items,
+            'timed_out_items': self.timed_out_items,
+            'batch_calls': self.batch_calls,
+            'batch_items': self.batch_items,
+            'item_calls': self.item_calls,
+            'latency': self.latency.snapshot()
+        }
+
+review_generator = ReviewGenerator()
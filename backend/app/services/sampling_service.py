@@ -0,0 +1,87 @@
+import numpy as np
+from app.services.catalog_service import EMPTY_IDS, get_catalog
+from app.services.solved_service import get_solved_bits, ids_from_bits
+from app.services.calibration_service import get_user_ability, selection_weights
+
+# Gerador de números aleatórios do worker
+_rng = np.random.default_rng()
+
+# Níveis de dificuldade das questões
+LEVELS = range(1, 6)
+
+def available_by_level(module_id, solved_bits):
+    """
+    Retorna {nível: array de IDs} com as questões do módulo ainda não
+    resolvidas pelo usuário, a partir dos índices (módulo, nível) do catálogo.
+    """
+    catalog = get_catalog()
+    solved = ids_from_bits(solved_bits)
+
+    available = {}
+    for level in LEVELS:
+        ids = np.setdiff1d(catalog.module_level_ids(module_id, level), solved, assume_unique=True)
+        if ids.size:
+            available[level] = ids
+    return available
+
+def _choice(ids, size, ability):
+    """Sorteio sem reposição, ponderado pela calibração se a habilidade for conhecida"""
+    weights = selection_weights(ids, ability) if ability is not None else None
+    return _rng.choice(ids, size, replace=False, p=weights)
+
+def sample_by_level(module_id, quantity, user_id):
+    """
+    Sorteia quantity questões não resolvidas do módulo, distribuídas
+    igualmente entre os níveis disponíveis; o resto da divisão é sorteado
+    entre as questões que sobraram. Se o usuário já tiver habilidade
+    calibrada, o sorteio favorece questões de dificuldade próxima a ela.
+    Retorna um array de IDs.
+    """
+    available = available_by_level(module_id, get_solved_bits(user_id))
+    if not available:
+        return EMPTY_IDS
+
+    ability = get_user_ability(user_id)
+
+    per_level, remaining = divmod(quantity, len(available))
+
+    # Primeiro, seleciona questões de cada nível
+    selected = []
+    if per_level > 0:
+        for ids in available.values():
+            selected.append(_choice(ids, min(per_level, ids.size), ability))
+
+    # Se ainda precisamos de mais questões, completa com as que não foram sorteadas
+    if remaining > 0:
+        pool = np.concatenate(list(available.values()))
+        if selected:
+            pool = np.setdiff1d(pool, np.concatenate(selected), assume_unique=True)
+        if pool.size:
+            selected.append(_choice(pool, min(remaining, pool.size), ability))
+
+    return np.concatenate(selected) if selected else EMPTY_IDS
+
+def sample_placement(count, stratified=False):
+    """
+    Sorteia count questões do teste de nivelamento a partir do conjunto de
+    IDs do catálogo. Com stratified, distribui as questões igualmente entre
+    os níveis (o resto vai para os níveis mais baixos). Retorna um array de IDs.
+    """
+    catalog = get_catalog()
+    pool = catalog.placement_ids
+    if not stratified or not catalog.placement_by_level:
+        return _rng.choice(pool, min(count, pool.size), replace=False)
+
+    per_level, remaining = divmod(count, len(catalog.placement_by_level))
+    selected = []
+    for position, ids in enumerate(catalog.placement_by_level.values()):
+        size = per_level + (1 if position < remaining else 0)
+        selected.append(_rng.choice(ids, min(size, ids.size), replace=False))
+
+    # Completa com outras questões se algum nível tiver menos questões que o necessário
+    selected = np.concatenate(selected)
+    missing = min(count, pool.size) - selected.size
+    if missing > 0:
+        rest = np.setdiff1d(pool, selected, assume_unique=True)
+        selected = np.concatenate([selected, _rng.choice(rest, missing, replace=False)])
+    return selected
@@ -0,0 +1,100 @@
+import threading
+import numpy as np
+from cachetools import TTLCache
+from flask import current_app
+from app import db
+from app.models.user_answer import UserAnswer
+from app.models.user_solved_set import UserSolvedSet
+
+# Bitsets por usuário (LRU com expiração, por worker). Como o conjunto de
+# questões resolvidas só cresce, uma cópia antiga apenas subestima o progresso
+# até expirar; as escritas sempre partem do valor gravado no banco.
+_cache = None
+_cache_lock = threading.Lock()
+
+def bits_from_bytes(data):
+    """Converte o bitset armazenado (little-endian) em inteiro"""
+    return int.from_bytes(data or b'', 'little')
+
+def bits_to_bytes(bits):
+    """Converte o bitset em bytes (little-endian) para armazenamento"""
+    return bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+
+def bits_from_ids(question_ids):
+    """Monta um bitset a partir de uma coleção de IDs de questões"""
+    bits = 0
+    for question_id in question_ids:
+        bits |= 1 << question_id
+    return bits
+
+def ids_from_bits(bits):
+    """Retorna os IDs marcados no bitset como array ordenado (int64)"""
+    data = np.frombuffer(bits_to_bytes(bits), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(data, bitorder='little')).astype(np.int64)
+
+def is_solved(bits, question_id):
+    """Indica se a questão está marcada como resolvida no bitset"""
+    return (bits >> question_id) & 1 == 1
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TTLCache(
+                    maxsize=current_app.config.get('SOLVED_CACHE_SIZE', 10000),
+                    ttl=current_app.config.get('SOLVED_CACHE_TTL', 300)
+                )
+    return _cache
+
+def _load_from_history(user_id):
+    """Monta o bitset a partir do histórico de respostas corretas do usuário"""
+    rows = db.session.query(UserAnswer.question_id).filter(
+        UserAnswer.user_id == user_id,
+        UserAnswer.is_correct == True
+    ).distinct().all()
+    return bits_from_ids(row[0] for row in rows)
+
+def get_solved_bits(user_id):
+    """
+    Retorna o bitset de questões resolvidas pelo usuário.
+    Usuários sem registro em user_solved_sets têm o bitset montado a partir
+    do histórico de respostas e gravado na próxima escrita.
+    """
+    cache = _get_cache()
+    with _cache_lock:
+        bits = cache.get(user_id)
+    if bits is not None:
+        return bits
+
+    solved_set = db.session.get(UserSolvedSet, user_id)
+    if solved_set:
+        bits = bits_from_bytes(solved_set.bits)
+    else:
+        bits = _load_from_history(user_id)
+
+    with _cache_lock:
+        cache[user_id] = bits
+    return bits
+
+def mark_solved(user_id, question_ids):
+    """
+    Marca as questões como resolvidas pelo usuário e retorna o novo bitset.
+    Não faz commit: deve rodar dentro da transação do quiz.
+    """
+    solved_set = db.session.get(UserSolvedSet, user_id, with_for_update=True)
+    if solved_set:
+        bits = bits_from_bytes(solved_set.bits)
+    else:
+        bits = _load_from_history(user_id)
+        solved_set = UserSolvedSet(user_id=user_id)
+        db.session.add(solved_set)
+
+    new_bits = bits | bits_from_ids(question_ids)
+    if new_bits != bits or not solved_set.bits:
+        solved_set.bits = bits_to_bytes(new_bits)
+
+    cache = _get_cache()
+    with _cache_lock:
+        cache[user_id] = new_bits
+    return new_bits
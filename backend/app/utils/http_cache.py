@@ -0,0 +1,26 @@
+import hashlib
+from flask import current_app, request
+
+def encode_json(payload):
+    """
+    Serializa o payload exatamente como o jsonify faria e retorna
+    (bytes, etag), onde o etag é o hash do conteúdo serializado.
+    """
+    body = current_app.json.response(payload).get_data()
+    etag = hashlib.sha256(body).hexdigest()[:32]
+    return body, etag
+
+def cached_json_response(body, etag, status=200):
+    """
+    Responde com um JSON já serializado e seu ETag (forte). Se o cliente
+    enviar If-None-Match com o mesmo ETag, responde 304 sem corpo.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, status=status, mimetype='application/json')
+
+    response.set_etag(etag)
+    # Força a revalidação pelo cliente, que passa a receber 304 enquanto o conteúdo não mudar
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -1,15 +1,213 @@
 import jwt
+import time
+import hashlib
 import datetime
+import threading
+from types import SimpleNamespace
+from cachetools import TTLCache, TLRUCache
 from flask import current_app, request, jsonify
 from functools import wraps
+from app import db
 from app.models.user import User
+from app.utils.metrics import LatencyStats, register_metrics
+
+# Cache dos dados dos usuários autenticados (LRU com expiração, por worker)
+_user_cache = None
+_user_cache_lock = threading.Lock()
+
+# Campos do usuário guardados no cache (a senha nunca é guardada)
+USER_FIELDS = ('id', 'username', 'email', 'created_at', 'placement_level', 'placement_result')
+
+class UserNotFound(LookupError):
+    """O usuário do token não existe mais"""
+
+def _get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        with _user_cache_lock:
+            if _user_cache is None:
+                _user_cache = TTLCache(
+                    maxsize=current_app.config.get('USER_CACHE_SIZE', 10000),
+                    ttl=current_app.config.get('USER_CACHE_TTL', 300)
+                )
+    return _user_cache
+
+def load_user(user_id):
+    """
+    Retorna uma cópia somente leitura dos dados do usuário, do cache do
+    worker ou do banco. Levanta UserNotFound se o usuário não existir.
+    """
+    cache = _get_user_cache()
+    with _user_cache_lock:
+        user = cache.get(user_id)
+    if user is not None:
+        return user
+
+    row = db.session.get(User, user_id)
+    if not row:
+        raise UserNotFound(user_id)
+    user = SimpleNamespace(**{field: getattr(row, field) for field in USER_FIELDS})
+
+    with _user_cache_lock:
+        cache[user_id] = user
+    return user
+
+def invalidate_user(user_id):
+    """Remove o usuário do cache deste worker (chamar após alterar seus dados)"""
+    cache = _get_user_cache()
+    with _user_cache_lock:
+        cache.pop(user_id, None)
+
+class AuthenticatedUser:
+    """
+    Usuário da requisição. O id vem da claim 'sub' do token assinado, então
+    rotas que só precisam do id não consultam o banco; os demais campos são
+    carregados sob demanda (ver load_user).
+    """
+
+    def __init__(self, user_id):
+        self.id = user_id
+        self._user = None
+
+    def __getattr__(self, name):
+        if name not in USER_FIELDS:
+            raise AttributeError(name)
+        if self._user is None:
+            self._user = load_user(self.id)
+        return getattr(self._user, name)
+
+# Audiência dos tokens de login; tokens assinados para outros fins
+# (ex.: sessão do nivelamento) não são aceitos como autenticação
+LOGIN_AUDIENCE = 'linguatech:login'
+
+# Claims dos tokens já verificados, indexadas pelo hash do token (por worker).
+# Cada entrada expira junto com o token (claim 'exp').
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+class AuthStats:
+    """Contadores da autenticação do worker, expostos em /api/metrics"""
+
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.failures = 0
+        self.verify_latency = LatencyStats()
+
+    def snapshot(self):
+        return {
+            'requests': self.requests,
+            'cache_hits': self.cache_hits,
+            'failures': self.failures,
+            'cached_tokens': len(_token_cache) if _token_cache is not None else 0,
+            'verify_latency': self.verify_latency.snapshot()
+        }
+
+auth_stats = AuthStats()
+
+def _token_expiry(key, claims, now):
+    return claims.get('exp', now)
+
+def _get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        with _token_cache_lock:
+            if _token_cache is None:
+                _token_cache = TLRUCache(
+                    maxsize=current_app.config.get('TOKEN_CACHE_SIZE', 10000),
+                    ttu=_token_expiry,
+                    timer=time.time
+                )
+    return _token_cache
+
+def decode_token(token):
+    """
+    Verifica o token de login e retorna suas claims. Tokens já verificados
+    são lidos do cache até expirarem. Levanta jwt.InvalidTokenError (ou
+    jwt.ExpiredSignatureError) se o token for inválido ou não for de login.
+    """
+    cache = _get_token_cache()
+    key = hashlib.sha256(token.encode('utf-8')).digest()
+    with _token_cache_lock:
+        claims = cache.get(key)
+    if claims is not None:
+        auth_stats.cache_hits += 1
+        return claims
+
+    start = time.perf_counter()
+    try:
+        claims = jwt.decode(
+            token, current_app.config['SECRET_KEY'], algorithms=['HS256'], audience=LOGIN_AUDIENCE,
+            options={'require': ['exp', 'sub', 'aud']}
+        )
+    except jwt.MissingRequiredClaimError as e:
+        # Tokens de login emitidos antes da claim 'aud' continuam válidos até
+        # expirarem (JWT_ACCEPT_LEGACY_TOKENS); nenhum outro token é assinado sem 'aud'
+        if e.claim != 'aud' or not current_app.config.get('JWT_ACCEPT_LEGACY_TOKENS', False):
+            raise
+        claims = jwt.decode(
+            token, current_app.config['SECRET_KEY'], algorithms=['HS256'],
+            options={'require': ['exp', 'sub']}
+        )
+    auth_stats.verify_latency.record(time.perf_counter() - start)
+
+    with _token_cache_lock:
+        cache[key] = claims
+    return claims
+
+# Chave do resultado da autenticação no environ da requisição
+AUTH_ENVIRON_KEY = 'linguatech.auth'
+
+def _authenticate():
+    """
+    Autentica a requisição atual uma única vez: retorna (usuário, erro).
+    O resultado fica guardado no environ da requisição para as demais leituras.
+    """
+    if AUTH_ENVIRON_KEY in request.environ:
+        return request.environ[AUTH_ENVIRON_KEY]
+
+    user, error = None, None
+    auth_header = request.headers.get('Authorization')
+    token = auth_header.split(' ')[1] if auth_header and len(auth_header.split(' ')) > 1 else None
+
+    if not auth_header:
+        error = 'Token ausente'
+    elif not token:
+        error = 'Token inválido'
+    else:
+        auth_stats.requests += 1
+        try:
+            user = AuthenticatedUser(int(decode_token(token)['sub']))
+        except jwt.ExpiredSignatureError:
+            error = 'Token expirado. Faça login novamente'
+        except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+            error = 'Token inválido'
+        if error:
+            auth_stats.failures += 1
+
+    request.environ[AUTH_ENVIRON_KEY] = (user, error)
+    return user, error
+
+def get_current_user():
+    """Usuário autenticado da requisição (AuthenticatedUser) ou None"""
+    return _authenticate()[0]
+
+def current_user_id():
+    """ID do usuário autenticado da requisição ou None"""
+    user = get_current_user()
+    return user.id if user else None
+
+def init_auth(app):
+    """Registra as métricas da autenticação na aplicação"""
+    register_metrics(app, 'auth', auth_stats.snapshot)
 
 def generate_token(user_id):
     """Gera um token JWT para o usuário"""
     payload = {
         'exp': datetime.datetime.utcnow() + datetime.timedelta(seconds=current_app.config['JWT_EXPIRATION_DELTA']),
         'iat': datetime.datetime.utcnow(),
-        'sub': user_id
+        'sub': str(user_id),
+        'aud': LOGIN_AUDIENCE
     }
     return jwt.encode(
         payload,
@@ -21,34 +219,14 @@ def token_required(f):
     """Decorator para verificar token JWT em rotas protegidas"""
     @wraps(f)
     def decorated(*args, **kwargs):
-        token = None
-        
-        # Pega o token do header Authorization
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(" ")[1]
-            except IndexError:
-                return jsonify({'message': 'Token inválido'}), 401
-        
-        if not token:
-            return jsonify({'message': 'Token ausente'}), 401
-        
-        try:
-            # Decodifica o token
-            payload = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user_id = payload['sub']
-            current_user = User.query.get(current_user_id)
-            
-            if not current_user:
-                return jsonify({'message': 'Usuário não encontrado'}), 401
-                
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': 'Token expirado. Faça login novamente'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'message': 'Token inválido'}), 401
+        current_user, error = _authenticate()
+        if error:
+            return jsonify({'message': error}), 401
             
         # Passa o usuário atual para a função
-        return f(current_user, *args, **kwargs)
+        try:
+            return f(current_user, *args, **kwargs)
+        except UserNotFound:
+            return jsonify({'message': 'Usuário não encontrado'}), 401
     
     return decorated
@@ -0,0 +1,51 @@
+import threading
+from collections import deque
+from flask import current_app
+
+def register_metrics(app, name, provider):
+    """
+    Registra um provedor de métricas na aplicação. provider() deve retornar
+    um dicionário serializável, exposto em GET /api/metrics sob a chave name.
+    """
+    app.extensions.setdefault('metrics', {})[name] = provider
+
+def metrics_snapshot():
+    """Coleta as métricas de todos os provedores registrados na aplicação atual"""
+    providers = current_app.extensions.get('metrics', {})
+    return {name: provider() for name, provider in providers.items()}
+
+class LatencyStats:
+    """Estatísticas de latência (em ms) das últimas medições, seguras entre threads"""
+
+    def __init__(self, window=1024):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total_ms, max_ms = self.count, self.total_ms, self.max_ms
+
+        def percentile(p):
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(len(samples) * p))], 2)
+
+        return {
+            'count': count,
+            'avg_ms': round(total_ms / count, 2) if count else 0.0,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'max_ms': round(max_ms, 2)
+        }
@@ -0,0 +1,21 @@
+import json
+from flask import current_app, stream_with_context
+
+def sse_event(data, event=None):
+    """Formata um evento Server-Sent Events com os dados em JSON"""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+def sse_response(events):
+    """
+    Resposta text/event-stream que envia cada evento gerado assim que fica
+    pronto (o gerador roda com o contexto da requisição).
+    """
+    response = current_app.response_class(stream_with_context(events), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Impede que proxies (nginx) acumulem a resposta antes de enviar
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,108 @@
+"""
+Benchmark da calibração de dificuldades e habilidades (calibration_service).
+
+Gera respostas sintéticas a partir de um modelo de Rasch com parâmetros
+conhecidos e mede o tempo do ajuste completo (fit_rasch) e da atualização
+incremental (update_rasch), além da correlação entre os parâmetros
+estimados e os verdadeiros. Com --database-rows, mede também a execução
+completa (leitura de user_answers + gravação) em um banco SQLite em memória.
+
+Uso:
+    python benchmarks/bench_calibration.py [--answers 10000000] [--users 200000]
+        [--questions 5000] [--database-rows 0]
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert
+from app import create_app, db
+from app.config import Config
+from app.models.module import Module
+from app.models.question import Question
+from app.models.user import User
+from app.models.user_answer import UserAnswer
+from app.services.calibration_service import fit_rasch, update_rasch, run_calibration
+
+def make_config(database_uri):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        SECRET_KEY = Config.SECRET_KEY or 'benchmark'
+    return BenchConfig
+
+def synthetic_answers(answers, users, questions, rng):
+    """Respostas (usuário, questão, acerto) de um modelo de Rasch com parâmetros conhecidos"""
+    theta = rng.normal(0.0, 1.0, users)
+    b = rng.normal(0.0, 1.0, questions)
+    user_idx = rng.integers(0, users, answers)
+    question_idx = rng.integers(0, questions, answers)
+    p = 1.0 / (1.0 + np.exp(-(theta[user_idx] - b[question_idx])))
+    correct = (rng.random(answers) < p).astype(np.int8)
+    return theta, b, user_idx, question_idx, correct
+
+def bench_arrays(answers, users, questions, rng):
+    true_theta, true_b, user_idx, question_idx, correct = synthetic_answers(answers, users, questions, rng)
+
+    # Ajuste completo com 90% das respostas; os 10% restantes entram pela atualização incremental
+    split = int(answers * 0.9)
+    start = time.perf_counter()
+    theta, info_theta, b, info_b, iterations = fit_rasch(
+        user_idx[:split], question_idx[:split], correct[:split], users, questions
+    )
+    full_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    update_rasch(theta, info_theta, b, info_b, user_idx[split:], question_idx[split:], correct[split:])
+    incremental_seconds = time.perf_counter() - start
+
+    print(f"respostas: {answers:,}  usuários: {users:,}  questões: {questions:,}")
+    print(f"ajuste completo ({split:,} respostas): {full_seconds:.1f}s, {iterations} iterações")
+    print(f"atualização incremental ({answers - split:,} respostas): {incremental_seconds:.2f}s")
+    print(f"correlação dificuldade estimada x verdadeira: {np.corrcoef(b, true_b)[0, 1]:.3f}")
+    print(f"correlação habilidade estimada x verdadeira: {np.corrcoef(theta, true_theta)[0, 1]:.3f}")
+
+def bench_database(rows, users, questions, rng, database_uri):
+    app = create_app(make_config(database_uri))
+    with app.app_context():
+        module = Module(title='Benchmark', description='benchmark')
+        db.session.add(module)
+        db.session.flush()
+        db.session.execute(insert(Question), [
+            {'question': f'Questão {k}', 'module_id': module.id, 'level': k % 5 + 1}
+            for k in range(questions)
+        ])
+        db.session.execute(insert(User), [
+            {'username': f'user{k}', 'email': f'user{k}@example.com', 'password': 'x'}
+            for k in range(users)
+        ])
+        _, _, user_idx, question_idx, correct = synthetic_answers(rows, users, questions, rng)
+        answer_rows = [
+            {'user_id': u + 1, 'question_id': q + 1, 'answer': 'a', 'is_correct': bool(c)}
+            for u, q, c in zip(user_idx.tolist(), question_idx.tolist(), correct.tolist())
+        ]
+        for start in range(0, len(answer_rows), 50_000):
+            db.session.execute(insert(UserAnswer), answer_rows[start:start + 50_000])
+        db.session.commit()
+
+        summary = run_calibration(full=True)
+        print(f"execução completa com banco ({rows:,} respostas): {summary['seconds']}s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--answers', type=int, default=10_000_000)
+    parser.add_argument('--users', type=int, default=200_000)
+    parser.add_argument('--questions', type=int, default=5_000)
+    parser.add_argument('--database-rows', type=int, default=0)
+    parser.add_argument('--database-uri', default='sqlite://')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    bench_arrays(args.answers, args.users, args.questions, rng)
+    if args.database_rows:
+        bench_database(args.database_rows, min(args.users, 10_000), args.questions, rng, args.database_uri)
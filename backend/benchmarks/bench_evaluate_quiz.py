@@ -0,0 +1,101 @@
+"""
+Benchmark da correção de quizzes (quiz_service.evaluate_quiz).
+
+Mede o número de comandos SQL e a latência de uma submissão com 10, 50 e
+200 respostas, em um banco SQLite em memória populado com dados sintéticos.
+
+Uso:
+    python benchmarks/bench_evaluate_quiz.py [--rounds 20] [--database-uri sqlite://]
+"""
+import sys
+import time
+import random
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from app import create_app, db
+from app.config import Config
+from app.models.module import Module
+from app.models.category import Category
+from app.models.question import Question, Option
+from app.models.user import User
+from app.services.quiz_service import evaluate_quiz
+
+SIZES = (10, 50, 200)
+
+def make_config(database_uri):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        SECRET_KEY = Config.SECRET_KEY or 'benchmark'
+    return BenchConfig
+
+def populate(modules=4, categories_per_module=5, questions_per_category=40):
+    """Cria conteúdo sintético e um usuário; retorna (user_id, question_ids)"""
+    question_ids = []
+    for m in range(modules):
+        module = Module(title=f'Módulo {m}', description='benchmark')
+        db.session.add(module)
+        db.session.flush()
+        for c in range(categories_per_module):
+            category = Category(name=f'Categoria {m}.{c}', module_id=module.id)
+            db.session.add(category)
+            db.session.flush()
+            for k in range(questions_per_category):
+                question = Question(
+                    question=f'Questão {m}.{c}.{k}',
+                    module_id=module.id,
+                    category_id=category.id,
+                    level=k % 5 + 1,
+                    explanation=''
+                )
+                db.session.add(question)
+                db.session.flush()
+                question_ids.append(question.id)
+                for option_id in 'abcd':
+                    db.session.add(Option(
+                        question_id=question.id,
+                        option_id=option_id,
+                        text=f'Opção {option_id}',
+                        is_correct=option_id == 'a'
+                    ))
+    user = User(username='benchmark', email='benchmark@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id, question_ids
+
+def run(rounds, database_uri):
+    app = create_app(make_config(database_uri))
+    with app.app_context():
+        user_id, question_ids = populate()
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(1))
+
+        print(f"{'respostas':>10} {'comandos SQL':>14} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+        for size in SIZES:
+            timings = []
+            counts = []
+            for _ in range(rounds):
+                answers = [
+                    {'questionId': question_id, 'selectedOption': random.choice('abcd')}
+                    for question_id in random.sample(question_ids, size)
+                ]
+                statements.clear()
+                start = time.perf_counter()
+                evaluate_quiz(answers, user_id)
+                timings.append((time.perf_counter() - start) * 1000)
+                counts.append(len(statements))
+
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(f"{size:>10} {statistics.median(counts):>14.0f} {statistics.median(timings):>10.1f} {p95:>10.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--database-uri', default='sqlite://')
+    args = parser.parse_args()
+    run(args.rounds, args.database_uri)
@@ -0,0 +1,142 @@
+"""
+Benchmark de uma rajada de logins (bcrypt) e seu efeito nas demais rotas.
+
+Sobe a aplicação em um servidor WSGI com threads e dispara --logins logins
+concorrentes, enquanto uma sonda mede a latência de GET /api/questions.
+Roda duas vezes: com o bcrypt na thread da requisição (PASSWORD_POOL_WORKERS=0)
+e no pool de processos (--workers processos).
+
+Uso:
+    python benchmarks/bench_login_burst.py [--logins 200] [--concurrency 32]
+        [--workers 4] [--rounds 12]
+"""
+import sys
+import json
+import time
+import logging
+import tempfile
+import argparse
+import threading
+import statistics
+import urllib.error
+import urllib.request
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import bcrypt
+from werkzeug.serving import make_server
+from app import create_app, db
+from app.config import Config
+from app.models.module import Module
+from app.models.category import Category
+from app.models.question import Question, Option
+from app.models.user import User
+
+PASSWORD = 'benchmark-password'
+
+def make_config(database_uri, workers, rounds, max_pending):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        SECRET_KEY = Config.SECRET_KEY or 'benchmark'
+        BCRYPT_SALT_ROUNDS = rounds
+        PASSWORD_POOL_WORKERS = workers
+        PASSWORD_POOL_MAX_PENDING = max_pending
+        PASSWORD_POOL_QUEUE_TIMEOUT = 30.0
+    return BenchConfig
+
+def populate(rounds):
+    module = Module(title='Benchmark', description='benchmark')
+    db.session.add(module)
+    db.session.flush()
+    category = Category(name='Benchmark', module_id=module.id)
+    db.session.add(category)
+    db.session.flush()
+    for k in range(20):
+        question = Question(question=f'Questão {k}', module_id=module.id, category_id=category.id, level=k % 5 + 1)
+        db.session.add(question)
+        db.session.flush()
+        db.session.add(Option(question_id=question.id, option_id='a', text='Opção a', is_correct=True))
+    hashed = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    db.session.add(User(username='benchmark', email='benchmark@example.com', password=hashed))
+    db.session.commit()
+    return category.id
+
+def request(url, body=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, (time.perf_counter() - start) * 1000
+
+def percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return 0.0, 0.0
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+def run_mode(label, workers, args, database_uri):
+    app = create_app(make_config(database_uri, workers, args.rounds, args.concurrency))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        category_id = populate(args.rounds)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    probe_url = f'{base}/api/questions?categoryId={category_id}'
+
+    # Latência da sonda sem carga
+    idle = [request(probe_url)[1] for _ in range(50)]
+
+    # Rajada de logins com a sonda rodando em paralelo
+    busy = []
+    stop = threading.Event()
+
+    def probe():
+        while not stop.is_set():
+            busy.append(request(probe_url)[1])
+            time.sleep(0.01)
+
+    probe_thread = threading.Thread(target=probe)
+    probe_thread.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(
+            lambda _: request(f'{base}/api/auth/login', {'email': 'benchmark@example.com', 'password': PASSWORD}),
+            range(args.logins)
+        ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    probe_thread.join()
+    server.shutdown()
+
+    ok = sum(1 for status, _ in results if status == 200)
+    login_p50, login_p95 = percentiles([ms for _, ms in results])
+    idle_p50, idle_p95 = percentiles(idle)
+    busy_p50, busy_p95 = percentiles(busy)
+    print(f"\n{label}")
+    print(f"  logins: {ok}/{len(results)} ok em {elapsed:.1f}s ({len(results) / elapsed:.1f}/s), p50 {login_p50:.0f} ms, p95 {login_p95:.0f} ms")
+    print(f"  /api/questions sem carga:     p50 {idle_p50:.1f} ms, p95 {idle_p95:.1f} ms")
+    print(f"  /api/questions durante rajada: p50 {busy_p50:.1f} ms, p95 {busy_p95:.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=12)
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f'sqlite:///{Path(tmp) / "bench.db"}'
+        run_mode('bcrypt na thread da requisição', 0, args, database_uri)
+        run_mode(f'bcrypt no pool de processos ({args.workers} processos)', args.workers, args, database_uri)
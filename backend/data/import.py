@@ -7,6 +7,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 from app import create_app, db
 from app.models.module import Module
 from app.models.question import Question, Option
+from app.models.content_version import ContentVersion
 
 app = create_app()
 
@@ -31,7 +32,8 @@ def importar_perguntas_sem_categoria():
                 level=q["level"],
                 explanation=q.get("explanation", ""),
                 module_id=modulo.id,
-                category_id=None  # deixa sem categoria
+                category_id=None,  # deixa sem categoria
+                is_placement=True
             )
             db.session.add(nova_pergunta)
             db.session.flush()  # para gerar ID da pergunta
@@ -45,7 +47,10 @@ def importar_perguntas_sem_categoria():
                 )
                 db.session.add(nova_opcao)
 
+        # Invalida o catálogo de conteúdo em memória dos workers
+        version = ContentVersion.bump()
         db.session.commit()
+        print(f"🔄 Versão do conteúdo atualizada para {version}")
         print("✅ Perguntas importadas com sucesso!")
 
 if __name__ == "__main__":
@@ -9,6 +9,7 @@ from app.models.module import Module
 from app.models.category import Category
 from app.models.question import Question, Option
 from app.models.user_placement_answer import UserPlacementAnswer
+from app.models.content_version import ContentVersion
 
 app = create_app()
 
@@ -224,8 +225,11 @@ def seed_from_json():
                 skipped_count += 1
                 continue
                 
+        # Invalida o catálogo de conteúdo em memória dos workers
+        version = ContentVersion.bump()
         db.session.commit()
         
+        print(f"🔄 Versão do conteúdo atualizada para {version}")
         print(f"✅ Importação concluída! {imported_count} questões de nivelamento importadas, {skipped_count} questões duplicadas ignoradas.")
 
 if __name__ == "__main__":
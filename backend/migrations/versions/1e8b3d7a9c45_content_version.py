@@ -0,0 +1,32 @@
+"""content_version: catalog version counter
+
+Revision ID: 1e8b3d7a9c45
+Revises: c57e9b1f4a02
+Create Date: 2026-10-18 10:00:03.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1e8b3d7a9c45'
+down_revision = 'c57e9b1f4a02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('content_version'):
+        return
+    op.create_table(
+        'content_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('content_version')
@@ -0,0 +1,146 @@
+"""initial schema
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-18 10:00:00.000000
+
+Tabelas do esquema original. Bancos criados antes das migrações (por
+db.create_all) já têm essas tabelas; a criação é ignorada para elas.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('users'):
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password', sa.String(length=255), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('placement_level', sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username')
+        )
+    if not _has_table('modules'):
+        op.create_table(
+            'modules',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('title', sa.String(length=100), nullable=False),
+            sa.Column('description', sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not _has_table('categories'):
+        op.create_table(
+            'categories',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('module_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['module_id'], ['modules.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not _has_table('questions'):
+        op.create_table(
+            'questions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('question', sa.Text(), nullable=False),
+            sa.Column('module_id', sa.Integer(), nullable=True),
+            sa.Column('category_id', sa.Integer(), nullable=True),
+            sa.Column('level', sa.Integer(), nullable=True),
+            sa.Column('explanation', sa.Text(), nullable=True),
+            sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+            sa.ForeignKeyConstraint(['module_id'], ['modules.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not _has_table('options'):
+        op.create_table(
+            'options',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sa.Integer(), nullable=False),
+            sa.Column('option_id', sa.String(length=10), nullable=False),
+            sa.Column('text', sa.Text(), nullable=False),
+            sa.Column('is_correct', sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not _has_table('user_progress'):
+        op.create_table(
+            'user_progress',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('module_id', sa.Integer(), nullable=False),
+            sa.Column('category_id', sa.Integer(), nullable=True),
+            sa.Column('progress', sa.Integer(), nullable=True),
+            sa.Column('total_quizzes', sa.Integer(), nullable=True),
+            sa.Column('last_updated', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+            sa.ForeignKeyConstraint(['module_id'], ['modules.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not _has_table('user_placement_answer'):
+        op.create_table(
+            'user_placement_answer',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sa.Integer(), nullable=True),
+            sa.Column('selected_option_id', sa.String(), nullable=False),
+            sa.Column('is_correct', sa.Boolean(), nullable=True),
+            sa.Column('level', sa.Integer(), nullable=True),
+            sa.Column('timestamp', sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not _has_table('user_streaks'):
+        op.create_table(
+            'user_streaks',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('current_streak', sa.Integer(), nullable=True),
+            sa.Column('record_streak', sa.Integer(), nullable=True),
+            sa.Column('last_activity', sa.DateTime(), nullable=True),
+            sa.Column('weekly_progress', sa.String(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not _has_table('user_answers'):
+        op.create_table(
+            'user_answers',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('question_id', sa.Integer(), nullable=False),
+            sa.Column('answer', sa.String(length=500), nullable=False),
+            sa.Column('is_correct', sa.Boolean(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('user_answers')
+    op.drop_table('user_streaks')
+    op.drop_table('user_placement_answer')
+    op.drop_table('user_progress')
+    op.drop_table('options')
+    op.drop_table('questions')
+    op.drop_table('categories')
+    op.drop_table('modules')
+    op.drop_table('users')
@@ -0,0 +1,46 @@
+"""users.placement_result and placement_sessions
+
+Revision ID: 4c7e1a2b8d56
+Revises: 9d0a5c4e7f18
+Create Date: 2026-10-18 10:00:06.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c7e1a2b8d56'
+down_revision = '9d0a5c4e7f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('users')}
+
+    if 'placement_result' not in columns:
+        op.add_column('users', sa.Column('placement_result', sa.Integer(), nullable=True))
+    if not inspector.has_table('placement_sessions'):
+        op.create_table(
+            'placement_sessions',
+            sa.Column('id', sa.String(length=64), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('answers', sa.JSON(), nullable=False),
+            sa.Column('next_question_id', sa.Integer(), nullable=True),
+            sa.Column('step', sa.Integer(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_placement_sessions_user_id', 'placement_sessions', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_placement_sessions_user_id', table_name='placement_sessions')
+    op.drop_table('placement_sessions')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('placement_result')
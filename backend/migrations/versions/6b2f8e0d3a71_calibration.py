@@ -0,0 +1,58 @@
+"""calibration: question difficulties, user abilities and calibration state
+
+Revision ID: 6b2f8e0d3a71
+Revises: 1e8b3d7a9c45
+Create Date: 2026-10-18 10:00:04.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b2f8e0d3a71'
+down_revision = '1e8b3d7a9c45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('question_difficulties'):
+        op.create_table(
+            'question_difficulties',
+            sa.Column('question_id', sa.Integer(), nullable=False),
+            sa.Column('difficulty', sa.Float(), nullable=False),
+            sa.Column('information', sa.Float(), nullable=False),
+            sa.Column('answer_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['question_id'], ['questions.id']),
+            sa.PrimaryKeyConstraint('question_id')
+        )
+    if not inspector.has_table('user_abilities'):
+        op.create_table(
+            'user_abilities',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('ability', sa.Float(), nullable=False),
+            sa.Column('information', sa.Float(), nullable=False),
+            sa.Column('answer_count', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+    if not inspector.has_table('calibration_state'):
+        op.create_table(
+            'calibration_state',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('last_answer_id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.Integer(), nullable=False),
+            sa.Column('full_run_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+
+
+def downgrade():
+    op.drop_table('calibration_state')
+    op.drop_table('user_abilities')
+    op.drop_table('question_difficulties')
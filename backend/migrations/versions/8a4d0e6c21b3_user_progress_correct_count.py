@@ -0,0 +1,39 @@
+"""user_progress: correct_count and lookup index
+
+Revision ID: 8a4d0e6c21b3
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-18 10:00:01.000000
+
+Progresso materializado por categoria. As linhas existentes ficam com
+correct_count 0; recalcule com `flask progress rebuild`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a4d0e6c21b3'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('user_progress')}
+    indexes = {index['name'] for index in inspector.get_indexes('user_progress')}
+
+    if 'correct_count' not in columns:
+        op.add_column('user_progress', sa.Column('correct_count', sa.Integer(), server_default='0', nullable=False))
+    if 'ix_user_progress_user_module_category' not in indexes:
+        op.create_index(
+            'ix_user_progress_user_module_category', 'user_progress',
+            ['user_id', 'module_id', 'category_id'], unique=False
+        )
+
+
+def downgrade():
+    op.drop_index('ix_user_progress_user_module_category', table_name='user_progress')
+    with op.batch_alter_table('user_progress') as batch_op:
+        batch_op.drop_column('correct_count')
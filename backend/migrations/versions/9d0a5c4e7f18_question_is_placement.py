@@ -0,0 +1,45 @@
+"""questions: is_placement flag
+
+Revision ID: 9d0a5c4e7f18
+Revises: 6b2f8e0d3a71
+Create Date: 2026-10-18 10:00:05.000000
+
+Marca as questões de nivelamento já cadastradas pela regra usada antes
+da coluna existir (explicação 'BV' e sem categoria).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d0a5c4e7f18'
+down_revision = '6b2f8e0d3a71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    columns = {column['name'] for column in inspector.get_columns('questions')}
+    indexes = {index['name'] for index in inspector.get_indexes('questions')}
+
+    if 'is_placement' not in columns:
+        op.add_column('questions', sa.Column('is_placement', sa.Boolean(), server_default=sa.false(), nullable=False))
+        questions = sa.table(
+            'questions', sa.column('is_placement', sa.Boolean()),
+            sa.column('explanation', sa.Text()), sa.column('category_id', sa.Integer())
+        )
+        op.execute(
+            questions.update()
+            .where(questions.c.explanation == 'BV', questions.c.category_id.is_(None))
+            .values(is_placement=True)
+        )
+    if 'ix_questions_is_placement' not in indexes:
+        op.create_index('ix_questions_is_placement', 'questions', ['is_placement'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_questions_is_placement', table_name='questions')
+    with op.batch_alter_table('questions') as batch_op:
+        batch_op.drop_column('is_placement')
@@ -0,0 +1,33 @@
+"""user_solved_sets: solved questions bitset per user
+
+Revision ID: c57e9b1f4a02
+Revises: 8a4d0e6c21b3
+Create Date: 2026-10-18 10:00:02.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c57e9b1f4a02'
+down_revision = '8a4d0e6c21b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('user_solved_sets'):
+        return
+    op.create_table(
+        'user_solved_sets',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('bits', sa.LargeBinary(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_solved_sets')
@@ -0,0 +1,41 @@
+"""ai_explanations: persistent cache of generated explanations
+
+Revision ID: e2b6f9c0d417
+Revises: 4c7e1a2b8d56
+Create Date: 2026-10-18 10:00:07.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b6f9c0d417'
+down_revision = '4c7e1a2b8d56'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table('ai_explanations'):
+        if inspector.get_pk_constraint('ai_explanations')['constrained_columns'] == ['prompt_hash', 'prompt_version']:
+            return
+        # Tabela criada por create_all() com a chave antiga (só prompt_hash):
+        # é apenas um cache, então é recriada vazia com a chave composta
+        if 'ix_ai_explanations_prompt_version' in {i['name'] for i in inspector.get_indexes('ai_explanations')}:
+            op.drop_index('ix_ai_explanations_prompt_version', table_name='ai_explanations')
+        op.drop_table('ai_explanations')
+    op.create_table(
+        'ai_explanations',
+        sa.Column('prompt_hash', sa.String(length=64), nullable=False),
+        sa.Column('prompt_version', sa.String(length=16), nullable=False),
+        sa.Column('kind', sa.String(length=32), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('prompt_hash', 'prompt_version')
+    )
+
+
+def downgrade():
+    op.drop_table('ai_explanations')
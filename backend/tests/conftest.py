@@ -0,0 +1,76 @@
+import os
+import sys
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SECRET_KEY', 'test-secret')
+os.environ.setdefault('DATABASE_URI', 'sqlite://')
+
+from app import create_app, db
+from app.config import Config
+
+class TestConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SECRET_KEY = 'test-secret'
+    JWT_SECRET_KEY = 'test-secret'
+    LLM_PROVIDER = 'fake'
+
+def reset_worker_caches():
+    """Os caches por worker ficam em variáveis de módulo; cada teste começa sem eles"""
+    from app.services import solved_service
+    from app.utils import jwt_utils
+    solved_service._cache = None
+    jwt_utils._user_cache = None
+    jwt_utils._token_cache = None
+
+@pytest.fixture
+def make_app():
+    """Cria aplicações de teste com banco SQLite em memória e tabelas criadas"""
+    contexts = []
+
+    def factory(**overrides):
+        reset_worker_caches()
+        app = create_app(type('Config', (TestConfig,), overrides))
+        context = app.app_context()
+        context.push()
+        db.create_all()
+        contexts.append(context)
+        return app
+
+    yield factory
+
+    for context in reversed(contexts):
+        db.session.remove()
+        db.drop_all()
+        context.pop()
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+class StatementCounter:
+    """Conta os comandos SQL enviados ao banco (evento before_cursor_execute)"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _count(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+@pytest.fixture
+def count_statements():
+    return lambda: StatementCounter(db.engine)
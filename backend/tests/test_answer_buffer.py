@@ -0,0 +1,133 @@
+import time
+import pytest
+from app import db
+from app.models import Module, Category, Question, Option, User, UserAnswer
+from app.services import quiz_service
+from app.services.answer_buffer import AnswerWriteBuffer
+from app.services.progress_service import get_user_progress
+
+def seed_users(count=2, questions=2):
+    """Cria uma categoria com questões e count usuários; retorna (ids dos usuários, ids das questões)"""
+    module = Module(title='Módulo', description='')
+    db.session.add(module)
+    db.session.flush()
+    category = Category(name='Categoria', module_id=module.id)
+    db.session.add(category)
+    db.session.flush()
+
+    question_ids = []
+    for k in range(questions):
+        question = Question(
+            question=f'Questão {k}', module_id=module.id, category_id=category.id,
+            level=1, explanation=''
+        )
+        db.session.add(question)
+        db.session.flush()
+        db.session.add(Option(question_id=question.id, option_id='a', text='certa', is_correct=True))
+        question_ids.append(question.id)
+
+    users = [User(username=f'aluno{k}', email=f'aluno{k}@example.com', password='x') for k in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return [user.id for user in users], question_ids
+
+def rows(user_id, question_ids):
+    return [{'user_id': user_id, 'question_id': q, 'answer': 'a', 'is_correct': True} for q in question_ids]
+
+@pytest.fixture
+def buffer(app, monkeypatch):
+    """Buffer ligado, sem a thread de gravação: as gravações acontecem em flush()"""
+    buffer = AnswerWriteBuffer(app)
+    buffer.enabled = True
+    monkeypatch.setattr(buffer, '_ensure_started', lambda: None)
+    return buffer
+
+def fail_for(monkeypatch, user_id):
+    """Faz a atualização de progresso de um usuário falhar"""
+    apply_progress = quiz_service.apply_progress
+
+    def failing(uid, answer_rows, count_quiz=True):
+        if uid == user_id:
+            raise RuntimeError('falha simulada')
+        return apply_progress(uid, answer_rows, count_quiz)
+
+    monkeypatch.setattr(quiz_service, 'apply_progress', failing)
+
+def answer_count(user_id):
+    return UserAnswer.query.filter_by(user_id=user_id).count()
+
+def test_submit_is_refused_when_disabled(app):
+    buffer = AnswerWriteBuffer(app)
+    assert buffer.submit(1, rows(1, [1])) is False
+
+def test_invalid_rows_are_refused_before_queueing(buffer):
+    with pytest.raises(ValueError):
+        buffer.submit(1, [{'user_id': 1, 'question_id': 1, 'answer': 'x' * 501, 'is_correct': True}])
+    assert buffer.stats()['queue_depth'] == 0
+
+def test_flush_writes_queued_submissions_with_progress(buffer):
+    (first, second), question_ids = seed_users()
+    assert buffer.submit(first, rows(first, question_ids))
+    assert buffer.submit(second, rows(second, question_ids[:1]))
+
+    assert buffer.flush() == 3
+    assert answer_count(first) == 2 and answer_count(second) == 1
+    assert list(get_user_progress(first)['categories'].values()) == [100]
+    assert list(get_user_progress(second)['categories'].values()) == [50]
+    assert buffer.stats()['flushed_rows'] == 3
+
+def test_failed_submission_is_isolated_and_retried(buffer, monkeypatch):
+    (good, bad), question_ids = seed_users()
+    buffer.submit(good, rows(good, question_ids))
+    buffer.submit(bad, rows(bad, question_ids))
+
+    with monkeypatch.context() as patch:
+        fail_for(patch, bad)
+        assert buffer.flush() == 2
+
+    # A submissão que falhou não impede as demais e fica para a próxima gravação
+    assert answer_count(good) == 2 and answer_count(bad) == 0
+    assert buffer.stats()['failed_batches'] == 1
+    assert buffer.stats()['retry_rows'] == 2
+
+    assert buffer.flush() == 2
+    assert answer_count(bad) == 2
+    assert buffer.stats()['retry_rows'] == 0
+
+def test_submission_is_dropped_after_max_attempts(buffer, monkeypatch):
+    (bad,), question_ids = seed_users(count=1)
+    fail_for(monkeypatch, bad)
+    buffer.submit(bad, rows(bad, question_ids))
+
+    for _ in range(AnswerWriteBuffer.MAX_ATTEMPTS):
+        assert buffer.flush() == 0
+
+    assert buffer.stats()['retry_rows'] == 0
+    assert buffer.stats()['dropped_rows'] == 2
+    assert answer_count(bad) == 0
+
+def test_full_queue_falls_back_to_synchronous_write(make_app, monkeypatch):
+    app = make_app(ANSWER_BUFFER_MAX_SIZE=1)
+    buffer = AnswerWriteBuffer(app)
+    buffer.enabled = True
+    monkeypatch.setattr(buffer, '_ensure_started', lambda: None)
+
+    assert buffer.submit(1, rows(1, [1]))
+    assert buffer.submit(1, rows(1, [2])) is False
+    assert buffer.stats()['rejected'] == 1
+
+def test_background_thread_flushes_by_age(make_app):
+    app = make_app(ANSWER_BUFFER_MAX_AGE=0.05, ANSWER_BUFFER_BATCH_SIZE=1000)
+    (user_id,), question_ids = seed_users(count=1)
+    buffer = AnswerWriteBuffer(app)
+    buffer.enabled = True
+    try:
+        buffer.submit(user_id, rows(user_id, question_ids))
+        deadline = time.monotonic() + 5
+        while buffer.stats()['flushed_rows'] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        buffer.shutdown()
+
+    assert buffer.stats()['flushed_rows'] == 2
+    assert answer_count(user_id) == 2
@@ -0,0 +1,65 @@
+from app import db
+from app.models import User
+from app.utils.jwt_utils import generate_token, invalidate_user, load_user, auth_stats
+
+def seed_user():
+    user = User(username='aluno', email='aluno@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def auth_headers(user_id):
+    return {'Authorization': f'Bearer {generate_token(user_id)}'}
+
+def user_queries(counter):
+    return [s for s in counter.statements if 'FROM users' in s]
+
+def test_cached_user_is_not_read_again(app, count_statements):
+    user_id = seed_user()
+    client = app.test_client()
+    headers = auth_headers(user_id)
+    assert client.get('/api/user/profile', headers=headers).status_code == 200
+
+    hits = auth_stats.cache_hits
+    with count_statements() as counter:
+        response = client.get('/api/user/profile', headers=headers)
+
+    assert response.get_json()['name'] == 'aluno'
+    assert user_queries(counter) == []
+    assert auth_stats.cache_hits == hits + 1
+
+def test_profile_update_invalidates_cached_user(app):
+    user_id = seed_user()
+    client = app.test_client()
+    headers = auth_headers(user_id)
+    client.get('/api/user/profile', headers=headers)
+
+    response = client.patch('/api/user/profile', json={'name': 'novo nome'}, headers=headers)
+    assert response.get_json()['name'] == 'novo nome'
+    assert client.get('/api/user/profile', headers=headers).get_json()['name'] == 'novo nome'
+
+def test_invalidate_user_reloads_from_database(app):
+    user_id = seed_user()
+    assert load_user(user_id).username == 'aluno'
+
+    # Alteração direta no banco: a cópia em cache continua até ser invalidada
+    db.session.get(User, user_id).username = 'alterado'
+    db.session.commit()
+    assert load_user(user_id).username == 'aluno'
+
+    invalidate_user(user_id)
+    assert load_user(user_id).username == 'alterado'
+
+def test_deleted_user_is_rejected_after_invalidation(app):
+    user_id = seed_user()
+    client = app.test_client()
+    headers = auth_headers(user_id)
+    assert client.get('/api/user/profile', headers=headers).status_code == 200
+
+    db.session.delete(db.session.get(User, user_id))
+    db.session.commit()
+    invalidate_user(user_id)
+
+    response = client.get('/api/user/profile', headers=headers)
+    assert response.status_code == 401
+    assert response.get_json()['message'] == 'Usuário não encontrado'
@@ -0,0 +1,98 @@
+import pytest
+from app.services.llm import CircuitBreaker, CircuitOpen, LLMClient, FakeProvider, LLMProviderError
+
+class FailingProvider(FakeProvider):
+    """FakeProvider que falha enquanto failing for verdadeiro"""
+
+    def __init__(self):
+        super().__init__()
+        self.failing = True
+        self.calls = 0
+
+    def generate(self, prompt, timeout=None):
+        self.calls += 1
+        if self.failing:
+            raise LLMProviderError('falha do provedor', retry_after=0)
+        return super().generate(prompt, timeout)
+
+def open_breaker(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(breaker.before_call(), False, 0.0)
+    assert breaker.state == 'open'
+
+def end_open_period(breaker):
+    breaker.opened_at -= breaker.open_seconds
+
+@pytest.fixture
+def breaker(make_app):
+    return CircuitBreaker(make_app(LLM_BREAKER_MIN_CALLS=4, LLM_BREAKER_FAILURE_RATE=0.5))
+
+def test_breaker_opens_at_the_failure_rate(breaker):
+    for healthy in (True, True, False):
+        breaker.record(breaker.before_call(), healthy, 0.0)
+    assert breaker.state == 'closed'
+
+    breaker.record(breaker.before_call(), False, 0.0)
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    assert breaker.stats()['rejected'] == 1
+
+def test_slow_calls_count_as_failures(breaker):
+    for _ in range(breaker.min_calls):
+        breaker.record(breaker.before_call(), True, breaker.slow_call + 1)
+    assert breaker.state == 'open'
+
+def test_half_open_lets_a_single_probe_through(breaker):
+    open_breaker(breaker)
+    end_open_period(breaker)
+
+    assert breaker.before_call() is True
+    assert breaker.state == 'half_open'
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+def test_successful_probe_closes_the_circuit(breaker):
+    open_breaker(breaker)
+    end_open_period(breaker)
+
+    breaker.record(breaker.before_call(), True, 0.0)
+    assert breaker.state == 'closed'
+    assert breaker.before_call() is False
+
+def test_failed_probe_reopens_the_circuit(breaker):
+    open_breaker(breaker)
+    end_open_period(breaker)
+
+    breaker.record(breaker.before_call(), False, 0.0)
+    assert breaker.state == 'open'
+    assert breaker.stats()['opened'] == 2
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+def test_released_probe_lets_the_next_call_probe(breaker):
+    open_breaker(breaker)
+    end_open_period(breaker)
+
+    breaker.release(breaker.before_call())
+    assert breaker.before_call() is True
+
+def test_open_circuit_skips_the_provider(make_app):
+    app = make_app(LLM_BREAKER_MIN_CALLS=3)
+    provider = FailingProvider()
+    client = LLMClient(provider=provider)
+    client.init_app(app)
+
+    for k in range(3):
+        with pytest.raises(LLMProviderError):
+            client.generate(f'prompt {k}')
+    with pytest.raises(CircuitOpen):
+        client.generate('prompt 3')
+    assert provider.calls == 3
+
+    # Meio aberto: a sondagem bem-sucedida fecha o circuito
+    provider.failing = False
+    end_open_period(client.breaker)
+    assert client.generate('prompt 4')
+    assert client.breaker.state == 'closed'
+    assert provider.calls == 4
@@ -0,0 +1,81 @@
+import threading
+import time
+import pytest
+from app.services.llm import LLMScheduler, LLMBusy, INTERACTIVE, BATCH
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condição não atingida a tempo'
+        time.sleep(0.005)
+
+def test_interactive_calls_are_admitted_before_waiting_batch_calls(make_app):
+    scheduler = LLMScheduler(make_app(LLM_MAX_IN_FLIGHT=1))
+    scheduler.acquire(INTERACTIVE, 1)
+    admitted = []
+
+    def call(priority):
+        scheduler.acquire(priority, 1)
+        admitted.append(priority)
+        scheduler.release(1)
+
+    # A chamada batch entra na fila antes da interativa
+    batch = threading.Thread(target=call, args=(BATCH,))
+    batch.start()
+    wait_until(lambda: scheduler.stats()['queued'][BATCH] == 1)
+    interactive = threading.Thread(target=call, args=(INTERACTIVE,))
+    interactive.start()
+    wait_until(lambda: scheduler.stats()['queued'][INTERACTIVE] == 1)
+
+    scheduler.release(1)
+    batch.join(5)
+    interactive.join(5)
+
+    assert admitted == [INTERACTIVE, BATCH]
+
+def test_batch_calls_leave_the_reserve_for_interactive_calls(make_app):
+    scheduler = LLMScheduler(make_app(LLM_RPM=10, LLM_BATCH_RESERVE=0.2, LLM_BATCH_QUEUE_TIMEOUT=0.05))
+
+    for _ in range(8):
+        scheduler.acquire(BATCH, 1)
+        scheduler.release(1)
+    with pytest.raises(LLMBusy):
+        scheduler.acquire(BATCH, 1)
+
+    # A reserva de 20% do balde continua disponível para as interativas
+    scheduler.acquire(INTERACTIVE, 1)
+    scheduler.release(1)
+    assert scheduler.stats()['rejected'] == {INTERACTIVE: 0, BATCH: 1}
+
+def test_token_budget_limits_admission(make_app):
+    scheduler = LLMScheduler(make_app(LLM_TPM=1000, LLM_QUEUE_TIMEOUT=0.05))
+
+    scheduler.acquire(INTERACTIVE, 900)
+    scheduler.release(900)
+    with pytest.raises(LLMBusy) as error:
+        scheduler.acquire(INTERACTIVE, 500)
+    assert error.value.retry_after >= 1
+
+def test_full_queue_is_rejected_immediately(make_app):
+    scheduler = LLMScheduler(make_app(LLM_MAX_IN_FLIGHT=1, LLM_QUEUE_SIZE=1))
+    scheduler.acquire(INTERACTIVE, 1)
+    waiter = threading.Thread(target=lambda: (scheduler.acquire(INTERACTIVE, 1), scheduler.release(1)))
+    waiter.start()
+    wait_until(lambda: scheduler.stats()['queued'][INTERACTIVE] == 1)
+
+    start = time.monotonic()
+    with pytest.raises(LLMBusy):
+        scheduler.acquire(INTERACTIVE, 1)
+    assert time.monotonic() - start < 1
+
+    scheduler.release(1)
+    waiter.join(5)
+
+def test_pause_rejects_calls_that_cannot_wait_for_it(make_app):
+    scheduler = LLMScheduler(make_app(LLM_QUEUE_TIMEOUT=0.05))
+    scheduler.pause(30)
+
+    with pytest.raises(LLMBusy) as error:
+        scheduler.acquire(INTERACTIVE, 1)
+    assert error.value.retry_after >= 29
+    assert scheduler.stats()['quota_pauses'] == 1
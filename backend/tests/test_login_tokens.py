@@ -0,0 +1,37 @@
+import datetime
+import jwt
+from app import db
+from app.models import User
+
+def seed_user():
+    user = User(username='aluno', email='aluno@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def sign(app, expires_in=3600, **claims):
+    now = datetime.datetime.utcnow()
+    payload = {'exp': now + datetime.timedelta(seconds=expires_in), 'iat': now, **claims}
+    return jwt.encode(payload, app.config['SECRET_KEY'], algorithm='HS256')
+
+def profile_status(app, token):
+    response = app.test_client().get('/api/user/profile', headers={'Authorization': f'Bearer {token}'})
+    return response.status_code
+
+def test_tokens_for_other_audiences_are_rejected(app):
+    user_id = seed_user()
+    assert profile_status(app, sign(app, sub=str(user_id), aud='linguatech:placement')) == 401
+
+def test_legacy_tokens_without_audience_are_accepted(app):
+    # Tokens emitidos antes da claim 'aud' tinham sub numérico
+    user_id = seed_user()
+    assert profile_status(app, sign(app, sub=user_id)) == 200
+
+def test_expired_legacy_tokens_are_rejected(app):
+    user_id = seed_user()
+    assert profile_status(app, sign(app, expires_in=-60, sub=user_id)) == 401
+
+def test_legacy_tokens_can_be_disabled(make_app):
+    app = make_app(JWT_ACCEPT_LEGACY_TOKENS=False)
+    user_id = seed_user()
+    assert profile_status(app, sign(app, sub=user_id)) == 401
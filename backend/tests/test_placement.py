@@ -0,0 +1,108 @@
+import pytest
+from app import db
+from app.models import Question, Option, User, UserPlacementAnswer
+from app.services.placement_service import start_session, answer_question, SessionAlreadyUsed
+from app.utils.jwt_utils import generate_token
+
+def seed_placement(per_level=8):
+    """Cria questões de nivelamento (opção 'a' correta) em cada nível de 1 a 5 e um usuário"""
+    for level in range(1, 6):
+        for k in range(per_level):
+            question = Question(
+                question=f'Nível {level}.{k}', level=level, explanation='BV', is_placement=True
+            )
+            db.session.add(question)
+            db.session.flush()
+            db.session.add(Option(question_id=question.id, option_id='a', text='certa', is_correct=True))
+            db.session.add(Option(question_id=question.id, option_id='b', text='errada', is_correct=False))
+    user = User(username='aluno', email='aluno@example.com', password='x')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+def student(true_level):
+    """
+    Aluno do nível informado: acerta as questões de níveis abaixo do seu,
+    erra as de níveis acima e acerta metade (alternadamente) das do seu nível,
+    onde a dificuldade da questão coincide com a habilidade do aluno.
+    """
+    own_level_answers = []
+
+    def choose(question):
+        if question['level'] != true_level:
+            return 'a' if question['level'] < true_level else 'b'
+        own_level_answers.append(question['id'])
+        return 'a' if len(own_level_answers) % 2 else 'b'
+
+    return choose
+
+def run_session(user_id, choose):
+    """Responde a sessão adaptativa até o fim; retorna (resultado, tokens usados)"""
+    token, question = start_session(user_id)
+    tokens = []
+    while True:
+        tokens.append((token, question['id']))
+        result = answer_question(user_id, token, question['id'], choose(question))
+        if result['finished']:
+            return result, tokens
+        assert 'nivel' not in result and 'score' not in result
+        token, question = result['session'], result['question']
+
+@pytest.mark.parametrize('true_level', [1, 2, 3, 4, 5])
+def test_adaptive_session_converges_to_the_student_level(app, true_level):
+    user_id = seed_placement()
+
+    result, tokens = run_session(user_id, student(true_level))
+
+    assert result['nivel'] == true_level
+    assert result['placement_level'] == str(true_level)
+    assert app.config['PLACEMENT_MIN_ITEMS'] <= result['answered'] <= app.config['PLACEMENT_MAX_ITEMS']
+    assert len(tokens) == result['answered']
+
+    user = db.session.get(User, user_id)
+    assert user.placement_result == true_level
+    assert user.placement_level == str(true_level)
+    assert UserPlacementAnswer.query.filter_by(user_id=user_id).count() == result['answered']
+
+def test_session_stops_at_max_items(make_app):
+    make_app(PLACEMENT_TARGET_SE=0.0, PLACEMENT_LEVEL_CONFIDENCE=1.1, PLACEMENT_MAX_ITEMS=7)
+    user_id = seed_placement()
+
+    result, _ = run_session(user_id, student(3))
+
+    assert result['answered'] == 7
+
+def test_session_questions_are_not_repeated(app):
+    user_id = seed_placement()
+
+    _, tokens = run_session(user_id, student(4))
+
+    question_ids = [question_id for _, question_id in tokens]
+    assert len(question_ids) == len(set(question_ids))
+
+def test_session_token_cannot_be_replayed(app):
+    user_id = seed_placement()
+    token, question = start_session(user_id)
+    answer_question(user_id, token, question['id'], 'a')
+
+    with pytest.raises(SessionAlreadyUsed):
+        answer_question(user_id, token, question['id'], 'a')
+
+def test_placement_routes_require_login_and_hide_the_answer_key(app):
+    user_id = seed_placement()
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {generate_token(user_id)}'}
+
+    questions = client.get('/api/nivelamento/').get_json()
+    assert questions and all('correct' not in option for q in questions for option in q['options'])
+
+    choose = student(2)
+    answers = [{'questionId': q['id'], 'selectedOption': choose(q)} for q in questions]
+    assert client.post('/api/nivelamento/resultado', json={'answers': answers}).status_code == 401
+    assert client.post('/api/nivelamento/sessao').status_code == 401
+
+    result = client.post('/api/nivelamento/resultado', json={'answers': answers}, headers=headers).get_json()
+    assert result['total'] == len(answers)
+    assert result['placement_level'] == str(result['nivel'])
+    assert all(r['correct_options'] == ['a'] for r in result['respostas'])
+    assert client.get('/api/user/profile', headers=headers).get_json()['level'] == result['nivel']
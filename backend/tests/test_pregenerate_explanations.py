@@ -0,0 +1,100 @@
+import pytest
+from app import db
+from app.models import Module, Category, Question, Option, ContentVersion
+from app.services.explanation_service import pregenerate_explanations
+from app.services.llm import LLMClient, FakeProvider, LLMProviderError
+
+class CountingProvider(FakeProvider):
+    """FakeProvider que registra os prompts recebidos"""
+
+    def __init__(self, fail_first=0):
+        super().__init__()
+        self.prompts = []
+        self.fail_first = fail_first
+
+    def generate(self, prompt, timeout=None):
+        self.prompts.append(prompt)
+        if len(self.prompts) <= self.fail_first:
+            raise LLMProviderError('falha temporária', retry_after=0)
+        return super().generate(prompt, timeout)
+
+def seed_questions(count):
+    module = Module(title='Módulo', description='')
+    db.session.add(module)
+    db.session.flush()
+    category = Category(name='Categoria', module_id=module.id)
+    db.session.add(category)
+    db.session.flush()
+    for k in range(count):
+        question = Question(
+            question=f'Pergunta {k}', module_id=module.id, category_id=category.id,
+            level=1, explanation=''
+        )
+        db.session.add(question)
+        db.session.flush()
+        db.session.add(Option(question_id=question.id, option_id='a', text=f'certa {k}', is_correct=True))
+        db.session.add(Option(question_id=question.id, option_id='b', text='errada', is_correct=False))
+    db.session.commit()
+
+def missing_explanations():
+    return Question.query.filter(Question.explanation == '').count()
+
+def make_client(app, provider):
+    client = LLMClient(provider=provider)
+    client.init_app(app)
+    return client
+
+def test_pregenerate_fills_explanations(app):
+    seed_questions(5)
+    provider = CountingProvider()
+    version = ContentVersion.current()
+
+    summaries = list(pregenerate_explanations(make_client(app, provider), concurrency=2, rpm=0, batch_size=2))
+
+    assert missing_explanations() == 0
+    assert len(provider.prompts) == 5
+    assert sum(summary['written'] for summary in summaries) == 5
+    assert all(q.explanation.startswith('Resposta gerada localmente') for q in Question.query.all())
+    assert ContentVersion.current() != version
+
+def test_pregenerate_resumes_after_interruption(app):
+    seed_questions(6)
+    provider = CountingProvider()
+    client = make_client(app, provider)
+
+    # Interrompe a execução depois do primeiro lote gravado
+    run = pregenerate_explanations(client, concurrency=1, rpm=0, batch_size=2)
+    first = next(run)
+    run.close()
+    assert first['written'] == 2
+
+    remaining = missing_explanations()
+    assert 0 < remaining <= 4
+
+    provider.prompts.clear()
+    summaries = list(pregenerate_explanations(client, concurrency=1, rpm=0, batch_size=2))
+
+    assert len(provider.prompts) == remaining
+    assert sum(summary['written'] for summary in summaries) == remaining
+    assert missing_explanations() == 0
+
+def test_pregenerate_retries_only_unavailable_errors(app, monkeypatch):
+    monkeypatch.setattr('app.services.explanation_service.RETRY_BACKOFF', 0)
+    seed_questions(1)
+    provider = CountingProvider(fail_first=1)
+
+    list(pregenerate_explanations(make_client(app, provider), concurrency=1, rpm=0))
+    assert len(provider.prompts) == 2
+    assert missing_explanations() == 0
+
+    class BrokenProvider(CountingProvider):
+        def generate(self, prompt, timeout=None):
+            self.prompts.append(prompt)
+            raise ValueError('resposta bloqueada')
+
+    Question.query.update({'explanation': ''})
+    db.session.commit()
+    broken = BrokenProvider()
+    list(pregenerate_explanations(make_client(app, broken), concurrency=1, rpm=0))
+    assert len(broken.prompts) == 1
+    assert missing_explanations() == 1
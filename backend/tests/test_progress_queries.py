@@ -0,0 +1,67 @@
+import pytest
+from app import db
+from app.models import Module, Category, Question, Option, User, UserAnswer
+from app.services.progress_service import rebuild_user_progress
+from app.utils.jwt_utils import generate_token
+
+def seed_modules(categories_per_module, modules=2, questions_per_category=3):
+    """Cria módulos, categorias e questões, e um usuário que acertou parte delas"""
+    user = User(username='aluno', email='aluno@example.com', password='x')
+    db.session.add(user)
+    db.session.flush()
+
+    for m in range(modules):
+        module = Module(title=f'Módulo {m}', description='')
+        db.session.add(module)
+        db.session.flush()
+        for c in range(categories_per_module):
+            category = Category(name=f'Categoria {m}.{c}', module_id=module.id)
+            db.session.add(category)
+            db.session.flush()
+            for k in range(questions_per_category):
+                question = Question(
+                    question=f'Questão {m}.{c}.{k}', module_id=module.id,
+                    category_id=category.id, level=1, explanation=''
+                )
+                db.session.add(question)
+                db.session.flush()
+                db.session.add(Option(question_id=question.id, option_id='a', text='certa', is_correct=True))
+                db.session.add(Option(question_id=question.id, option_id='b', text='errada', is_correct=False))
+                if k == 0:
+                    db.session.add(UserAnswer(user.id, question.id, 'a', True))
+
+    db.session.commit()
+    # As respostas foram gravadas direto no banco: materializa o progresso
+    rebuild_user_progress(user.id)
+    return user.id
+
+def modules_request(app, categories_per_module, count_statements):
+    user_id = seed_modules(categories_per_module)
+    headers = {'Authorization': f'Bearer {generate_token(user_id)}'}
+    client = app.test_client()
+
+    # A primeira requisição aquece os caches do worker (catálogo, token, usuário)
+    first = client.get('/api/modules', headers=headers)
+    assert first.status_code == 200
+
+    with count_statements() as counter:
+        response = client.get('/api/modules', headers=headers)
+    assert response.status_code == 200
+    return response.get_json(), counter.count
+
+@pytest.mark.parametrize('categories', [4, 12])
+def test_module_list_query_count_does_not_grow_with_categories(make_app, count_statements, categories):
+    single, single_count = modules_request(make_app(), 1, count_statements)
+    many, many_count = modules_request(make_app(), categories, count_statements)
+
+    assert all(len(module['categories']) == 1 for module in single)
+    assert all(len(module['categories']) == categories for module in many)
+    assert single_count == many_count
+
+def test_module_list_reports_progress(app, count_statements):
+    modules, _ = modules_request(app, 3, count_statements)
+
+    # Uma questão acertada de três em cada categoria
+    for module in modules:
+        assert module['progress'] == 33
+        assert [category['progress'] for category in module['categories']] == [33, 33, 33]
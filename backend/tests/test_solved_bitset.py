@@ -0,0 +1,93 @@
+from app import db
+from app.models import Module, Category, Question, Option, User, UserAnswer, UserSolvedSet
+from app.services import solved_service
+from app.services.progress_service import get_user_progress
+from app.services.quiz_service import evaluate_quiz
+from app.services.solved_service import (
+    bits_from_ids, bits_to_bytes, bits_from_bytes, ids_from_bits, is_solved, get_solved_bits
+)
+from app.services.sampling_service import sample_by_level
+
+def seed_category(questions=4):
+    """Cria um módulo com uma categoria de questões de nível 1 e um usuário"""
+    user = User(username='aluno', email='aluno@example.com', password='x')
+    module = Module(title='Módulo', description='')
+    db.session.add_all([user, module])
+    db.session.flush()
+    category = Category(name='Categoria', module_id=module.id)
+    db.session.add(category)
+    db.session.flush()
+
+    question_ids = []
+    for k in range(questions):
+        question = Question(
+            question=f'Questão {k}', module_id=module.id, category_id=category.id,
+            level=1, explanation=''
+        )
+        db.session.add(question)
+        db.session.flush()
+        db.session.add(Option(question_id=question.id, option_id='a', text='certa', is_correct=True))
+        db.session.add(Option(question_id=question.id, option_id='b', text='errada', is_correct=False))
+        question_ids.append(question.id)
+
+    db.session.commit()
+    return user.id, module.id, category.id, question_ids
+
+def answer(question_id, option):
+    return {'questionId': question_id, 'selectedOption': option}
+
+def test_bitset_round_trip():
+    ids = [0, 3, 64, 1000]
+    bits = bits_from_ids(ids)
+
+    assert bits_from_bytes(bits_to_bytes(bits)) == bits
+    assert ids_from_bits(bits).tolist() == ids
+    assert is_solved(bits, 64) and not is_solved(bits, 65)
+    assert ids_from_bits(0).tolist() == []
+
+def test_quiz_marks_only_correct_answers_as_solved(app):
+    user_id, _, category_id, ids = seed_category()
+
+    evaluate_quiz([answer(ids[0], 'a'), answer(ids[1], 'b')], user_id)
+
+    bits = get_solved_bits(user_id)
+    assert is_solved(bits, ids[0])
+    assert not is_solved(bits, ids[1])
+    assert get_user_progress(user_id)['categories'][category_id] == 25
+
+def test_repeated_correct_answers_are_counted_once(app):
+    user_id, module_id, category_id, ids = seed_category()
+
+    for _ in range(3):
+        evaluate_quiz([answer(ids[0], 'a'), answer(ids[1], 'a')], user_id)
+
+    progress = get_user_progress(user_id)
+    assert progress['categories'][category_id] == 50
+    assert progress['modules'][module_id] == 50
+
+def test_solved_set_is_persisted(app):
+    user_id, _, _, ids = seed_category()
+    evaluate_quiz([answer(ids[2], 'a')], user_id)
+
+    # Sem o cache do worker, o bitset é lido da tabela user_solved_sets
+    solved_service._cache = None
+    stored = db.session.get(UserSolvedSet, user_id)
+    assert bits_from_bytes(stored.bits) == bits_from_ids([ids[2]])
+    assert ids_from_bits(get_solved_bits(user_id)).tolist() == [ids[2]]
+
+def test_bitset_is_built_from_history_without_solved_set(app):
+    user_id, _, _, ids = seed_category()
+    db.session.add(UserAnswer(user_id, ids[1], 'a', True))
+    db.session.add(UserAnswer(user_id, ids[1], 'a', True))
+    db.session.add(UserAnswer(user_id, ids[3], 'b', False))
+    db.session.commit()
+
+    assert db.session.get(UserSolvedSet, user_id) is None
+    assert ids_from_bits(get_solved_bits(user_id)).tolist() == [ids[1]]
+
+def test_by_level_sampling_skips_solved_questions(app):
+    user_id, module_id, _, ids = seed_category()
+    evaluate_quiz([answer(ids[0], 'a'), answer(ids[1], 'a')], user_id)
+
+    selected = sample_by_level(module_id, 10, user_id)
+    assert sorted(int(question_id) for question_id in selected) == ids[2:]
@@ -42,7 +42,7 @@ const App = () => {
 
   const isLoggedIn = localStorage.getItem("token") !== null;
   const user = localStorage.getItem("user") ? JSON.parse(localStorage.getItem("user")!) : null;
-  const hasPlacementLevel = user?.placement_level === "10";
+  const hasPlacementLevel = Boolean(user?.placement_level);
 
   return (
     <QueryClientProvider client={queryClient}>
@@ -28,7 +28,7 @@ const ProtectedRoute = ({ children, requirePlacement = true }: ProtectedRoutePro
 
   const isLoggedIn = localStorage.getItem("token") !== null;
   const user = localStorage.getItem("user") ? JSON.parse(localStorage.getItem("user")!) : null;
-  const hasPlacementLevel = user?.placement_level === "10";
+  const hasPlacementLevel = Boolean(user?.placement_level);
 
   if (!isLoggedIn) {
     return <Navigate to="/login" />;
@@ -68,8 +68,12 @@ const QuizNivelamento = () => {
 
     setIsAnswerChecked(true);
 
+    // O gabarito só vem da API se PLACEMENT_INCLUDE_ANSWER_KEY estiver ligado;
+    // sem ele a resposta é apenas registrada e corrigida no servidor ao final
     const correctOption = currentQuestion.options.find(option => option.correct);
-    const isCorrect = selectedOption === correctOption?.id;
+    if (!correctOption) return;
+
+    const isCorrect = selectedOption === correctOption.id;
 
     if (isCorrect) {
       setScore(score + 1);
@@ -84,7 +88,7 @@ const QuizNivelamento = () => {
             variant: "destructive",
           });
           
-          fetchAiExplanation(currentQuestion.question, correctOption?.text || "")
+          fetchAiExplanation(currentQuestion.question, correctOption.text)
             .then((iaExplanation) => {
               toast({
                 title: "Explicação da IA",
@@ -110,42 +114,8 @@ const QuizNivelamento = () => {
     } else {
       const todasRespostas = [...answers, respostaAtual];
   
-      const respostasCorretas = todasRespostas
-      .filter((r) => {
-        const questao = questions.find((q) => q.id === r.questionId);
-        const opcao = questao?.options.find((o) => o.id === r.selectedOption);
-        return opcao?.correct;
-      })
-      .map((r) => {
-        const questao = questions.find((q) => q.id === r.questionId);
-        return {
-          question_id: r.questionId,
-          level: questao?.level ?? 1,
-        };
-      });
-
-      // Coleta as questões erradas
-      const wrongQuestions = todasRespostas
-        .filter((r) => {
-          const questao = questions.find((q) => q.id === r.questionId);
-          const opcao = questao?.options.find((o) => o.id === r.selectedOption);
-          return !opcao?.correct;
-        })
-        .map((r) => {
-          const questao = questions.find((q) => q.id === r.questionId);
-          const opcaoCorreta = questao?.options.find((o) => o.correct);
-          const opcaoSelecionada = questao?.options.find((o) => o.id === r.selectedOption);
-          return {
-            question: questao?.question || "",
-            correctAnswer: opcaoCorreta?.text || "",
-            userAnswer: opcaoSelecionada?.text || "",
-            level: questao?.level || 1
-          };
-        });
-  
       try {
-        const userId = Number(localStorage.getItem("user_id"));
-        const result = await sendPlacementResult(userId, respostasCorretas);
+        const result = await sendPlacementResult(todasRespostas);
   
         // Atualiza o placement_level no localStorage
         const user = JSON.parse(localStorage.getItem("user") || "{}");
@@ -154,8 +124,24 @@ const QuizNivelamento = () => {
   
         // Dispara evento para notificar outros componentes
         window.dispatchEvent(new Event('storage'));
+
+        // Coleta as questões erradas a partir da correção do servidor
+        const wrongQuestions = result.respostas
+          .filter((r) => !r.is_correct)
+          .map((r) => {
+            const questao = questions.find((q) => q.id === r.question_id);
+            const resposta = todasRespostas.find((a) => a.questionId === r.question_id);
+            const opcaoCorreta = questao?.options.find((o) => r.correct_options.includes(o.id));
+            const opcaoSelecionada = questao?.options.find((o) => o.id === resposta?.selectedOption);
+            return {
+              question: questao?.question || "",
+              correctAnswer: opcaoCorreta?.text || "",
+              userAnswer: opcaoSelecionada?.text || "",
+              level: questao?.level || 1
+            };
+          });
         
-        const score = respostasCorretas.length;
+        const score = result.score;
         const total = questions.length;
         const percentage = Math.round((score / total) * 100);
         
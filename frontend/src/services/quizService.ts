@@ -144,20 +144,28 @@ export const fetchAiExplanation = async (question: string, correctAnswer: string
 
 
 export const sendPlacementResult = async (
-  userId: number,
-  respostas: { question_id: number; level: number }[]
-): Promise<{ placement_level: string; nivel_texto: string }> => {
+  answers: { questionId: number; selectedOption: string }[]
+): Promise<{
+  placement_level: string;
+  nivel: number;
+  score: number;
+  total: number;
+  respostas: { question_id: number; is_correct: boolean; correct_options: string[] }[];
+}> => {
   try {
-    console.log("🔍 Enviando para /api/nivelamento/resultado:", {
-      user_id: userId,
-      respostas
-    });
+    const token = localStorage.getItem('token');
+    if (!token) {
+      throw new Error('Token de autenticação não encontrado');
+    }
+
+    // As respostas são corrigidas no servidor, que estima e grava o nível
     const response = await fetch(`${API_BASE_URL}/nivelamento/resultado`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        "Authorization": `Bearer ${token}`
       },
-      body: JSON.stringify({ user_id: userId, respostas }),
+      body: JSON.stringify({ answers }),
     });
 
     if (!response.ok) throw new Error("Erro ao enviar resultado de nivelamento");